@@ -0,0 +1,267 @@
+"""
+Bounded in-process cache of the enrollment graph.
+
+Maps exam -> enrolled student ids and student -> enrolled exam ids, each
+held as a compact ``array('i')`` (4 bytes per id) in enrollment order.
+Entries are evicted least-recently-used once their total size passes
+INFORMS_ADJACENCY_CACHE_BYTES (default 16 MiB).
+
+StudentExam writes through the ORM drop the affected exam and student
+entries when the session commits; Student and Exam deletes drop their own.
+Bulk loads and writes made by another process drop a term's entries
+through ``revisions.on_external_write``, as with the occupancy index.
+Hit, miss and eviction counters are exported on ``/metrics``.
+"""
+
+import os
+import sys
+import threading
+from array import array
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session as OrmSession, object_session
+from sqlmodel import Session, select
+
+from . import revisions
+from .database import DEFAULT_TERM
+from .models import Exam, Student, StudentExam
+
+MAX_BYTES = int(os.environ.get("INFORMS_ADJACENCY_CACHE_BYTES", str(16 * 2**20)))
+
+# Rough per-entry cost of the key tuple and OrderedDict node, on top of the array
+_KEY_OVERHEAD = 120
+
+EXAM = "exam"
+STUDENT = "student"
+
+Key = tuple[str, str, int]  # (term, EXAM | STUDENT, id)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+
+class AdjacencyCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._entries: OrderedDict[Key, array] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Moves with every discard in a term, so ids loaded before it are never cached
+        self._generations: dict[str, int] = defaultdict(int)
+
+    @staticmethod
+    def _size(ids: array) -> int:
+        return sys.getsizeof(ids) + _KEY_OVERHEAD
+
+    def get(self, key: Key, load: Callable[[], list[int]]) -> array:
+        with self._lock:
+            ids = self._entries.get(key)
+            if ids is not None:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return ids
+            self.stats.misses += 1
+            generation = self._generations[key[0]]
+        # Load outside the lock; a concurrent miss on the same key just loads twice
+        ids = array("i", load())
+        self._put(key, ids, generation)
+        return ids
+
+    def get_many(self, keys: list[Key], load: Callable[[list[Key]], dict[Key, list[int]]]) -> dict[Key, array]:
+        """Like ``get`` for several keys; ``load`` is called once, with just the missing ones."""
+        found: dict[Key, array] = {}
+        missing: list[Key] = []
+        with self._lock:
+            for key in keys:
+                ids = self._entries.get(key)
+                if ids is None:
+                    missing.append(key)
+                else:
+                    self._entries.move_to_end(key)
+                    found[key] = ids
+            self.stats.hits += len(found)
+            self.stats.misses += len(missing)
+            generations = {key[0]: self._generations[key[0]] for key in missing}
+        if missing:
+            loaded = load(missing)
+            for key in missing:
+                found[key] = array("i", loaded.get(key, ()))
+                self._put(key, found[key], generations[key[0]])
+        return found
+
+    def _put(self, key: Key, ids: array, generation: int) -> None:
+        size = self._size(ids)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if self._generations[key[0]] != generation:
+                return  # enrollments changed while loading
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= self._size(old)
+            self._entries[key] = ids
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= self._size(evicted)
+                self.stats.evictions += 1
+
+    def discard(self, keys: set[Key]) -> None:
+        with self._lock:
+            for term in {key[0] for key in keys}:
+                self._generations[term] += 1
+            for key in keys:
+                ids = self._entries.pop(key, None)
+                if ids is not None:
+                    self._bytes -= self._size(ids)
+                    self.stats.invalidations += 1
+
+    def clear(self, term: Optional[str] = None) -> None:
+        with self._lock:
+            keys = list(self._entries) if term is None else [k for k in self._entries if k[0] == term]
+            for t in list(self._generations) if term is None else [term]:
+                self._generations[t] += 1
+        self.discard(set(keys))
+
+    def usage(self) -> tuple[int, int]:
+        """(entries, bytes) currently held."""
+        with self._lock:
+            return len(self._entries), self._bytes
+
+
+_cache = AdjacencyCache(MAX_BYTES)
+
+
+def _term(session) -> str:
+    return session.info.get("term", DEFAULT_TERM)
+
+
+def exam_students(session: Session, exam_id: int) -> array:
+    """Ids of the students enrolled in an exam."""
+    return _cache.get((_term(session), EXAM, exam_id), lambda: session.exec(
+        select(StudentExam.student_id).where(StudentExam.exam_id == exam_id).order_by(StudentExam.id)
+    ).all())
+
+
+def student_exams(session: Session, student_id: int) -> array:
+    """Ids of the exams a student is enrolled in."""
+    return _cache.get((_term(session), STUDENT, student_id), lambda: session.exec(
+        select(StudentExam.exam_id).where(StudentExam.student_id == student_id).order_by(StudentExam.id)
+    ).all())
+
+
+def _grouped(session: Session, kind: str, ids: list[int]) -> dict[int, array]:
+    """exam_students / student_exams for many ids, loading every miss with one IN query."""
+    term = _term(session)
+    by, of = (StudentExam.exam_id, StudentExam.student_id) if kind == EXAM else (StudentExam.student_id, StudentExam.exam_id)
+
+    def load(keys: list[Key]) -> dict[Key, list[int]]:
+        grouped: dict[Key, list[int]] = {}
+        rows = session.exec(select(by, of).where(by.in_([k[2] for k in keys])).order_by(StudentExam.id)).all()
+        for key_id, value in rows:
+            grouped.setdefault((term, kind, key_id), []).append(value)
+        return grouped
+
+    found = _cache.get_many([(term, kind, i) for i in dict.fromkeys(ids)], load)
+    return {key[2]: value for key, value in found.items()}
+
+
+def exams_students(session: Session, exam_ids: list[int]) -> dict[int, array]:
+    """exam id -> ids of its enrolled students, for several exams at once."""
+    return _grouped(session, EXAM, exam_ids)
+
+
+def students_exams(session: Session, student_ids: list[int]) -> dict[int, array]:
+    """student id -> ids of the exams they are enrolled in, for several students at once."""
+    return _grouped(session, STUDENT, student_ids)
+
+
+@revisions.on_external_write
+def invalidate(term: Optional[str] = None) -> None:
+    """Drop every cached entry of one term, or of all terms."""
+    _cache.clear(term)
+
+
+def render_prometheus() -> str:
+    entries, size = _cache.usage()
+    s = _cache.stats
+    return "\n".join([
+        "# HELP informs_adjacency_cache_requests_total Enrollment adjacency lookups, by result.",
+        "# TYPE informs_adjacency_cache_requests_total counter",
+        f'informs_adjacency_cache_requests_total{{result="hit"}} {s.hits}',
+        f'informs_adjacency_cache_requests_total{{result="miss"}} {s.misses}',
+        "# HELP informs_adjacency_cache_evictions_total Entries evicted to stay under the memory cap.",
+        "# TYPE informs_adjacency_cache_evictions_total counter",
+        f"informs_adjacency_cache_evictions_total {s.evictions}",
+        "# HELP informs_adjacency_cache_invalidations_total Entries dropped because enrollments changed.",
+        "# TYPE informs_adjacency_cache_invalidations_total counter",
+        f"informs_adjacency_cache_invalidations_total {s.invalidations}",
+        "# HELP informs_adjacency_cache_entries Entries currently cached.",
+        "# TYPE informs_adjacency_cache_entries gauge",
+        f"informs_adjacency_cache_entries {entries}",
+        "# HELP informs_adjacency_cache_bytes Approximate memory held by cached entries.",
+        "# TYPE informs_adjacency_cache_bytes gauge",
+        f"informs_adjacency_cache_bytes {size}",
+        "# HELP informs_adjacency_cache_max_bytes Configured memory cap.",
+        "# TYPE informs_adjacency_cache_max_bytes gauge",
+        f"informs_adjacency_cache_max_bytes {_cache.max_bytes}",
+    ]) + "\n"
+
+
+# --- Drop entries on ORM writes ---
+
+
+def _pending(target) -> Optional[set]:
+    session = object_session(target)
+    if session is None:
+        return None
+    return session.info.setdefault("adjacency_pending", set())
+
+
+@event.listens_for(StudentExam, "after_insert")
+@event.listens_for(StudentExam, "after_update")
+@event.listens_for(StudentExam, "after_delete")
+def _enrollment_written(mapper, connection, target: StudentExam):
+    pending = _pending(target)
+    if pending is None:
+        return
+    attrs = inspect(target).attrs
+    for kind, attr in ((EXAM, "exam_id"), (STUDENT, "student_id")):
+        pending.add((kind, getattr(target, attr)))
+        pending.update((kind, old) for old in attrs[attr].history.deleted)
+
+
+@event.listens_for(Exam, "after_delete")
+def _exam_deleted(mapper, connection, target: Exam):
+    pending = _pending(target)
+    if pending is not None:
+        pending.add((EXAM, target.id))
+
+
+@event.listens_for(Student, "after_delete")
+def _student_deleted(mapper, connection, target: Student):
+    pending = _pending(target)
+    if pending is not None:
+        pending.add((STUDENT, target.id))
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _apply_pending(session):
+    pending = session.info.pop("adjacency_pending", None)
+    if pending:
+        term = _term(session)
+        _cache.discard({(term, kind, i) for kind, i in pending})
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_pending(session):
+    session.info.pop("adjacency_pending", None)
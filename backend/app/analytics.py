@@ -0,0 +1,106 @@
+"""
+CPU-bound conflict and analytics computations.
+
+These take already-loaded rows and touch no database session, so the async
+endpoints can load data on the event loop and run these in the analytics
+executor (see workers.py).
+"""
+
+from collections import defaultdict
+from itertools import groupby
+from operator import itemgetter
+from typing import Sequence, Union
+
+from .feasibility import ROOMLESS_TYPES
+from .intervals import Span, exam_span, overlap_groups, scheduled_spans, slot_bounds, student_conflicts
+from .readmodel import ExamInfo, SlotInfo
+
+
+CONFLICT_TYPES = ("student", "instructor", "room")
+
+ConflictGroup = tuple[str, Union[int, str], list[int]]  # (type, student id | instructor | room id, exam ids)
+
+
+def find_conflicts(
+    assignments: Sequence[tuple[int, int, int]],
+    enrollments: Sequence[tuple[int, int]],
+    exams: Sequence[ExamInfo],
+    timeslots: Sequence[SlotInfo],
+) -> list[ConflictGroup]:
+    """
+    Every double-booking in a version, from (exam_id, room_id, timeslot_id)
+    and (student_id, exam_id) rows.
+
+    Each conflict class contributes (type, key, start, end, exam_id) rows to
+    one list, which is sorted once and grouped by (type, key); a sweep over
+    each group yields its runs of overlapping exams. Results come out in
+    type, key and start order, so pages are stable.
+
+      * student    - a student sitting two exams at once
+      * instructor - an instructor with two seated exams at once
+      * room       - two seated exams in one room at once
+
+    Take-home and online exams occupy neither their room nor their
+    instructor, so they only count towards student conflicts. Sections
+    sitting a common or cross-listed final (same title) share their room
+    and instructor, so a group of them alone is not a conflict.
+    """
+    slot_map = {t.id: b for t in timeslots if (b := slot_bounds(t))}
+    durations = {e.id: e.duration_minutes for e in exams}
+    exam_to_ts = {eid: tid for eid, _, tid in assignments}
+    spans = scheduled_spans(exam_to_ts, slot_map, durations)
+    seated = {e.id: e for e in exams if e.exam_type not in ROOMLESS_TYPES}
+    sitting = {eid: (e.title or "").strip().upper() or eid for eid, e in seated.items()}
+
+    rows: list[tuple] = [(0, sid, *spans[eid], eid) for sid, eid in set(enrollments) if eid in spans]
+    rows.extend(
+        (1, seated[eid].instructor, *span, eid)
+        for eid, span in spans.items()
+        if eid in seated and seated[eid].instructor
+    )
+    rows.extend(
+        (2, rid, *exam_span(slot_map[tid], durations.get(eid)), eid)
+        for eid, rid, tid in set(assignments)
+        if eid in seated and tid in slot_map
+    )
+    rows.sort()
+
+    groups = []
+    for (kind, key), items in groupby(rows, key=itemgetter(0, 1)):
+        for eids in overlap_groups((start, end, eid) for _, _, start, end, eid in items):
+            eids = list(dict.fromkeys(eids))
+            if kind == 0 and len(eids) > 1 or kind > 0 and len({sitting[e] for e in eids}) > 1:
+                groups.append((CONFLICT_TYPES[kind], key, eids))
+    return groups
+
+
+def conflict_stats(
+    exam_to_ts: dict[int, int],
+    student_exams: dict[int, list[int]],
+    slot_map: dict[int, Span],
+    durations: dict[int, int],
+) -> tuple[int, set[int]]:
+    """Number of overlap groups and the set of students with at least one."""
+    spans = scheduled_spans(exam_to_ts, slot_map, durations)
+    conflict_count = 0
+    affected_students: set[int] = set()
+    for sid, _ in student_conflicts(student_exams, spans):
+        conflict_count += 1
+        affected_students.add(sid)
+    return conflict_count, affected_students
+
+
+def count_conflicts(
+    assignments: Sequence[tuple[int, int]],
+    enrollments: Sequence[tuple[int, int]],
+    timeslots: Sequence[SlotInfo],
+    durations: Sequence[tuple[int, int]],
+) -> tuple[int, int]:
+    """(conflict_count, affected_students) from (exam_id, timeslot_id) and (student_id, exam_id) rows."""
+    exam_to_ts = dict(assignments)
+    student_exams: dict[int, list[int]] = defaultdict(list)
+    for sid, eid in enrollments:
+        student_exams[sid].append(eid)
+    slot_map = {t.id: b for t in timeslots if (b := slot_bounds(t))}
+    conflict_count, affected = conflict_stats(exam_to_ts, student_exams, slot_map, dict(durations))
+    return conflict_count, len(affected)
@@ -0,0 +1,326 @@
+"""
+Materialized analytics: one current AnalyticsSnapshot row per
+(version, include_no_exam), so ``/schedules/analytics`` is a single-row read.
+
+Schedule inserts/updates/deletes are recorded on the session (as for the
+occupancy index) and the version's snapshots are refreshed in ``before_commit``,
+inside the same transaction as the edit:
+
+  * exam/room/timeslot/student counts, room usage and capacity warnings are
+    SQL aggregates over the version, and
+  * conflicts are updated incrementally: only students enrolled in a changed
+    exam are re-checked, against the assignments before and after the
+    change, and the difference is applied to the previous totals.
+
+Each refresh writes a new row and demotes the previous one, so the demoted
+rows form a per-version history (the last HISTORY_LIMIT revisions) for trend
+charts. Writes to exams, rooms, timeslots, students or enrollments demote
+the current rows and the next read recomputes from scratch, as do edits
+touching more than INCREMENTAL_LIMIT assignments at once. Writes that bypass
+the ORM (Core bulk inserts, other processes) must call ``invalidate``.
+
+A read that finds no current row counts conflicts outside any write
+transaction, so it stores through ``store_computed``: that takes SQLite's
+write lock, then stores only if no edit or other reader has got there since
+``marker`` was read, as a refresh that found no base would have skipped it.
+"""
+
+import json
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import delete, distinct, event, false, func, inspect, or_, update
+from sqlalchemy.orm import Session as OrmSession, object_session
+from sqlmodel import Session, select
+
+from . import oplog, readmodel, revisions
+from .analytics import conflict_stats
+from .intervals import slot_bounds
+from .models import (
+    AnalyticsSnapshot,
+    DataGeneration,
+    Exam,
+    Room,
+    Schedule,
+    ScheduleVersion,
+    Student,
+    StudentExam,
+    TimeSlot,
+)
+from .readmodel import SlotInfo
+
+HISTORY_LIMIT = 200
+INCREMENTAL_LIMIT = 50
+
+Assignment = tuple[int, int]  # (exam_id, timeslot_id)
+Change = tuple[int, Optional[Assignment], Optional[Assignment]]  # (schedule_id, old, new)
+
+
+# --- Summary queries ---
+
+
+def _exam_filter(include_no_exam: bool):
+    cond = Exam.student_count > 0
+    if not include_no_exam:
+        cond = cond & or_(Exam.exam_type.is_(None), Exam.exam_type != "No Final Exam")
+    return cond
+
+
+def _summary(session: Session, version_id: int, include_no_exam: bool, conflict_count: int, affected: int) -> dict:
+    exam_filter = _exam_filter(include_no_exam)
+    warnings = session.exec(
+        select(Exam.course_name, Exam.student_count, Room.name, Room.capacity)
+        .select_from(Schedule)
+        .join(Exam, Exam.id == Schedule.exam_id)
+        .join(Room, Room.id == Schedule.room_id)
+        .where(Schedule.version_id == version_id, exam_filter, Exam.student_count > Room.capacity)
+        .order_by(Schedule.id)
+    ).all()
+    usage = session.exec(
+        select(Room.name, func.count(Schedule.id))
+        .join(Schedule, Schedule.room_id == Room.id)
+        .where(Schedule.version_id == version_id)
+        .group_by(Room.id)
+        .order_by(Room.id)
+    ).all()
+    return {
+        "total_exams": session.exec(select(func.count()).select_from(Exam).where(exam_filter)).one(),
+        "scheduled_exams": session.exec(
+            select(func.count(distinct(Schedule.exam_id)))
+            .join(Exam, Exam.id == Schedule.exam_id)
+            .where(Schedule.version_id == version_id, exam_filter)
+        ).one(),
+        "total_rooms": session.exec(select(func.count()).select_from(Room)).one(),
+        "total_students": session.exec(select(func.count()).select_from(Student)).one(),
+        "total_timeslots": session.exec(select(func.count()).select_from(TimeSlot)).one(),
+        "conflict_count": conflict_count,
+        "affected_students": affected,
+        "capacity_warnings": [
+            {"exam": exam, "students": students, "room": room, "capacity": capacity}
+            for exam, students, room, capacity in warnings
+        ],
+        "room_usage": [{"room": name, "count": count} for name, count in usage],
+    }
+
+
+# --- Reads and writes ---
+
+
+def current_query(version_id: int, include_no_exam: bool):
+    return select(AnalyticsSnapshot).where(
+        AnalyticsSnapshot.version_id == version_id,
+        AnalyticsSnapshot.include_no_exam == include_no_exam,
+        AnalyticsSnapshot.current == True,  # noqa: E712
+    )
+
+
+def summaries(session: Session, version_id: int, conflict_count: int, affected: int) -> dict[bool, dict]:
+    """The payloads store() would write, without writing them."""
+    return {i: _summary(session, version_id, i, conflict_count, affected) for i in (False, True)}
+
+
+def marker(session: Session, version_id: int) -> tuple:
+    """What counts read from now on depend on: the version's revision, edit-log head and data generation."""
+    generation = session.exec(select(DataGeneration.generation)).first() or 0
+    return revisions.current(session, version_id), oplog.head(session, version_id), generation
+
+
+def store_computed(
+    session: Session, version_id: int, seen: tuple, conflict_count: int, affected: int,
+) -> Optional[dict[bool, dict]]:
+    """store() counts computed from reads taken after ``marker`` returned seen; None if they went stale."""
+    # any write takes the database's write lock, so nothing commits between the check and the store
+    session.exec(update(AnalyticsSnapshot).where(false()).values(current=False))
+    if session.exec(current_query(version_id, False)).first() is not None or marker(session, version_id) != seen:
+        return None
+    return store(session, version_id, conflict_count, affected)
+
+
+def store(session: Session, version_id: int, conflict_count: int, affected: int) -> dict[bool, dict]:
+    """Write new current snapshots of a version for both include_no_exam values; returns the payloads."""
+    stored = session.get(ScheduleVersion, version_id) is not None
+    latest = dict(session.exec(
+        select(AnalyticsSnapshot.include_no_exam, func.max(AnalyticsSnapshot.revision))
+        .where(AnalyticsSnapshot.version_id == version_id)
+        .group_by(AnalyticsSnapshot.include_no_exam)
+    ).all())
+    if stored:
+        session.exec(
+            update(AnalyticsSnapshot)
+            .where(AnalyticsSnapshot.version_id == version_id, AnalyticsSnapshot.current == True)  # noqa: E712
+            .values(current=False)
+        )
+    now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    payloads = summaries(session, version_id, conflict_count, affected)
+    for include_no_exam, payload in payloads.items():
+        if not stored:
+            continue
+        revision = latest.get(include_no_exam, 0) + 1
+        session.add(AnalyticsSnapshot(
+            version_id=version_id,
+            include_no_exam=include_no_exam,
+            revision=revision,
+            computed_at=now,
+            conflict_count=conflict_count,
+            affected_students=affected,
+            scheduled_exams=payload["scheduled_exams"],
+            capacity_warnings=len(payload["capacity_warnings"]),
+            payload=json.dumps(payload),
+        ))
+        session.exec(
+            delete(AnalyticsSnapshot).where(
+                AnalyticsSnapshot.version_id == version_id,
+                AnalyticsSnapshot.include_no_exam == include_no_exam,
+                AnalyticsSnapshot.revision <= revision - HISTORY_LIMIT,
+            )
+        )
+    return payloads
+
+
+def invalidate(session: Session, version_id: Optional[int] = None) -> None:
+    """Demote the current snapshots of one version, or of every version."""
+    statement = update(AnalyticsSnapshot).where(AnalyticsSnapshot.current == True)  # noqa: E712
+    if version_id is not None:
+        statement = statement.where(AnalyticsSnapshot.version_id == version_id)
+    session.exec(statement.values(current=False))
+
+
+# --- Incremental refresh ---
+
+
+def _conflict_delta(session: Session, version_id: int, changes: list[Change]) -> tuple[int, int, int, int]:
+    """Conflict count and affected students of the changed exams' students, before and after."""
+    rows = {
+        sid: (eid, tsid)
+        for sid, eid, tsid in session.exec(
+            select(Schedule.id, Schedule.exam_id, Schedule.timeslot_id).where(Schedule.version_id == version_id)
+        ).all()
+    }
+    after_rows = dict(rows)
+    for sid, old, new in reversed(changes):
+        if new:
+            rows.pop(sid, None)
+        if old:
+            rows[sid] = old
+    # by schedule id, so an exam with several rows keeps them apart; the last
+    # row per exam wins, as in count_conflicts
+    after = dict(after_rows[sid] for sid in sorted(after_rows))
+    before = dict(rows[sid] for sid in sorted(rows))
+
+    changed = {a[0] for _, old, new in changes for a in (old, new) if a}
+    students = select(StudentExam.student_id).where(StudentExam.exam_id.in_(changed))
+    student_exams: dict[int, list[int]] = defaultdict(list)
+    for sid, eid in session.exec(
+        select(StudentExam.student_id, StudentExam.exam_id).where(StudentExam.student_id.in_(students))
+    ).all():
+        student_exams[sid].append(eid)
+    exam_ids = {eid for eids in student_exams.values() for eid in eids}
+    durations = dict(session.exec(select(Exam.id, Exam.duration_minutes).where(Exam.id.in_(exam_ids))).all())
+    slot_map = {t.id: b for t in readmodel.load(session, SlotInfo) if (b := slot_bounds(t))}
+
+    before_count, before_affected = conflict_stats(before, student_exams, slot_map, durations)
+    after_count, after_affected = conflict_stats(after, student_exams, slot_map, durations)
+    return before_count, len(before_affected), after_count, len(after_affected)
+
+
+def _refresh_version(session: Session, version_id: int, changes: list) -> None:
+    base = session.exec(current_query(version_id, False)).first()
+    if base is None:
+        return  # nothing materialized yet; the next read computes it
+    if session.get(ScheduleVersion, version_id) is None:
+        session.exec(delete(AnalyticsSnapshot).where(AnalyticsSnapshot.version_id == version_id))
+        return
+    if len(changes) > INCREMENTAL_LIMIT:
+        invalidate(session, version_id)
+        return
+    before_count, before_affected, after_count, after_affected = _conflict_delta(session, version_id, changes)
+    store(
+        session,
+        version_id,
+        base.conflict_count - before_count + after_count,
+        base.affected_students - before_affected + after_affected,
+    )
+
+
+# --- Record ORM writes and refresh before commit ---
+
+
+def _pending(target) -> Optional[dict]:
+    session = object_session(target)
+    if session is None:
+        return None
+    return session.info.setdefault("analytics_pending", {"reset": False, "changes": defaultdict(list)})
+
+
+def _previous(target: Schedule, attr: str):
+    history = inspect(target).attrs[attr].history
+    return history.deleted[0] if history.deleted else getattr(target, attr)
+
+
+@event.listens_for(Schedule, "after_insert")
+def _schedule_inserted(mapper, connection, target: Schedule):
+    pending = _pending(target)
+    if pending is not None:
+        pending["changes"][target.version_id].append((target.id, None, (target.exam_id, target.timeslot_id)))
+
+
+@event.listens_for(Schedule, "after_update")
+def _schedule_updated(mapper, connection, target: Schedule):
+    pending = _pending(target)
+    if pending is not None:
+        old = (_previous(target, "exam_id"), _previous(target, "timeslot_id"))
+        pending["changes"][_previous(target, "version_id")].append((target.id, old, None))
+        pending["changes"][target.version_id].append((target.id, None, (target.exam_id, target.timeslot_id)))
+
+
+@event.listens_for(Schedule, "after_delete")
+def _schedule_deleted(mapper, connection, target: Schedule):
+    pending = _pending(target)
+    if pending is not None:
+        pending["changes"][target.version_id].append((target.id, (target.exam_id, target.timeslot_id), None))
+
+
+@event.listens_for(ScheduleVersion, "after_delete")
+def _version_deleted(mapper, connection, target: ScheduleVersion):
+    pending = _pending(target)
+    if pending is not None:
+        pending["changes"][target.id]  # refreshing a deleted version drops its snapshots
+
+
+@event.listens_for(Exam, "after_insert")
+@event.listens_for(Exam, "after_update")
+@event.listens_for(Exam, "after_delete")
+@event.listens_for(Room, "after_insert")
+@event.listens_for(Room, "after_update")
+@event.listens_for(Room, "after_delete")
+@event.listens_for(TimeSlot, "after_insert")
+@event.listens_for(TimeSlot, "after_update")
+@event.listens_for(TimeSlot, "after_delete")
+@event.listens_for(Student, "after_insert")
+@event.listens_for(Student, "after_delete")
+@event.listens_for(StudentExam, "after_insert")
+@event.listens_for(StudentExam, "after_update")
+@event.listens_for(StudentExam, "after_delete")
+def _entities_written(mapper, connection, target):
+    pending = _pending(target)
+    if pending is not None:
+        pending["reset"] = True
+
+
+@event.listens_for(OrmSession, "before_commit")
+def _refresh_pending(session):
+    session.flush()
+    pending = session.info.pop("analytics_pending", None)
+    if not pending:
+        return
+    if pending["reset"]:
+        invalidate(session)
+        return
+    for version_id, changes in pending["changes"].items():
+        _refresh_version(session, version_id, changes)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_pending(session):
+    session.info.pop("analytics_pending", None)
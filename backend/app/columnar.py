@@ -0,0 +1,329 @@
+"""
+Columnar export/import of whole schedule versions as Parquet or Arrow IPC.
+
+A version bundle is a directory with one file per table:
+
+    rooms        id, building, name, capacity, available
+    exams        id, crn, course_name, subject, ..., student_count, duration_minutes
+    timeslots    id, date, start_time, end_time
+    students     id, person_id, name, email
+    enrollments  student_id, exam_id
+    assignments  exam_id, room_id, timeslot_id
+
+Ids are local to the bundle. On import, rows are matched to existing ones
+by natural key (room building+name, exam CRN, student person_id or email,
+timeslot date+start) and everything else is bulk-inserted, so a bundle
+written from one database loads into another. Students with neither are
+skipped, along with their enrollments, since nothing could match them on
+a later import. Dates and times are already normalised
+(YYYY-MM-DD / HH:MM), so no per-row parsing is needed.
+
+Arrow files are memory-mapped and read without copying; Parquet is the
+smaller format for archiving. Requires the optional ``pyarrow`` dependency.
+"""
+
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+from . import analytics_store, revisions, search
+from .models import Exam, Room, Schedule, ScheduleVersion, Student, StudentExam, TimeSlot
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+EXAM_COLUMNS = [
+    "crn", "course_name", "subject", "course_number", "section", "title",
+    "instructor", "exam_type", "student_count", "duration_minutes",
+]
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("Columnar bundles need pyarrow: pip install -e '.[columnar]'") from e
+    return pyarrow
+
+
+def _write(pa, table, path: Path, fmt: str) -> None:
+    if fmt == "parquet":
+        pa.parquet.write_table(table, path)
+    else:
+        with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _read(pa, path: Path):
+    if path.suffix == ".parquet":
+        return pa.parquet.read_table(path, memory_map=True)
+    with pa.memory_map(str(path), "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def _columns(table, names: list[str]) -> list[list]:
+    return [table.column(n).to_pylist() for n in names]
+
+
+# --- Export ---
+
+
+def export_version(session: Session, version_id: int, out_dir: str | Path, fmt: str = "parquet") -> Path:
+    """Write a version and everything it references to out_dir; returns the directory."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {sorted(FORMATS)}")
+    pa = _pyarrow()
+    version = session.get(ScheduleVersion, version_id)
+    if not version:
+        raise ValueError(f"Version {version_id} not found")
+
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    ext = FORMATS[fmt]
+
+    def dump(name: str, columns: dict[str, tuple[object, list]], metadata: Optional[dict] = None) -> None:
+        schema = pa.schema([pa.field(col, typ) for col, (typ, _) in columns.items()], metadata=metadata)
+        table = pa.table({col: values for col, (_, values) in columns.items()}, schema=schema)
+        _write(pa, table, out / f"{name}{ext}", fmt)
+
+    rooms = session.exec(select(Room.id, Room.building, Room.name, Room.capacity, Room.available)).all()
+    dump("rooms", {
+        "id": (pa.int64(), [r[0] for r in rooms]),
+        "building": (pa.string(), [r[1] for r in rooms]),
+        "name": (pa.string(), [r[2] for r in rooms]),
+        "capacity": (pa.int32(), [r[3] for r in rooms]),
+        "available": (pa.bool_(), [r[4] for r in rooms]),
+    })
+
+    exam_cols = [getattr(Exam, c) for c in EXAM_COLUMNS]
+    exams = session.exec(select(Exam.id, *exam_cols)).all()
+    exam_types = {
+        "crn": pa.int64(), "student_count": pa.int32(), "duration_minutes": pa.int32(),
+    }
+    dump("exams", {
+        "id": (pa.int64(), [e[0] for e in exams]),
+        **{
+            c: (exam_types.get(c, pa.string()), [e[i + 1] for e in exams])
+            for i, c in enumerate(EXAM_COLUMNS)
+        },
+    })
+
+    timeslots = session.exec(select(TimeSlot.id, TimeSlot.date, TimeSlot.start_time, TimeSlot.end_time)).all()
+    dump("timeslots", {
+        "id": (pa.int64(), [t[0] for t in timeslots]),
+        "date": (pa.string(), [t[1] for t in timeslots]),
+        "start_time": (pa.string(), [t[2] for t in timeslots]),
+        "end_time": (pa.string(), [t[3] for t in timeslots]),
+    })
+
+    students = session.exec(select(Student.id, Student.person_id, Student.name, Student.email)).all()
+    dump("students", {
+        "id": (pa.int64(), [s[0] for s in students]),
+        "person_id": (pa.int64(), [s[1] for s in students]),
+        "name": (pa.string(), [s[2] for s in students]),
+        "email": (pa.string(), [s[3] for s in students]),
+    })
+
+    enrollments = session.exec(select(StudentExam.student_id, StudentExam.exam_id)).all()
+    dump("enrollments", {
+        "student_id": (pa.int64(), [e[0] for e in enrollments]),
+        "exam_id": (pa.int64(), [e[1] for e in enrollments]),
+    })
+
+    assignments = session.exec(
+        select(Schedule.exam_id, Schedule.room_id, Schedule.timeslot_id)
+        .where(Schedule.version_id == version_id)
+    ).all()
+    dump("assignments", {
+        "exam_id": (pa.int64(), [a[0] for a in assignments]),
+        "room_id": (pa.int64(), [a[1] for a in assignments]),
+        "timeslot_id": (pa.int64(), [a[2] for a in assignments]),
+    }, metadata={"version_name": version.name})
+
+    return out
+
+
+# --- Import ---
+
+
+def _find(bundle: Path, name: str) -> Path:
+    for ext in FORMATS.values():
+        path = bundle / f"{name}{ext}"
+        if path.exists():
+            return path
+    raise FileNotFoundError(f"{bundle} has no {name}.parquet or {name}.arrow")
+
+
+def bundle_version_name(bundle_dir: str | Path) -> Optional[str]:
+    pa = _pyarrow()
+    metadata = _read(pa, _find(Path(bundle_dir), "assignments")).schema.metadata or {}
+    name = metadata.get(b"version_name")
+    return name.decode() if name else None
+
+
+def read_assignments(bundle_dir: str | Path) -> dict[tuple[int, str, str], tuple[str, str]]:
+    """
+    A bundle's assignments by natural key, (crn, building, room) ->
+    (date, start_time), as import_data.py plans them; exams without a CRN
+    are left out.
+    """
+    pa = _pyarrow()
+    bundle = Path(bundle_dir)
+    crns = dict(zip(*_columns(_read(pa, _find(bundle, "exams")), ["id", "crn"])))
+    ids, buildings, names = _columns(_read(pa, _find(bundle, "rooms")), ["id", "building", "name"])
+    rooms = {i: (b, n) for i, b, n in zip(ids, buildings, names)}
+    ids, dates, starts = _columns(_read(pa, _find(bundle, "timeslots")), ["id", "date", "start_time"])
+    slots = {i: (d, s) for i, d, s in zip(ids, dates, starts)}
+    return {
+        (crns[e], *rooms[r]): slots[t]
+        for e, r, t in zip(*_columns(_read(pa, _find(bundle, "assignments")), ["exam_id", "room_id", "timeslot_id"]))
+        if crns.get(e) is not None and r in rooms and t in slots
+    }
+
+
+def _key(natural, fallback):
+    return natural if natural is not None else fallback
+
+
+class BundleImport(NamedTuple):
+    version_id: int
+    assignments: int          # loaded
+    total_assignments: int    # in the bundle
+    skipped_students: int     # without person_id or email
+
+
+def import_version(
+    session: Session,
+    bundle_dir: str | Path,
+    version_name: Optional[str] = None,
+    upsert_entities: bool = True,
+) -> BundleImport:
+    """
+    Load a version bundle; returns the new ScheduleVersion id and what was loaded.
+
+    With upsert_entities=False only timeslots and assignments are loaded,
+    against the rooms and exams already in the database; assignments whose
+    room or exam is unknown are skipped. Otherwise missing rooms, exams,
+    students and enrollments are bulk-inserted first.
+    """
+    pa = _pyarrow()
+    bundle = Path(bundle_dir)
+    version_name = version_name or bundle_version_name(bundle) or bundle.name
+
+    def bulk_insert(model, rows: list[dict], always: bool = False) -> None:
+        if (upsert_entities or always) and rows:
+            session.execute(insert(model.__table__), rows)
+
+    # rooms: (building, name) -> id
+    t = _read(pa, _find(bundle, "rooms"))
+    ids, buildings, names, caps = _columns(t, ["id", "building", "name", "capacity"])
+    # bundles written before rooms had an availability flag
+    available = _columns(t, ["available"])[0] if "available" in t.column_names else [True] * len(ids)
+
+    def load_rooms():
+        return {(b, n): i for i, b, n in session.exec(select(Room.id, Room.building, Room.name)).all()}
+
+    db_rooms = load_rooms()
+    bulk_insert(Room, [
+        {"building": b, "name": n, "capacity": c, "available": a}
+        for b, n, c, a in zip(buildings, names, caps, available)
+        if (b, n) not in db_rooms
+    ])
+    db_rooms = load_rooms()
+    room_ids = {i: db_rooms[(b, n)] for i, b, n in zip(ids, buildings, names) if (b, n) in db_rooms}
+
+    # exams: CRN (or course_name when there is no CRN) -> id
+    t = _read(pa, _find(bundle, "exams"))
+    ids, *cols = _columns(t, ["id", *EXAM_COLUMNS])
+    rows = [dict(zip(EXAM_COLUMNS, values)) for values in zip(*cols)]
+
+    def load_exams():
+        return {
+            _key(crn, name): i
+            for i, crn, name in session.exec(select(Exam.id, Exam.crn, Exam.course_name)).all()
+        }
+
+    db_exams = load_exams()
+    bulk_insert(Exam, [r for r in rows if _key(r["crn"], r["course_name"]) not in db_exams])
+    db_exams = load_exams()
+    exam_ids = {
+        i: db_exams[k]
+        for i, r in zip(ids, rows)
+        if (k := _key(r["crn"], r["course_name"])) in db_exams
+    }
+
+    # timeslots: (date, start_time) -> id
+    t = _read(pa, _find(bundle, "timeslots"))
+    ids, dates, starts, ends = _columns(t, ["id", "date", "start_time", "end_time"])
+
+    def load_slots():
+        return {
+            (d, s): i
+            for i, d, s in session.exec(select(TimeSlot.id, TimeSlot.date, TimeSlot.start_time)).all()
+        }
+
+    db_slots = load_slots()
+    bulk_insert(TimeSlot, [
+        {"date": d, "start_time": s, "end_time": e}
+        for d, s, e in zip(dates, starts, ends)
+        if (d, s) not in db_slots
+    ], always=True)
+    db_slots = load_slots()
+    slot_ids = {i: db_slots[(d, s)] for i, d, s in zip(ids, dates, starts) if (d, s) in db_slots}
+
+    skipped_students = 0
+    if upsert_entities:
+        # students: person_id (or email) -> id
+        t = _read(pa, _find(bundle, "students"))
+        ids, person_ids, names, emails = _columns(t, ["id", "person_id", "name", "email"])
+        keyed = [(i, k, n, p, e) for i, p, n, e in zip(ids, person_ids, names, emails) if (k := _key(p, e)) is not None]
+        skipped_students = len(ids) - len(keyed)
+
+        def load_students():
+            return {
+                k: i
+                for i, pid, email in session.exec(select(Student.id, Student.person_id, Student.email)).all()
+                if (k := _key(pid, email)) is not None
+            }
+
+        db_students = load_students()
+        bulk_insert(Student, [
+            {"person_id": p, "name": n, "email": e}
+            for _, k, n, p, e in keyed
+            if k not in db_students
+        ])
+        db_students = load_students()
+        student_ids = {i: db_students[k] for i, k, *_ in keyed}
+
+        t = _read(pa, _find(bundle, "enrollments"))
+        existing = set(session.exec(select(StudentExam.student_id, StudentExam.exam_id)).all())
+        pairs = {
+            (student_ids[s], exam_ids[e])
+            for s, e in zip(*_columns(t, ["student_id", "exam_id"]))
+            if s in student_ids and e in exam_ids
+        } - existing
+        bulk_insert(StudentExam, [{"student_id": s, "exam_id": e} for s, e in pairs])
+
+    version = ScheduleVersion(name=version_name, active=True)
+    session.add(version)
+    session.flush()
+
+    t = _read(pa, _find(bundle, "assignments"))
+    rows = [
+        {"version_id": version.id, "exam_id": exam_ids[e], "room_id": room_ids[r], "timeslot_id": slot_ids[s]}
+        for e, r, s in zip(*_columns(t, ["exam_id", "room_id", "timeslot_id"]))
+        if e in exam_ids and r in room_ids and s in slot_ids
+    ]
+    if rows:
+        session.execute(insert(Schedule.__table__), rows)
+    session.flush()
+    # Core inserts bypass the ORM events that keep the occupancy index,
+    # enrollment cache, materialized analytics and search index current
+    revisions.record_external_write(session)
+    analytics_store.invalidate(session)
+    if upsert_entities:
+        search.rebuild(session)
+    return BundleImport(version.id, len(rows), t.num_rows, skipped_students)
@@ -1,49 +1,166 @@
+"""
+Database engines, one SQLite file per term.
+
+The current term lives in informs.db; past or future terms are imported
+into their own informs-<term>.db next to it. Every request is scoped to a
+single term through the optional ``term`` query parameter on get_session,
+so queries only ever touch the active term's rows.
+"""
+
+import os
+import re
+import threading
 from pathlib import Path
+from typing import Optional
 
-from sqlalchemy import text
+from fastapi import HTTPException, Query
+from sqlalchemy import Engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+DATA_DIR = Path(os.environ.get("INFORMS_DATA_DIR", Path(__file__).resolve().parent.parent))
+DB_PATH = DATA_DIR / "informs.db"
+DEFAULT_TERM = "current"
+TERM_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+_engines: dict[str, Engine] = {}
+_async_engines: dict[str, AsyncEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def term_db_path(term: Optional[str] = None) -> Path:
+    term = term or DEFAULT_TERM
+    if not TERM_PATTERN.match(term):
+        raise ValueError(f"Invalid term name {term!r}")
+    return DB_PATH if term == DEFAULT_TERM else DATA_DIR / f"informs-{term}.db"
+
+
+def list_terms() -> list[str]:
+    terms = [DEFAULT_TERM]
+    terms += sorted(p.stem.removeprefix("informs-") for p in DATA_DIR.glob("informs-*.db"))
+    return terms
+
+
+def get_engine(term: Optional[str] = None) -> Engine:
+    term = term or DEFAULT_TERM
+    with _engines_lock:
+        if term not in _engines:
+            _engines[term] = create_engine(f"sqlite:///{term_db_path(term)}", echo=False)
+        return _engines[term]
+
+
+def get_async_engine(term: Optional[str] = None) -> AsyncEngine:
+    term = term or DEFAULT_TERM
+    with _engines_lock:
+        if term not in _async_engines:
+            _async_engines[term] = create_async_engine(f"sqlite+aiosqlite:///{term_db_path(term)}", echo=False)
+        return _async_engines[term]
+
 
-DB_PATH = Path(__file__).resolve().parent.parent / "informs.db"
-engine = create_engine(f"sqlite:///{DB_PATH}", echo=False)
+engine = get_engine()
+
+
+def term_session(term: Optional[str] = None) -> Session:
+    """A session on a term's database; caches use session.info["term"] in their keys."""
+    term = term or DEFAULT_TERM
+    return Session(get_engine(term), info={"term": term})
+
+
+# Bump whenever a table or column is added. A database below this version
+# gets its missing columns and tables on first open; one at it costs a
+# single query, so startup and --reload stay cheap.
+SCHEMA_VERSION = 2
+
+# Columns added after their table was first created: (table, column, type)
+_ADDED_COLUMNS = [
+    ("student", "person_id", "INTEGER"),
+    ("exam", "crn", "INTEGER"),
+    ("exam", "subject", "TEXT"),
+    ("exam", "course_number", "TEXT"),
+    ("exam", "section", "TEXT"),
+    ("exam", "title", "TEXT"),
+    ("exam", "instructor", "TEXT"),
+    ("exam", "exam_type", "TEXT"),
+    ("room", "available", "BOOLEAN NOT NULL DEFAULT 1"),
+    ("schedule", "row_version", "INTEGER NOT NULL DEFAULT 1"),
+]
+
+
+def schema_version(conn) -> int:
+    """The version recorded in the database; 0 before the first migration."""
+    try:
+        return conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar() or 0
+    except OperationalError:
+        conn.rollback()
+        return 0
 
 
 def _migrate(conn):
     """Add new columns to existing tables without dropping data."""
-    migrations = [
-        ("student", "person_id", "INTEGER"),
-        ("exam", "crn", "INTEGER"),
-        ("exam", "subject", "TEXT"),
-        ("exam", "course_number", "TEXT"),
-        ("exam", "section", "TEXT"),
-        ("exam", "title", "TEXT"),
-        ("exam", "instructor", "TEXT"),
-        ("exam", "exam_type", "TEXT"),
-    ]
-    for table, column, col_type in migrations:
-        try:
+    columns: dict[str, set[str]] = {}
+    for table, column, col_type in _ADDED_COLUMNS:
+        if table not in columns:
+            columns[table] = {row[1] for row in conn.execute(text(f"PRAGMA table_info({table})"))}
+        # Missing tables are created with every column by create_all
+        if columns[table] and column not in columns[table]:
             conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}"))
-        except Exception:
-            pass  # column already exists
+            columns[table].add(column)
 
 
-def create_db_and_tables():
-    with engine.connect() as conn:
+def create_db_and_tables(term: Optional[str] = None) -> bool:
+    """Bring a term's database up to SCHEMA_VERSION; returns whether anything had to change."""
+    term_engine = get_engine(term)
+    with term_engine.connect() as conn:
+        if schema_version(conn) >= SCHEMA_VERSION:
+            return False
         _migrate(conn)
         conn.commit()
-    SQLModel.metadata.create_all(engine)
+
+    # Importing search loads app.models, which registers every table on the metadata
+    from .search import create_index
+    SQLModel.metadata.create_all(term_engine)
+    with term_engine.begin() as conn:
+        create_index(conn)
+        conn.execute(text("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)"))
+        conn.execute(text("DELETE FROM schema_version"))
+        conn.execute(text("INSERT INTO schema_version (version) VALUES (:v)"), {"v": SCHEMA_VERSION})
+    return True
+
+
+def _request_term(term: Optional[str]) -> str:
+    term = term or DEFAULT_TERM
+    if not TERM_PATTERN.match(term):
+        raise HTTPException(400, "Invalid term name")
+    if term != DEFAULT_TERM and not term_db_path(term).exists():
+        raise HTTPException(404, "Term not found")
+    return term
+
+
+def get_session(term: Optional[str] = Query(None, description="Term to read; defaults to the current term")):
+    term = _request_term(term)
+    with term_session(term) as session:
+        # begin now, so revisions notices writes from other processes before any cache is read
+        session.connection()
+        yield session
 
 
-def get_session():
-    with Session(engine) as session:
+async def get_async_session(term: Optional[str] = Query(None, description="Term to read; defaults to the current term")):
+    """Async counterpart of get_session for endpoints that shouldn't hold a threadpool worker."""
+    term = _request_term(term)
+    async with AsyncSession(get_async_engine(term), info={"term": term}) as session:
+        await session.connection()
         yield session
 
 
-def seed_data():
+def seed_data(term: Optional[str] = None) -> bool:
+    """Fill an empty term with demo rooms, exams and students; returns whether it did."""
     from .models import Exam, Room, Schedule, ScheduleVersion, Student, StudentExam, TimeSlot
 
-    with Session(engine) as session:
+    with term_session(term) as session:
         if session.exec(select(Room)).first():
-            return
+            return False
 
         rooms = [
             Room(name="Room 101", capacity=120, building="Science Hall"),
@@ -142,3 +259,4 @@ def seed_data():
             session.add(s)
 
         session.commit()
+    return True
@@ -0,0 +1,284 @@
+"""
+Ranked fixes for one student conflict, priced incrementally.
+
+Conflicts here are counted per student and pair of overlapping exams, so
+three mutually overlapping exams are three pairs where /schedules/conflicts
+reports one overlap group. The total only changes through the pairs an
+edit touches. The engine keeps each
+scheduled exam's span and, per exam, how many students it shares with every
+other scheduled exam, so moving exam X from span A to span B changes the
+total by
+
+    sum of shared[X][Z] over exams Z overlapping B  -  the same over A
+
+and a swap of X and Y by the two such sums, corrected for where X and Y end
+up relative to each other. Pricing a move walks X's row of shared counts
+instead of re-running conflict detection over the version; swap partners
+are priced together, from the rows of the exams near the conflict's slot.
+Room and instructor checks only run on the cheapest candidates, until a
+page is full.
+
+Candidates for a conflict's exams are
+
+  * moves - one exam to another feasible timeslot, into its own room if
+            that is free there and still feasible, else the smallest free
+            feasible room
+  * swaps - two exams trade timeslots (and rooms, when the other's room
+            fits and is free)
+
+skipping any that leave a seated exam without a room or put it against
+another seated exam of its instructor. A candidate is kept when the moved
+exam no longer overlaps the rest of the conflict, and resolves the conflict
+when no two of its exams overlap any more. Take-home and online exams keep
+their room.
+
+The shared counts depend only on enrollments, so they are kept per term
+and rebuilt when the term's revision moves (see revisions.py); an edit to
+the version only rebuilds the spans.
+"""
+
+import threading
+from collections import defaultdict
+from datetime import timedelta
+from itertools import permutations
+from typing import NamedTuple, Optional, Sequence
+
+from sqlmodel import Session, select
+
+from . import revisions
+from .database import DEFAULT_TERM
+from .feasibility import FeasibilityIndex, ROOMLESS_TYPES
+from .intervals import Span, exam_span, slot_bounds
+from .models import StudentExam
+from .occupancy import RoomOccupancyIndex
+from .readmodel import ExamInfo, SlotInfo
+
+
+class Placement(NamedTuple):
+    schedule_id: int
+    room_id: int
+    timeslot_id: int
+    row_version: int
+
+
+def _overlap(a: Span, b: Span) -> bool:
+    return a[0] < b[1] and b[0] < a[1]
+
+
+def shared_counts(enrollments: Sequence[tuple[int, int]]) -> dict[int, dict[int, int]]:
+    """exam -> {other exam: students enrolled in both}, from (student_id, exam_id) rows."""
+    by_student: dict[int, set[int]] = defaultdict(set)
+    for sid, eid in enrollments:
+        by_student[sid].add(eid)
+    shared: dict[int, dict[int, int]] = defaultdict(dict)
+    for eids in by_student.values():
+        for a, b in permutations(eids, 2):
+            row = shared[a]
+            row[b] = row.get(b, 0) + 1
+    return dict(shared)
+
+
+class DeltaEngine:
+    def __init__(
+        self,
+        assignments: Sequence[tuple[int, int, int, int, int]],
+        shared: dict[int, dict[int, int]],
+        exams: Sequence[ExamInfo],
+        timeslots: Sequence[SlotInfo],
+    ):
+        """assignments are (schedule_id, exam_id, room_id, timeslot_id, row_version) in id order."""
+        self.slots = {t.id: b for t in sorted(timeslots, key=lambda t: (t.date, t.start_time, t.id)) if (b := slot_bounds(t))}
+        self.exams = {e.id: e for e in exams}
+        # last assignment wins, as elsewhere
+        self.placed = {eid: Placement(sid, rid, tid, rv) for sid, eid, rid, tid, rv in assignments if tid in self.slots}
+        self.spans = {eid: self.span_at(eid, p.timeslot_id) for eid, p in self.placed.items()}
+        self.shared = shared
+        # the longest an exam with its own duration runs, from any slot start
+        self.longest = max(
+            (timedelta(minutes=e.duration_minutes) for eid in self.placed
+             if (e := self.exams.get(eid)) and e.duration_minutes and e.duration_minutes > 0),
+            default=timedelta(0),
+        )
+
+        self.teaching: dict[str, list[int]] = defaultdict(list)
+        for eid in self.placed:
+            e = self.exams.get(eid)
+            if e and e.instructor and e.exam_type not in ROOMLESS_TYPES:
+                self.teaching[e.instructor].append(eid)
+        self.load = {eid: self._load(eid, span) for eid, span in self.spans.items()}
+        self.total = sum(self.load.values()) // 2
+
+    def span_at(self, exam_id: int, timeslot_id: int) -> Span:
+        e = self.exams.get(exam_id)
+        return exam_span(self.slots[timeslot_id], e.duration_minutes if e else None)
+
+    def _load(self, exam_id: int, span: Span, moved: Optional[dict[int, Span]] = None) -> int:
+        """Students exam_id would share with exams overlapping span, with moved exams at their new spans."""
+        total = 0
+        for other, n in self.shared.get(exam_id, {}).items():
+            at = moved.get(other) if moved and other in moved else self.spans.get(other)
+            if at and _overlap(span, at):
+                total += n
+        return total
+
+    def _clashes(self, exam_id: int, span: Span, moved: dict[int, Span]) -> bool:
+        """Whether a seated exam at span would overlap another seated exam of its instructor."""
+        e = self.exams.get(exam_id)
+        if not e or not e.instructor or e.exam_type in ROOMLESS_TYPES:
+            return False
+        sitting = (e.title or "").strip().upper() or exam_id
+        for other in self.teaching.get(e.instructor, ()):
+            if other == exam_id:
+                continue
+            o = self.exams[other]
+            at = moved.get(other, self.spans[other])
+            if ((o.title or "").strip().upper() or other) != sitting and _overlap(span, at):
+                return True
+        return False
+
+    def _room(
+        self, exam_id: int, span: Span, prefer: Sequence[int], vacating: set[int],
+        feasible: FeasibilityIndex, index: RoomOccupancyIndex,
+    ) -> Optional[int]:
+        """A room for exam_id at span: the first preferred one that works, else the smallest; None if none is free."""
+        if not feasible.needs_seats(exam_id):
+            return self.placed[exam_id].room_id
+
+        def free(rid: int) -> bool:
+            return all(o.schedule_id in vacating for o in index.overlapping(rid, *span))
+
+        for rid in prefer:
+            if feasible.room_ok(exam_id, rid) and free(rid):
+                return rid
+        return next((rid for rid in feasible.rooms(exam_id) if free(rid)), None)
+
+    def _loads_at(self, timeslot_id: int) -> tuple[dict[int, int], dict[int, Span]]:
+        """Every placed exam's load and span if it sat at timeslot_id, everything else where it is."""
+        start, end = self.slots[timeslot_id]
+        reach = start + max(self.longest, end - start)  # latest end of any exam placed here
+        near = [(z, span) for z, span in self.spans.items() if span[0] < reach and start < span[1]]
+        at: dict[int, Span] = {}
+        loads: dict[int, int] = defaultdict(int)
+        for z, (z_start, z_end) in near:
+            for y, n in self.shared.get(z, {}).items():
+                if y == z or y not in self.spans:
+                    continue
+                span = at.get(y)
+                if span is None:
+                    span = at[y] = self.span_at(y, timeslot_id)
+                if z_start < span[1] and span[0] < z_end:
+                    loads[y] += n
+        return loads, at
+
+    def explain(
+        self, group: list[int], feasible: FeasibilityIndex, index: RoomOccupancyIndex,
+        swaps: bool = True, limit: int = 10,
+    ) -> tuple[list[dict], int]:
+        """
+        The cheapest `limit` moves and swaps that take an exam out of the
+        conflict, with their net change in overlapping pairs, and how many
+        were priced. Room and instructor checks only run on the cheapest.
+        """
+
+        def outcome(x: int, span: Span) -> Optional[bool]:
+            """None if x at span still overlaps the rest of the conflict, else whether the conflict is gone."""
+            rest = [e for e in group if e != x]
+            if any(_overlap(span, self.spans[o]) for o in rest):
+                return None
+            return not any(_overlap(self.spans[a], self.spans[b]) for i, a in enumerate(rest) for b in rest[i + 1:])
+
+        by_slot: dict[int, list[int]] = defaultdict(list)
+        if swaps:
+            for eid, p in self.placed.items():
+                by_slot[p.timeslot_id].append(eid)
+        at_slot: dict[int, tuple[dict[int, int], dict[int, Span]]] = {}
+
+        # (not resolves, delta, exams moved, x, its timeslot_id, y or 0, its timeslot_id or 0); flat
+        # tuples of ints, as there are thousands per call
+        priced = []
+        for x in group:
+            here = self.placed[x]
+            if swaps and here.timeslot_id not in at_slot:
+                at_slot[here.timeslot_id] = self._loads_at(here.timeslot_id)
+            # x's load in every slot it may take, with everything else where it is
+            loads = {tid: self._load(x, self.span_at(x, tid)) for tid in feasible.slots(x) if tid in self.slots}
+            for tid, load in loads.items():
+                if tid == here.timeslot_id:
+                    continue
+                x_span = self.span_at(x, tid)
+                resolves = outcome(x, x_span)
+                if resolves is None:
+                    continue
+                priced.append((not resolves, load - self.load[x], 1, x, tid, 0, 0))
+                if not swaps:
+                    continue
+                # y takes x's slot: its load there counted x where it is now, and x's
+                # load at tid counted y where it is now; the pair terms fix both up
+                there_loads, there_spans = at_slot[here.timeslot_id]
+                for y in by_slot.get(tid, ()):
+                    if y in group or not feasible.slot_ok(y, here.timeslot_id):
+                        continue
+                    y_span = there_spans.get(y) or self.span_at(y, here.timeslot_id)
+                    pair = self.shared.get(x, {}).get(y, 0)
+                    after = load + there_loads.get(y, 0)
+                    if pair:
+                        after += pair * (
+                            _overlap(x_span, y_span) - _overlap(x_span, self.spans[y]) - _overlap(y_span, self.spans[x])
+                        )
+                    before = self.load[x] + self.load[y] - pair * _overlap(self.spans[x], self.spans[y])
+                    priced.append((not resolves, after - before, 2, x, tid, y, here.timeslot_id))
+
+        priced.sort(key=lambda c: c[:3])
+        page = []
+        for unresolved, delta, size, x, x_tid, y, y_tid in priced:
+            changes = ((x, x_tid),) if size == 1 else ((x, x_tid), (y, y_tid))
+            rooms = self._placeable(changes, feasible, index)
+            if rooms is None:
+                continue
+            page.append({
+                "kind": "move" if len(changes) == 1 else "swap",
+                "delta": delta,
+                "resolves": not unresolved,
+                "changes": [(e, r, t) for (e, t), r in zip(changes, rooms)],
+            })
+            if len(page) == limit:
+                break
+        return page, len(priced)
+
+    def _placeable(
+        self, changes: Sequence[tuple[int, int]], feasible: FeasibilityIndex, index: RoomOccupancyIndex,
+    ) -> Optional[list[int]]:
+        """Rooms for each (exam, timeslot_id) change, or None if one clashes with its instructor or has no room."""
+        moved = {e: self.span_at(e, t) for e, t in changes}
+        if any(self._clashes(e, span, moved) for e, span in moved.items()):
+            return None
+        vacating = {self.placed[e].schedule_id for e in moved}
+        order = list(moved)
+        rooms = []
+        for i, e in enumerate(order):
+            # the room of the exam whose slot it takes first, then its own
+            prefer = [self.placed[o].room_id for o in order[i + 1:] + order[:i + 1]]
+            room = self._room(e, moved[e], prefer, vacating, feasible, index)
+            if room is None:
+                return None
+            rooms.append(room)
+        return rooms
+
+
+# --- Per-term cache ---
+
+_lock = threading.Lock()
+_shared: dict[str, tuple[int, dict[int, dict[int, int]]]] = {}  # term -> (term revision, shared counts)
+
+
+def get_shared(session: Session) -> dict[int, dict[int, int]]:
+    term = session.info.get("term", DEFAULT_TERM)
+    revision = revisions.term_revision(session)
+    with _lock:
+        cached = _shared.get(term)
+    if cached is not None and cached[0] == revision:
+        return cached[1]
+    shared = shared_counts(session.exec(select(StudentExam.student_id, StudentExam.exam_id)).all())
+    with _lock:
+        _shared[term] = (revision, shared)
+    return shared
@@ -0,0 +1,158 @@
+"""
+Per-exam feasibility of rooms and timeslots, precomputed as bitsets.
+
+For each exam the index holds two ints: bit i of its room mask is set when
+room i may hold the exam, bit j of its slot mask when timeslot j may. A
+check is then a shift and an AND instead of re-filtering lists per call.
+
+  * rooms     - available to schedule (ClassInfo AVAILABLE_TO_SCHEDULE) and
+                seating the exam's students. Take-home and online exams
+                need no seats, so every available room is feasible for them.
+  * timeslots - not on a blackout date of the exam's instructor. "No Final
+                Exam" exams have no feasible slot at all.
+
+Room bits are assigned in capacity order, so "seats at least N" is the run
+of bits from the first fitting room upwards, found with one bisect.
+
+Indexes are built lazily per term and rebuilt when the term's revision
+moves (see revisions.py), i.e. on any committed write to exams, rooms,
+timeslots or instructor blackouts.
+"""
+
+import bisect
+import threading
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from sqlmodel import Session, select
+
+from . import readmodel, revisions
+from .database import DEFAULT_TERM
+from .models import InstructorBlackout
+from .readmodel import ExamInfo, RoomInfo, SlotInfo
+
+NO_EXAM = "No Final Exam"
+ROOMLESS_TYPES = frozenset({"Take-Home Exam", "Scheduled Online Final Exam"})
+
+
+def _bits(mask: int) -> Iterable[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class FeasibilityIndex:
+    def __init__(
+        self,
+        exams: list[ExamInfo],
+        rooms: list[RoomInfo],
+        timeslots: list[SlotInfo],
+        blackouts: list[tuple[str, str]],
+    ):
+        ordered = sorted(rooms, key=lambda r: (r.capacity, r.id))
+        self.room_ids: list[int] = [r.id for r in ordered]
+        self._room_bit = {rid: i for i, rid in enumerate(self.room_ids)}
+        self._capacities = [r.capacity for r in ordered]
+        self.available_rooms = sum(1 << i for i, r in enumerate(ordered) if r.available)
+
+        slots = sorted(timeslots, key=lambda t: (t.date, t.start_time, t.id))
+        self.slot_ids: list[int] = [t.id for t in slots]
+        self._slot_bit = {tid: i for i, tid in enumerate(self.slot_ids)}
+        all_slots = (1 << len(slots)) - 1
+        on_date: dict[str, int] = defaultdict(int)
+        for i, t in enumerate(slots):
+            on_date[t.date] |= 1 << i
+        blocked: dict[str, int] = defaultdict(int)
+        for instructor, day in blackouts:
+            blocked[instructor] |= on_date.get(day, 0)
+
+        self._rooms: dict[int, int] = {}
+        self._slots: dict[int, int] = {}
+        self._sizes: dict[int, int] = {}
+        self._types: dict[int, Optional[str]] = {}
+        self._blocked: dict[int, int] = {}
+        for e in exams:
+            self._types[e.id] = e.exam_type
+            self._sizes[e.id] = e.student_count
+            self._blocked[e.id] = blocked.get(e.instructor, 0) if e.instructor else 0
+            if e.exam_type == NO_EXAM:
+                self._rooms[e.id] = self._slots[e.id] = 0
+                continue
+            self._slots[e.id] = all_slots & ~self._blocked[e.id]
+            self._rooms[e.id] = self.available_rooms & ~((1 << self._first_fitting(e)) - 1)
+
+    def _first_fitting(self, exam: ExamInfo) -> int:
+        if exam.exam_type in ROOMLESS_TYPES:
+            return 0
+        return bisect.bisect_left(self._capacities, exam.student_count)
+
+    # --- checks ---
+
+    def room_ok(self, exam_id: int, room_id: int) -> bool:
+        bit = self._room_bit.get(room_id)
+        return bit is not None and (self._rooms.get(exam_id, 0) >> bit) & 1 == 1
+
+    def slot_ok(self, exam_id: int, timeslot_id: int) -> bool:
+        bit = self._slot_bit.get(timeslot_id)
+        return bit is not None and (self._slots.get(exam_id, 0) >> bit) & 1 == 1
+
+    def needs_seats(self, exam_id: int) -> bool:
+        return self._types.get(exam_id) not in ROOMLESS_TYPES
+
+    def rooms(self, exam_id: int) -> list[int]:
+        """Feasible room ids, smallest first."""
+        return [self.room_ids[i] for i in _bits(self._rooms.get(exam_id, 0))]
+
+    def slots(self, exam_id: int) -> list[int]:
+        """Feasible timeslot ids, in date/time order."""
+        return [self.slot_ids[i] for i in _bits(self._slots.get(exam_id, 0))]
+
+    def fallback_rooms(self) -> list[int]:
+        """Available room ids, largest first, for exams no room can seat."""
+        return [self.room_ids[i] for i in reversed(list(_bits(self.available_rooms)))]
+
+    def violations(self, exam_id: int, room_id: int, timeslot_id: int) -> list[str]:
+        """Why an assignment is infeasible; empty when it isn't."""
+        if exam_id not in self._types:
+            return ["unknown exam"]
+        if self._types[exam_id] == NO_EXAM:
+            return ["exam has no final"]
+        reasons = []
+        room_bit = self._room_bit.get(room_id)
+        if room_bit is None:
+            reasons.append("unknown room")
+        elif not (self.available_rooms >> room_bit) & 1:
+            reasons.append("room not available to schedule")
+        elif self.needs_seats(exam_id) and self._capacities[room_bit] < self._sizes[exam_id]:
+            reasons.append("room too small")
+        slot_bit = self._slot_bit.get(timeslot_id)
+        if slot_bit is None:
+            reasons.append("unknown timeslot")
+        elif (self._blocked[exam_id] >> slot_bit) & 1:
+            reasons.append("instructor blackout date")
+        return reasons
+
+
+# --- Per-term cache ---
+
+_lock = threading.Lock()
+_indexes: dict[str, tuple[int, FeasibilityIndex]] = {}  # term -> (term revision, index)
+
+
+def get_index(session: Session) -> FeasibilityIndex:
+    term = session.info.get("term", DEFAULT_TERM)
+    revision = revisions.term_revision(session)
+    with _lock:
+        cached = _indexes.get(term)
+    if cached is not None and cached[0] == revision:
+        return cached[1]
+    index = FeasibilityIndex(
+        readmodel.load(session, ExamInfo),
+        readmodel.load(session, RoomInfo),
+        readmodel.load(session, SlotInfo),
+        session.exec(select(InstructorBlackout.instructor, InstructorBlackout.date)).all(),
+    )
+    with _lock:
+        _indexes[term] = (revision, index)
+    return index
@@ -0,0 +1,112 @@
+"""
+Per-(date, slot) pressure heatmap of a schedule version.
+
+Everything is computed in one vectorized pass with numpy: assignments and
+enrollments become int arrays indexed by a dense timeslot position, so the
+per-cell totals are a handful of ``bincount`` calls and a single ``unique``
+over (student, cell) keys.
+
+  * exams, seats  - assignments and their students per cell
+  * capacity      - capacity of the rooms assigned in the cell
+  * conflicts     - students with two or more exams in the same cell
+  * back_to_back  - students with an exam in this cell and in the next or
+                    previous slot of the same day
+"""
+
+from itertools import chain
+from typing import Sequence
+
+import numpy as np
+
+from .readmodel import SlotInfo
+
+
+def _columns(rows: Sequence[Sequence[int]], width: int) -> np.ndarray:
+    """Rows of ints as a (width, len(rows)) array; flattening first avoids numpy's slow per-row path."""
+    flat = np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=len(rows) * width)
+    return flat.reshape(-1, width).T
+
+
+def compute_heatmap(
+    timeslots: Sequence[SlotInfo],
+    assignments: Sequence[tuple[int, int, int]],
+    exam_sizes: Sequence[tuple[int, int]],
+    room_capacities: Sequence[tuple[int, int]],
+    enrollments: Sequence[tuple[int, int]],
+) -> dict:
+    """
+    assignments are (exam_id, room_id, timeslot_id), exam_sizes (exam_id,
+    student_count), room_capacities (room_id, capacity) and enrollments
+    (student_id, exam_id).
+    """
+    slots = sorted(timeslots, key=lambda t: (t.date, t.start_time, t.end_time, t.id))
+    n = len(slots)
+    cell_of = {t.id: i for i, t in enumerate(slots)}
+    days = np.unique([t.date for t in slots], return_inverse=True)[1] if n else np.zeros(0, dtype=np.int64)
+    # position of each cell within its day: cells are sorted, so it's the
+    # distance from the first cell of the same day
+    first = np.searchsorted(days, days) if n else days
+    position = np.arange(n) - first
+
+    def lookup(pairs: Sequence[tuple[int, int]]) -> np.ndarray:
+        keys, values = _columns(pairs, 2)
+        table = np.zeros(int(keys.max(initial=0)) + 1, dtype=np.int64)
+        table[keys] = values
+        return table
+
+    sizes = lookup(exam_sizes)
+    capacities = lookup(room_capacities)
+
+    # assignments can outlive a deleted exam or room; skip them like the other analytics do
+    exam_ids = {e for e, _ in exam_sizes}
+    room_ids = {r for r, _ in room_capacities}
+    rows = [(e, r, cell_of[t]) for e, r, t in assignments if t in cell_of and e in exam_ids and r in room_ids]
+    a_exam, a_room, a_cell = _columns(rows, 3)
+    exams = np.bincount(a_cell, minlength=n)
+    seats = np.bincount(a_cell, weights=sizes[a_exam], minlength=n)
+    capacity = np.bincount(a_cell, weights=capacities[a_room], minlength=n)
+
+    # exam id -> cell (-1 when unscheduled); last assignment wins, as elsewhere
+    exam_cell = np.full(max(len(sizes), int(a_exam.max(initial=0)) + 1), -1, dtype=np.int64)
+    exam_cell[a_exam] = a_cell
+
+    conflicts = np.zeros(n, dtype=np.int64)
+    back_to_back = np.zeros(n, dtype=np.int64)
+    if enrollments and n:
+        e_student, e_exam = _columns(enrollments, 2)
+        in_range = e_exam < len(exam_cell)
+        e_student, e_exam = e_student[in_range], e_exam[in_range]
+        e_cell = exam_cell[e_exam]
+        scheduled = e_cell >= 0
+        keys, counts = np.unique(e_student[scheduled] * n + e_cell[scheduled], return_counts=True)
+        student, cell = keys // n, keys % n
+        conflicts = np.bincount(cell[counts > 1], minlength=n)
+
+        # keys are sorted by (student, cell), so each student's cells are adjacent
+        adjacent = (
+            (student[1:] == student[:-1])
+            & (days[cell[1:]] == days[cell[:-1]])
+            & (position[cell[1:]] == position[cell[:-1]] + 1)
+        )
+        flagged = np.zeros(len(keys), dtype=bool)
+        flagged[1:] |= adjacent
+        flagged[:-1] |= adjacent
+        back_to_back = np.bincount(cell[flagged], minlength=n)
+
+    return {
+        "total_capacity": int(capacities.sum()),
+        "cells": [
+            {
+                "timeslot_id": t.id,
+                "date": t.date,
+                "start_time": t.start_time,
+                "end_time": t.end_time,
+                "exams": int(exams[i]),
+                "seats": int(seats[i]),
+                "capacity": int(capacity[i]),
+                "conflicts": int(conflicts[i]),
+                "back_to_back": int(back_to_back[i]),
+            }
+            for i, t in enumerate(slots)
+        ],
+    }
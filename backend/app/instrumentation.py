@@ -0,0 +1,302 @@
+"""
+Per-request timing, SQL statement counts and sampled profiles.
+
+Routers are created with ``route_class=InstrumentedRoute``. Each request
+gets a RequestStats in a context variable (copied into the threadpool that
+runs sync endpoints), SQLAlchemy engine events add every statement's count
+and time to it, and the totals are
+
+  * returned as a ``Server-Timing`` header (app, db and query count), and
+  * aggregated per (method, route template, status) for ``/metrics``.
+
+``/metrics`` also carries the time spent in INSERT/UPDATE/DELETE statements
+(which is where a request waits on SQLite's write lock), a count of
+"database is locked" errors, and the process's resident memory, for load
+and soak runs (benchmarks/load.py).
+
+Setting INFORMS_PROFILE_SAMPLE to a rate in [0, 1] profiles that fraction of
+requests with cProfile (or pyinstrument when INFORMS_PROFILER=pyinstrument
+and it is installed) and writes the dumps to INFORMS_PROFILE_DIR.
+"""
+
+import cProfile
+import functools
+import inspect
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+from fastapi import HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from sqlalchemy import Engine, event
+
+from .database import DATA_DIR
+
+PROFILE_SAMPLE = float(os.environ.get("INFORMS_PROFILE_SAMPLE", "0"))
+PROFILE_DIR = Path(os.environ.get("INFORMS_PROFILE_DIR", DATA_DIR / "profiles"))
+PROFILER = os.environ.get("INFORMS_PROFILER", "cprofile")
+
+_WRITES = ("INSERT", "UPDATE", "DELETE")
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+    write_seconds: float = 0.0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("informs_request_stats", default=None)
+
+
+# --- SQL statement accounting ---
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    starts = conn.info.get("query_start")
+    if stats is None or not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    stats.queries += 1
+    stats.db_seconds += elapsed
+    if statement.lstrip()[:6].upper() in _WRITES:
+        stats.write_seconds += elapsed
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    global _locked_errors
+    conn = context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+    if "database is locked" in str(context.original_exception):
+        with _metrics_lock:
+            _locked_errors += 1
+
+
+# --- Aggregated metrics ---
+
+
+@dataclass
+class RouteMetrics:
+    count: int = 0
+    seconds: float = 0.0
+    queries: int = 0
+    db_seconds: float = 0.0
+    write_seconds: float = 0.0
+    buckets: list[int] = field(default_factory=lambda: [0] * len(BUCKETS))
+
+
+_metrics_lock = threading.Lock()
+_metrics: dict[tuple[str, str, int], RouteMetrics] = {}
+_locked_errors = 0
+
+
+def record(method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+    with _metrics_lock:
+        m = _metrics.setdefault((method, route, status), RouteMetrics())
+        m.count += 1
+        m.seconds += seconds
+        m.queries += stats.queries
+        m.db_seconds += stats.db_seconds
+        m.write_seconds += stats.write_seconds
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                m.buckets[i] += 1
+
+
+def render_prometheus() -> str:
+    """All recorded metrics in the Prometheus text exposition format."""
+    with _metrics_lock:
+        snapshot = {k: RouteMetrics(v.count, v.seconds, v.queries, v.db_seconds, v.write_seconds, list(v.buckets))
+                    for k, v in _metrics.items()}
+        locked = _locked_errors
+    out = [
+        "# HELP informs_http_requests_total Requests handled, by route template and status.",
+        "# TYPE informs_http_requests_total counter",
+    ]
+    for (method, route, status), m in sorted(snapshot.items()):
+        out.append(f'informs_http_requests_total{{method="{method}",route="{route}",status="{status}"}} {m.count}')
+
+    out += [
+        "# HELP informs_http_request_duration_seconds Time spent in the endpoint.",
+        "# TYPE informs_http_request_duration_seconds histogram",
+    ]
+    for (method, route, status), m in sorted(snapshot.items()):
+        labels = f'method="{method}",route="{route}",status="{status}"'
+        for bound, n in zip(BUCKETS, m.buckets):
+            out.append(f'informs_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {n}')
+        out.append(f'informs_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {m.count}')
+        out.append(f"informs_http_request_duration_seconds_sum{{{labels}}} {m.seconds:.6f}")
+        out.append(f"informs_http_request_duration_seconds_count{{{labels}}} {m.count}")
+
+    out += [
+        "# HELP informs_db_queries_total SQL statements executed while handling requests.",
+        "# TYPE informs_db_queries_total counter",
+    ]
+    for (method, route, status), m in sorted(snapshot.items()):
+        out.append(f'informs_db_queries_total{{method="{method}",route="{route}",status="{status}"}} {m.queries}')
+
+    out += [
+        "# HELP informs_db_duration_seconds_total Time spent executing SQL while handling requests.",
+        "# TYPE informs_db_duration_seconds_total counter",
+    ]
+    for (method, route, status), m in sorted(snapshot.items()):
+        out.append(
+            f'informs_db_duration_seconds_total{{method="{method}",route="{route}",status="{status}"}} '
+            f"{m.db_seconds:.6f}"
+        )
+
+    out += [
+        "# HELP informs_db_write_seconds_total Time spent in INSERT/UPDATE/DELETE, including SQLite write-lock waits.",
+        "# TYPE informs_db_write_seconds_total counter",
+    ]
+    for (method, route, status), m in sorted(snapshot.items()):
+        out.append(
+            f'informs_db_write_seconds_total{{method="{method}",route="{route}",status="{status}"}} '
+            f"{m.write_seconds:.6f}"
+        )
+
+    out += [
+        '# HELP informs_db_locked_total SQL statements that failed with "database is locked".',
+        "# TYPE informs_db_locked_total counter",
+        f"informs_db_locked_total {locked}",
+    ]
+    rss = _resident_bytes()
+    if rss is not None:
+        out += [
+            "# HELP informs_process_resident_memory_bytes Resident memory of the server process.",
+            "# TYPE informs_process_resident_memory_bytes gauge",
+            f"informs_process_resident_memory_bytes {rss}",
+        ]
+    return "\n".join(out) + "\n"
+
+
+def _resident_bytes() -> Optional[int]:
+    """Current RSS from /proc (Linux); None elsewhere."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# --- Sampled profiling ---
+
+
+def _profile_path(name: str, ext: str) -> Path:
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    return PROFILE_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{name}-{random.randrange(16**6):06x}.{ext}"
+
+
+class _Profiler:
+    def __init__(self, name: str):
+        self.name = name
+        self.pyinstrument = None
+        if PROFILER == "pyinstrument":
+            try:
+                import pyinstrument
+                self.pyinstrument = pyinstrument.Profiler()
+            except ImportError:
+                pass
+        self.cprofile = None if self.pyinstrument else cProfile.Profile()
+
+    def __enter__(self):
+        if self.pyinstrument:
+            self.pyinstrument.start()
+        else:
+            self.cprofile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if self.pyinstrument:
+            self.pyinstrument.stop()
+            _profile_path(self.name, "html").write_text(self.pyinstrument.output_html())
+        else:
+            self.cprofile.disable()
+            self.cprofile.dump_stats(_profile_path(self.name, "prof"))
+
+
+def _profiled(endpoint: Callable) -> Callable:
+    """Wrap an endpoint so a sampled fraction of calls run under a profiler."""
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            if random.random() >= PROFILE_SAMPLE:
+                return await endpoint(*args, **kwargs)
+            with _Profiler(endpoint.__name__):
+                return await endpoint(*args, **kwargs)
+        async_wrapper._profiled = True
+        return async_wrapper
+
+    # Sync endpoints run in the threadpool; profiling inside the wrapper
+    # captures that worker thread rather than the event loop.
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        if random.random() >= PROFILE_SAMPLE:
+            return endpoint(*args, **kwargs)
+        with _Profiler(endpoint.__name__):
+            return endpoint(*args, **kwargs)
+    wrapper._profiled = True
+    return wrapper
+
+
+# --- Route class ---
+
+
+def _server_timing(seconds: float, stats: RequestStats) -> str:
+    return (
+        f"app;dur={seconds * 1000:.2f}, "
+        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.queries} queries"'
+    )
+
+
+class InstrumentedRoute(APIRoute):
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        # include_router rebuilds routes from route.endpoint, so wrap only once
+        if PROFILE_SAMPLE > 0 and not getattr(endpoint, "_profiled", False):
+            endpoint = _profiled(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        route = self.path_format
+
+        async def instrumented_handler(request: Request) -> Response:
+            stats = RequestStats()
+            token = _current.set(stats)
+            start = time.perf_counter()
+            status = 500
+            try:
+                response = await handler(request)
+                status = response.status_code
+                response.headers["Server-Timing"] = _server_timing(time.perf_counter() - start, stats)
+                return response
+            except HTTPException as e:
+                status = e.status_code
+                raise
+            except RequestValidationError:
+                status = 422
+                raise
+            finally:
+                record(request.method, route, status, time.perf_counter() - start, stats)
+                _current.reset(token)
+
+        return instrumented_handler
+
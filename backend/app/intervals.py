@@ -0,0 +1,102 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, Optional, Union
+
+from .models import TimeSlot
+from .readmodel import SlotInfo
+
+Span = tuple[datetime, datetime]
+
+
+def parse_slot_time(date: str, time: str) -> Optional[datetime]:
+    """Combine a TimeSlot date (YYYY-MM-DD) and time (HH:MM) into a datetime."""
+    try:
+        return datetime.strptime(f"{date} {time}", "%Y-%m-%d %H:%M")
+    except (TypeError, ValueError):
+        return None
+
+
+def slot_bounds(ts: Union[TimeSlot, SlotInfo]) -> Optional[Span]:
+    """Return the [start, end) range of a timeslot, or None if it can't be parsed."""
+    start = parse_slot_time(ts.date, ts.start_time)
+    end = parse_slot_time(ts.date, ts.end_time)
+    if start is None or end is None or end <= start:
+        return None
+    return start, end
+
+
+def exam_span(bounds: Span, duration_minutes: Optional[int]) -> Span:
+    """An exam runs from its slot's start for its own duration (or to the slot end if unset)."""
+    start, end = bounds
+    if duration_minutes and duration_minutes > 0:
+        return start, start + timedelta(minutes=duration_minutes)
+    return start, end
+
+
+def scheduled_spans(
+    exam_to_ts: dict[int, int],
+    slot_map: dict[int, Span],
+    durations: dict[int, int],
+) -> dict[int, Span]:
+    """exam_id -> [start, end) for every scheduled exam whose timeslot parses."""
+    spans = {}
+    for eid, tsid in exam_to_ts.items():
+        bounds = slot_map.get(tsid)
+        if bounds:
+            spans[eid] = exam_span(bounds, durations.get(eid))
+    return spans
+
+
+def overlap_groups(items: Iterable[tuple[datetime, datetime, int]]) -> Iterator[list[int]]:
+    """
+    Sweep-line over (start, end, id) intervals sorted by start.
+
+    Yields the ids of each run of intervals chained together by overlap
+    (touching end == start does not count). Runs of one are skipped.
+    """
+    group: list[int] = []
+    group_end: Optional[datetime] = None
+    for start, end, item_id in sorted(items):
+        if group_end is not None and start < group_end:
+            group.append(item_id)
+            group_end = max(group_end, end)
+            continue
+        if len(group) > 1:
+            yield group
+        group = [item_id]
+        group_end = end
+    if len(group) > 1:
+        yield group
+
+
+def student_conflicts(
+    student_exams: dict[int, list[int]],
+    spans: dict[int, Span],
+) -> Iterator[tuple[int, list[int]]]:
+    """Yield (student_id, overlapping exam_ids) for every overlap group, O(E log E) per student."""
+    for sid, eids in student_exams.items():
+        items = [(*spans[eid], eid) for eid in set(eids) if eid in spans]
+        if len(items) < 2:
+            continue
+        for group in overlap_groups(items):
+            yield sid, group
+
+
+def busy_spans(
+    student_ids: Iterable[int],
+    student_exams: dict[int, list[int]],
+    spans: dict[int, Span],
+    exclude_exam: Optional[int] = None,
+) -> dict[int, list[Span]]:
+    """student_id -> spans of their scheduled exams (optionally leaving one exam out)."""
+    busy: dict[int, list[Span]] = defaultdict(list)
+    for sid in student_ids:
+        for eid in student_exams.get(sid, ()):
+            if eid != exclude_exam and eid in spans:
+                busy[sid].append(spans[eid])
+    return busy
+
+
+def overlaps(span: Span, others: Iterable[Span]) -> bool:
+    start, end = span
+    return any(s < end and start < e for s, e in others)
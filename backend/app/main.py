@@ -3,15 +3,18 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .database import create_db_and_tables, seed_data
-from .routers import exams, rooms, schedules
+from . import workers
+from .database import create_db_and_tables
+from .routers import exams, exports, history, metrics, rooms, schedules, search, terms
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # A single schema-version query once the database is current; demo data
+    # is loaded explicitly with seed_data.py
     create_db_and_tables()
-    seed_data()
     yield
+    workers.shutdown()
 
 
 app = FastAPI(title="InForms", lifespan=lifespan)
@@ -26,3 +29,8 @@ app.add_middleware(
 app.include_router(rooms.router)
 app.include_router(exams.router)
 app.include_router(schedules.router)
+app.include_router(history.router)
+app.include_router(exports.router)
+app.include_router(terms.router)
+app.include_router(search.router)
+app.include_router(metrics.router)
@@ -1,5 +1,6 @@
 from typing import Optional
 
+from sqlalchemy import Column, Integer
 from sqlmodel import Field, SQLModel
 
 
@@ -8,12 +9,14 @@ class Room(SQLModel, table=True):
     name: str
     capacity: int
     building: str
+    available: bool = True   # ClassInfo AVAILABLE_TO_SCHEDULE
 
 
 class RoomCreate(SQLModel):
     name: str
     capacity: int
     building: str
+    available: bool = True
 
 
 class Exam(SQLModel, table=True):
@@ -38,6 +41,7 @@ class ExamCreate(SQLModel):
     section: Optional[str] = None
     title: Optional[str] = None
     instructor: Optional[str] = None
+    exam_type: Optional[str] = None
     student_count: int
     duration_minutes: int
 
@@ -55,6 +59,20 @@ class TimeSlotCreate(SQLModel):
     date: str
 
 
+class InstructorBlackout(SQLModel, table=True):
+    """A date on which an instructor's exams can't be scheduled."""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    instructor: str = Field(index=True)   # matches Exam.instructor
+    date: str                             # YYYY-MM-DD, as TimeSlot.date
+    reason: Optional[str] = None
+
+
+class InstructorBlackoutCreate(SQLModel):
+    instructor: str
+    date: str
+    reason: Optional[str] = None
+
+
 class ScheduleVersion(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
@@ -65,12 +83,37 @@ class ScheduleVersionCreate(SQLModel):
     name: str
 
 
+class Scenario(SQLModel):
+    """One variant of a sweep: objective weights and constraint tweaks on the base version's exams."""
+    name: Optional[str] = None
+    lamb: float = Field(default=1.0, ge=0)
+    mu: float = Field(default=0.7, ge=0)
+    nu: float = Field(default=0.7, ge=0)
+    drop_room_ids: list[int] = Field(default_factory=list)
+    add_dates: list[str] = Field(default_factory=list)   # YYYY-MM-DD; each gets the busiest day's slot times
+    warm_start: bool = True   # start from the base version's slots instead of from scratch
+    seed: int = 0
+
+
+class SweepCreate(SQLModel):
+    base_version_id: Optional[int] = None
+    scenarios: list[Scenario] = Field(min_length=1, max_length=16)
+
+
+_schedule_row_version = Column("row_version", Integer, nullable=False, server_default="1")
+
+
 class Schedule(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     version_id: int = Field(default=1, foreign_key="scheduleversion.id")
     exam_id: int = Field(foreign_key="exam.id")
     room_id: int = Field(foreign_key="room.id")
     timeslot_id: int = Field(foreign_key="timeslot.id")
+    # Bumped on every ORM update; an UPDATE whose row_version no longer
+    # matches raises StaleDataError instead of overwriting a concurrent edit.
+    row_version: int = Field(default=1, sa_column=_schedule_row_version)
+
+    __mapper_args__ = {"version_id_col": _schedule_row_version}
 
 
 class ScheduleCreate(SQLModel):
@@ -79,6 +122,18 @@ class ScheduleCreate(SQLModel):
     timeslot_id: int
 
 
+class ScheduleUpdate(ScheduleCreate):
+    row_version: Optional[int] = None   # when set, the update fails with 409 if the row has moved on
+
+
+class ScheduleMove(SQLModel):
+    schedule_id: int
+    row_version: Optional[int] = None
+    exam_id: Optional[int] = None
+    room_id: Optional[int] = None
+    timeslot_id: Optional[int] = None
+
+
 class Student(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     person_id: Optional[int] = Field(default=None, unique=True, index=True)
@@ -90,3 +145,50 @@ class StudentExam(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     student_id: int = Field(foreign_key="student.id")
     exam_id: int = Field(foreign_key="exam.id")
+
+
+class AnalyticsSnapshot(SQLModel, table=True):
+    """Materialized /schedules/analytics result; older revisions are kept as history."""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    version_id: int = Field(foreign_key="scheduleversion.id", index=True)
+    include_no_exam: bool = False
+    revision: int = 1
+    current: bool = Field(default=True, index=True)
+    computed_at: str
+    conflict_count: int = 0
+    affected_students: int = 0
+    scheduled_exams: int = 0
+    capacity_warnings: int = 0
+    payload: str   # JSON of the full analytics response
+
+
+class ScheduleOperation(SQLModel, table=True):
+    """One assignment change in a version's edit log; a missing old/new side is an add/remove."""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    version_id: int = Field(foreign_key="scheduleversion.id", index=True)
+    seq: int                      # 1, 2, ... per version
+    batch: int                    # seq of the first operation committed with this one
+    schedule_id: int
+    old_exam_id: Optional[int] = None
+    old_room_id: Optional[int] = None
+    old_timeslot_id: Optional[int] = None
+    new_exam_id: Optional[int] = None
+    new_room_id: Optional[int] = None
+    new_timeslot_id: Optional[int] = None
+    created_at: str
+    undone: bool = False
+
+
+class DataGeneration(SQLModel, table=True):
+    """Single row, moved by writers outside the server process (the importer) so its caches notice."""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    generation: int = 0
+
+
+class ScheduleSnapshot(SQLModel, table=True):
+    """A version's assignments as of operation seq, packed as int32 (schedule, exam, room, timeslot) rows."""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    version_id: int = Field(foreign_key="scheduleversion.id", index=True)
+    seq: int
+    created_at: str
+    assignments: bytes
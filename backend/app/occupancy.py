@@ -0,0 +1,260 @@
+"""
+In-memory room occupancy index, one per schedule version.
+
+Each room keeps its assignments sorted by start time, so "is room R free
+during [start, end)" is a bisect, and "which rooms with capacity >= N are
+free" walks the capacity-sorted room list from the first fitting room.
+
+Indexes are built lazily from the version's schedule rows and kept in
+sync with ORM writes: Schedule inserts/updates/deletes are recorded on the
+session and applied when it commits; Room, TimeSlot and Exam writes drop
+the indexes so they are rebuilt on next use. Writes made outside this process
+(e.g. the import scripts) drop a term's indexes through
+``revisions.on_external_write``.
+
+Each assignment occupies its room for the exam's own duration from the
+slot start, so exams of different lengths overlap correctly.
+"""
+
+import bisect
+import threading
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession, object_session
+from sqlmodel import Session, select
+
+from . import readmodel, revisions
+from .database import DEFAULT_TERM
+from .intervals import exam_span, slot_bounds
+from .models import Exam, Room, Schedule, TimeSlot
+from .readmodel import SlotInfo
+
+
+class Occupancy(NamedTuple):
+    start: datetime
+    end: datetime
+    schedule_id: int
+    exam_id: int
+    timeslot_id: int
+
+
+class RoomOccupancyIndex:
+    def __init__(self, rooms: list[Room], timeslots: list[SlotInfo], durations: dict[int, int]):
+        self.rooms: dict[int, Room] = {r.id: r for r in rooms}
+        # Only rooms available to schedule are offered as free
+        self._by_capacity: list[tuple[int, int]] = sorted((r.capacity, r.id) for r in rooms if r.available)
+        self.slots: dict[int, tuple[datetime, datetime]] = {}
+        for ts in timeslots:
+            bounds = slot_bounds(ts)
+            if bounds:
+                self.slots[ts.id] = bounds
+        self.durations = durations
+        self._starts: dict[int, list[datetime]] = defaultdict(list)
+        self._entries: dict[int, list[Occupancy]] = defaultdict(list)
+        self._max_length: dict[int, timedelta] = defaultdict(timedelta)
+        self._undated: dict[int, list[Occupancy]] = defaultdict(list)
+        self._by_schedule: dict[int, tuple[int, Occupancy]] = {}
+
+    # --- writes ---
+
+    def add(self, schedule_id: int, exam_id: int, room_id: int, timeslot_id: int) -> None:
+        self.remove(schedule_id)
+        bounds = self.slots.get(timeslot_id)
+        if bounds is None:
+            occ = Occupancy(datetime.min, datetime.min, schedule_id, exam_id, timeslot_id)
+            self._undated[room_id].append(occ)
+        else:
+            start, end = exam_span(bounds, self.durations.get(exam_id))
+            occ = Occupancy(start, end, schedule_id, exam_id, timeslot_id)
+            i = bisect.bisect_right(self._starts[room_id], occ.start)
+            self._starts[room_id].insert(i, occ.start)
+            self._entries[room_id].insert(i, occ)
+            self._max_length[room_id] = max(self._max_length[room_id], occ.end - occ.start)
+        self._by_schedule[schedule_id] = (room_id, occ)
+
+    def remove(self, schedule_id: int) -> None:
+        found = self._by_schedule.pop(schedule_id, None)
+        if found is None:
+            return
+        room_id, occ = found
+        if occ.start == datetime.min:
+            self._undated[room_id].remove(occ)
+            return
+        entries = self._entries[room_id]
+        i = bisect.bisect_left(self._starts[room_id], occ.start)
+        while entries[i].schedule_id != schedule_id:
+            i += 1
+        del entries[i]
+        del self._starts[room_id][i]
+
+    # --- queries ---
+
+    def overlapping(self, room_id: int, start: datetime, end: datetime) -> list[Occupancy]:
+        """Assignments in a room that overlap [start, end)."""
+        starts = self._starts.get(room_id)
+        if not starts:
+            return []
+        lo = bisect.bisect_right(starts, start - self._max_length[room_id])
+        hi = bisect.bisect_left(starts, end)
+        return [o for o in self._entries[room_id][lo:hi] if o.end > start]
+
+    def is_free(self, room_id: int, start: datetime, end: datetime) -> bool:
+        return not self.overlapping(room_id, start, end)
+
+    def free_rooms(self, start: datetime, end: datetime, min_capacity: int = 0) -> list[Room]:
+        """Rooms with capacity >= min_capacity free during [start, end), smallest first."""
+        i = bisect.bisect_left(self._by_capacity, (min_capacity, -1))
+        return [
+            self.rooms[rid]
+            for _, rid in self._by_capacity[i:]
+            if self.is_free(rid, start, end)
+        ]
+
+    def largest_free_room(self, start: datetime, end: datetime) -> Optional[Room]:
+        for _, rid in reversed(self._by_capacity):
+            if self.is_free(rid, start, end):
+                return self.rooms[rid]
+        return None
+
+    def on_date(self, room_id: int, day: date) -> list[Occupancy]:
+        """Assignments in a room starting on the given date, in start order."""
+        starts = self._starts.get(room_id, [])
+        day_start = datetime.combine(day, datetime.min.time())
+        lo = bisect.bisect_left(starts, day_start)
+        hi = bisect.bisect_left(starts, day_start + timedelta(days=1))
+        return self._entries[room_id][lo:hi]
+
+    def entries(self, room_id: int) -> list[Occupancy]:
+        """All assignments in a room: unparseable timeslots first, then by start."""
+        return self._undated.get(room_id, []) + self._entries.get(room_id, [])
+
+
+# --- Per-version cache ---
+
+_lock = threading.RLock()
+_indexes: dict[tuple[str, int], RoomOccupancyIndex] = {}  # (term, version_id) -> index
+# Moves with every commit that touches a term's assignments or layout, so an
+# index built from rows read before such a commit is never installed.
+_generations: dict[str, int] = defaultdict(int)
+
+
+def _term(session) -> str:
+    return session.info.get("term", DEFAULT_TERM)
+
+
+def get_index(session: Session, version_id: int) -> RoomOccupancyIndex:
+    key = (_term(session), version_id)
+    with _lock:
+        index = _indexes.get(key)
+        if index is not None:
+            return index
+        generation = _generations[key[0]]
+    rooms = session.exec(select(Room)).all()
+    timeslots = readmodel.load(session, SlotInfo)
+    durations = dict(session.exec(select(Exam.id, Exam.duration_minutes)).all())
+    rows = session.exec(
+        select(Schedule.id, Schedule.exam_id, Schedule.room_id, Schedule.timeslot_id)
+        .where(Schedule.version_id == version_id)
+    ).all()
+    index = RoomOccupancyIndex(rooms, timeslots, durations)
+    for sid, eid, rid, tsid in rows:
+        index.add(sid, eid, rid, tsid)
+    with _lock:
+        if _generations[key[0]] != generation:
+            return index  # a commit landed mid-build; serve this one, rebuild on next use
+        return _indexes.setdefault(key, index)
+
+
+def invalidate(version_id: Optional[int] = None, term: str = DEFAULT_TERM) -> None:
+    """Drop the index for one version of a term, or every index."""
+    with _lock:
+        if version_id is None:
+            _indexes.clear()
+            for t in list(_generations):
+                _generations[t] += 1
+        else:
+            _indexes.pop((term, version_id), None)
+            _generations[term] += 1
+
+
+@revisions.on_external_write
+def _term_changed(term: str) -> None:
+    with _lock:
+        for key in [k for k in _indexes if k[0] == term]:
+            del _indexes[key]
+        _generations[term] += 1
+
+
+# --- Keep indexes in sync with ORM writes ---
+
+
+def _pending(target) -> Optional[list]:
+    session = object_session(target)
+    if session is None:
+        return None
+    return session.info.setdefault("occupancy_pending", [])
+
+
+@event.listens_for(Schedule, "after_insert")
+@event.listens_for(Schedule, "after_update")
+def _schedule_written(mapper, connection, target: Schedule):
+    pending = _pending(target)
+    if pending is not None:
+        pending.append(("add", target.version_id, target.id, target.exam_id, target.room_id, target.timeslot_id))
+
+
+@event.listens_for(Schedule, "after_delete")
+def _schedule_deleted(mapper, connection, target: Schedule):
+    pending = _pending(target)
+    if pending is not None:
+        pending.append(("remove", target.version_id, target.id))
+
+
+@event.listens_for(Exam, "after_insert")
+@event.listens_for(Exam, "after_update")
+@event.listens_for(Exam, "after_delete")
+@event.listens_for(Room, "after_insert")
+@event.listens_for(Room, "after_update")
+@event.listens_for(Room, "after_delete")
+@event.listens_for(TimeSlot, "after_insert")
+@event.listens_for(TimeSlot, "after_update")
+@event.listens_for(TimeSlot, "after_delete")
+def _layout_written(mapper, connection, target):
+    pending = _pending(target)
+    if pending is not None:
+        pending.append(("reset",))
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _apply_pending(session):
+    pending = session.info.pop("occupancy_pending", None)
+    if not pending:
+        return
+    term = _term(session)
+    with _lock:
+        _generations[term] += 1
+        for op in pending:
+            if op[0] == "reset":
+                for key in [k for k in _indexes if k[0] == term]:
+                    del _indexes[key]
+                return
+        for op in pending:
+            index = _indexes.get((term, op[1]))
+            if index is None:
+                continue
+            if op[0] == "add":
+                _, vid, sid, eid, rid, tsid = op
+                if rid in index.rooms and tsid in index.slots:
+                    index.add(sid, eid, rid, tsid)
+                else:
+                    _indexes.pop((term, vid), None)  # unknown room/slot: rebuild on next use
+            else:
+                index.remove(op[2])
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_pending(session):
+    session.info.pop("occupancy_pending", None)
@@ -0,0 +1,349 @@
+"""
+Per-version edit log with undo/redo and point-in-time reconstruction.
+
+Schedule inserts/updates/deletes made through the ORM are recorded on the
+session and written to ScheduleOperation in ``before_commit``, in the same
+transaction as the edit. Operations committed together share a batch, so
+undo/redo step over a whole drag or bulk save at once.
+
+The log is a line: the head is the last operation that isn't undone. Undo
+applies a batch's inverse and marks it undone; redo re-applies the next
+undone batch; any new edit discards the undone tail.
+
+Every SNAPSHOT_EVERY operations the version's assignments are stored as a
+compact ScheduleSnapshot. The state as of any operation is rebuilt from the
+nearest base (a snapshot or the live table at the head) by replaying only
+the operations in between, forwards or backwards.
+"""
+
+from array import array
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import delete, event, func, inspect
+from sqlalchemy.orm import Session as OrmSession, object_session
+from sqlmodel import Session, select
+
+from .models import Schedule, ScheduleOperation, ScheduleSnapshot, ScheduleVersion
+
+SNAPSHOT_EVERY = 100
+
+Assignment = tuple[int, int, int]     # (exam_id, room_id, timeslot_id)
+State = dict[int, Assignment]         # schedule_id -> assignment
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _old(op: ScheduleOperation) -> Optional[Assignment]:
+    return None if op.old_exam_id is None else (op.old_exam_id, op.old_room_id, op.old_timeslot_id)
+
+
+def _new(op: ScheduleOperation) -> Optional[Assignment]:
+    return None if op.new_exam_id is None else (op.new_exam_id, op.new_room_id, op.new_timeslot_id)
+
+
+def operation_dict(op: ScheduleOperation) -> dict:
+    old, new = _old(op), _new(op)
+    return {
+        "seq": op.seq,
+        "batch": op.batch,
+        "schedule_id": op.schedule_id,
+        "old": dict(zip(("exam_id", "room_id", "timeslot_id"), old)) if old else None,
+        "new": dict(zip(("exam_id", "room_id", "timeslot_id"), new)) if new else None,
+        "created_at": op.created_at,
+        "undone": op.undone,
+    }
+
+
+# --- State ---
+
+
+def head(session: Session, version_id: int) -> int:
+    """Seq of the last applied operation (0 before any)."""
+    return session.exec(
+        select(func.coalesce(func.max(ScheduleOperation.seq), 0))
+        .where(ScheduleOperation.version_id == version_id, ScheduleOperation.undone == False)  # noqa: E712
+    ).one()
+
+
+def live_state(session: Session, version_id: int) -> State:
+    return {
+        sid: (eid, rid, tsid)
+        for sid, eid, rid, tsid in session.exec(
+            select(Schedule.id, Schedule.exam_id, Schedule.room_id, Schedule.timeslot_id)
+            .where(Schedule.version_id == version_id)
+        ).all()
+    }
+
+
+def _pack(state: State) -> bytes:
+    packed = array("i")
+    for sid, (eid, rid, tsid) in state.items():
+        packed.extend((sid, eid, rid, tsid))
+    return packed.tobytes()
+
+
+def _unpack(data: bytes) -> State:
+    packed = array("i")
+    packed.frombytes(data)
+    return {packed[i]: (packed[i + 1], packed[i + 2], packed[i + 3]) for i in range(0, len(packed), 4)}
+
+
+def _operations(session: Session, version_id: int, after: int, upto: int) -> list[ScheduleOperation]:
+    return session.exec(
+        select(ScheduleOperation)
+        .where(
+            ScheduleOperation.version_id == version_id,
+            ScheduleOperation.seq > after,
+            ScheduleOperation.seq <= upto,
+        )
+        .order_by(ScheduleOperation.seq)
+    ).all()
+
+
+def state_at(session: Session, version_id: int, seq: int) -> State:
+    """The version's assignments as of operation seq (undone operations included, for redo states)."""
+    current = head(session, version_id)
+    below = session.exec(
+        select(ScheduleSnapshot)
+        .where(ScheduleSnapshot.version_id == version_id, ScheduleSnapshot.seq <= seq)
+        .order_by(ScheduleSnapshot.seq.desc())
+    ).first()
+    above = session.exec(
+        select(ScheduleSnapshot)
+        .where(ScheduleSnapshot.version_id == version_id, ScheduleSnapshot.seq >= seq)
+        .order_by(ScheduleSnapshot.seq)
+    ).first()
+    bases = [(abs(current - seq), current, None)]
+    bases += [(abs(s.seq - seq), s.seq, s) for s in (below, above) if s is not None]
+    _, base_seq, snapshot = min(bases, key=lambda b: b[0])
+
+    state = _unpack(snapshot.assignments) if snapshot else live_state(session, version_id)
+    if base_seq <= seq:
+        for op in _operations(session, version_id, base_seq, seq):
+            _apply(state, op.schedule_id, _new(op))
+    else:
+        for op in reversed(_operations(session, version_id, seq, base_seq)):
+            _apply(state, op.schedule_id, _old(op))
+    return state
+
+
+def _apply(state: State, schedule_id: int, assignment: Optional[Assignment]) -> None:
+    if assignment is None:
+        state.pop(schedule_id, None)
+    else:
+        state[schedule_id] = assignment
+
+
+# --- Undo / redo / restore ---
+
+
+def _write(
+    session: Session,
+    version_id: int,
+    rows: dict[int, Schedule],
+    schedule_id: int,
+    assignment: Optional[Assignment],
+) -> None:
+    if assignment is None:
+        schedule = rows.pop(schedule_id, None)
+        if schedule is not None:
+            session.delete(schedule)
+        return
+    exam_id, room_id, timeslot_id = assignment
+    schedule = rows.get(schedule_id)
+    if schedule is None:
+        schedule = rows[schedule_id] = Schedule(id=schedule_id, version_id=version_id)
+    schedule.exam_id, schedule.room_id, schedule.timeslot_id = exam_id, room_id, timeslot_id
+    session.add(schedule)
+
+
+def _load(session: Session, schedule_ids) -> dict[int, Schedule]:
+    """The existing rows among schedule_ids, in batched IN queries."""
+    ids = list(set(schedule_ids))
+    rows = {}
+    for i in range(0, len(ids), 500):
+        rows.update((s.id, s) for s in session.exec(select(Schedule).where(Schedule.id.in_(ids[i:i + 500]))))
+    return rows
+
+
+def _replay(session: Session, version_id: int, writes: list[tuple[int, Optional[Assignment]]]) -> None:
+    """Apply writes in order without logging them."""
+    session.info["oplog_replaying"] = True
+    rows = _load(session, (schedule_id for schedule_id, _ in writes))
+    touched: set[int] = set()
+    for schedule_id, assignment in writes:
+        if schedule_id in touched:
+            session.flush()  # keep e.g. a delete and re-insert of one id in order
+            touched.clear()
+        _write(session, version_id, rows, schedule_id, assignment)
+        touched.add(schedule_id)
+    session.flush()
+
+
+def undo(session: Session, version_id: int) -> list[ScheduleOperation]:
+    """Revert the last applied batch; returns its operations (empty if there is none)."""
+    last = session.exec(
+        select(ScheduleOperation)
+        .where(ScheduleOperation.version_id == version_id, ScheduleOperation.undone == False)  # noqa: E712
+        .order_by(ScheduleOperation.seq.desc())
+    ).first()
+    if last is None:
+        return []
+    ops = session.exec(
+        select(ScheduleOperation)
+        .where(ScheduleOperation.version_id == version_id, ScheduleOperation.batch == last.batch)
+        .order_by(ScheduleOperation.seq.desc())
+    ).all()
+    _replay(session, version_id, [(op.schedule_id, _old(op)) for op in ops])
+    for op in ops:
+        op.undone = True
+        session.add(op)
+    return ops
+
+
+def redo(session: Session, version_id: int) -> list[ScheduleOperation]:
+    """Re-apply the first undone batch; returns its operations (empty if there is none)."""
+    nxt = session.exec(
+        select(ScheduleOperation)
+        .where(ScheduleOperation.version_id == version_id, ScheduleOperation.undone == True)  # noqa: E712
+        .order_by(ScheduleOperation.seq)
+    ).first()
+    if nxt is None:
+        return []
+    ops = session.exec(
+        select(ScheduleOperation)
+        .where(ScheduleOperation.version_id == version_id, ScheduleOperation.batch == nxt.batch)
+        .order_by(ScheduleOperation.seq)
+    ).all()
+    _replay(session, version_id, [(op.schedule_id, _new(op)) for op in ops])
+    for op in ops:
+        op.undone = False
+        session.add(op)
+    return ops
+
+
+def restore(session: Session, version_id: int, seq: int) -> int:
+    """Make the version look as it did at seq, as one new (undoable) batch; returns rows changed."""
+    target = state_at(session, version_id, seq)
+    current = live_state(session, version_id)
+    removed = current.keys() - target.keys()
+    written = {sid: a for sid, a in target.items() if current.get(sid) != a}
+    rows = _load(session, removed | written.keys())
+    for sid in removed:
+        _write(session, version_id, rows, sid, None)
+    session.flush()
+    for sid, assignment in written.items():
+        _write(session, version_id, rows, sid, assignment)
+    return len(removed) + len(written)
+
+
+# --- Record ORM writes ---
+
+
+def _pending(target) -> Optional[list]:
+    session = object_session(target)
+    if session is None or session.info.get("oplog_replaying"):
+        return None
+    return session.info.setdefault("oplog_pending", [])
+
+
+def _assignment(target: Schedule) -> Assignment:
+    return target.exam_id, target.room_id, target.timeslot_id
+
+
+@event.listens_for(Schedule, "after_insert")
+def _schedule_inserted(mapper, connection, target: Schedule):
+    pending = _pending(target)
+    if pending is not None:
+        pending.append((target.version_id, target.id, None, _assignment(target)))
+
+
+@event.listens_for(Schedule, "after_update")
+def _schedule_updated(mapper, connection, target: Schedule):
+    pending = _pending(target)
+    if pending is None:
+        return
+    attrs = inspect(target).attrs
+
+    def before(name: str):
+        history = attrs[name].history
+        return history.deleted[0] if history.deleted else getattr(target, name)
+
+    old_version = before("version_id")
+    old = (before("exam_id"), before("room_id"), before("timeslot_id"))
+    if old_version != target.version_id:
+        pending.append((old_version, target.id, old, None))
+        pending.append((target.version_id, target.id, None, _assignment(target)))
+    elif old != _assignment(target):
+        pending.append((target.version_id, target.id, old, _assignment(target)))
+
+
+@event.listens_for(Schedule, "after_delete")
+def _schedule_deleted(mapper, connection, target: Schedule):
+    pending = _pending(target)
+    if pending is not None:
+        pending.append((target.version_id, target.id, _assignment(target), None))
+
+
+@event.listens_for(ScheduleVersion, "after_delete")
+def _version_deleted(mapper, connection, target: ScheduleVersion):
+    connection.execute(delete(ScheduleOperation).where(ScheduleOperation.version_id == target.id))
+    connection.execute(delete(ScheduleSnapshot).where(ScheduleSnapshot.version_id == target.id))
+
+
+def _log(session: Session, version_id: int, entries: list) -> None:
+    if session.get(ScheduleVersion, version_id) is None:
+        return
+    start = head(session, version_id)
+    # a new edit after undo discards the redo tail
+    session.exec(delete(ScheduleOperation).where(
+        ScheduleOperation.version_id == version_id, ScheduleOperation.seq > start
+    ))
+    session.exec(delete(ScheduleSnapshot).where(
+        ScheduleSnapshot.version_id == version_id, ScheduleSnapshot.seq > start
+    ))
+    now = _now()
+    for seq, (_, schedule_id, old, new) in enumerate(entries, start + 1):
+        old = old or (None, None, None)
+        new = new or (None, None, None)
+        session.add(ScheduleOperation(
+            version_id=version_id,
+            seq=seq,
+            batch=start + 1,
+            schedule_id=schedule_id,
+            old_exam_id=old[0], old_room_id=old[1], old_timeslot_id=old[2],
+            new_exam_id=new[0], new_room_id=new[1], new_timeslot_id=new[2],
+            created_at=now,
+        ))
+    end = start + len(entries)
+    if end // SNAPSHOT_EVERY > start // SNAPSHOT_EVERY:
+        session.add(ScheduleSnapshot(
+            version_id=version_id,
+            seq=end,
+            created_at=now,
+            assignments=_pack(live_state(session, version_id)),
+        ))
+
+
+@event.listens_for(OrmSession, "before_commit")
+def _write_pending(session):
+    session.flush()
+    pending = session.info.pop("oplog_pending", None)
+    if not pending:
+        return
+    by_version: dict[int, list] = defaultdict(list)
+    for entry in pending:
+        by_version[entry[0]].append(entry)
+    for version_id, entries in by_version.items():
+        _log(session, version_id, entries)
+
+
+@event.listens_for(OrmSession, "after_commit")
+@event.listens_for(OrmSession, "after_rollback")
+def _reset(session):
+    session.info.pop("oplog_pending", None)
+    session.info.pop("oplog_replaying", None)
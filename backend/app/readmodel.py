@@ -0,0 +1,68 @@
+"""
+Compact read models for in-memory working sets.
+
+Conflict detection, analytics, feasibility and suggestions read a handful
+of columns from every exam and timeslot. As SQLModel instances each row
+pays for pydantic construction, ORM instance state, an identity-map entry
+and a per-instance __dict__; these frozen slotted dataclasses are built
+straight from a SELECT of just their own fields, and are plain enough to
+hand to the analytics executor.
+
+    exams = readmodel.load(session, readmodel.ExamInfo)
+    slots = await readmodel.aload(async_session, readmodel.SlotInfo)
+
+Rows that end up in a response (``model_dump()``) are still loaded as
+models, for the page or ids actually returned.
+"""
+
+from dataclasses import dataclass, fields
+from typing import Optional, TypeVar
+
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .models import Exam, Room, TimeSlot
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class ExamInfo:
+    id: int
+    student_count: int
+    duration_minutes: int
+    exam_type: Optional[str]
+    instructor: Optional[str]
+    title: Optional[str]
+
+
+@dataclass(frozen=True, slots=True)
+class SlotInfo:
+    id: int
+    date: str
+    start_time: str
+    end_time: str
+
+
+@dataclass(frozen=True, slots=True)
+class RoomInfo:
+    id: int
+    capacity: int
+    available: bool
+
+
+_SOURCES = {ExamInfo: Exam, SlotInfo: TimeSlot, RoomInfo: Room}
+
+
+def query(cls: type):
+    """SELECT of the table columns backing a read model, in field order."""
+    model = _SOURCES[cls]
+    return select(*(getattr(model, f.name) for f in fields(cls)))
+
+
+def load(session: Session, cls: type[T]) -> list[T]:
+    return [cls(*row) for row in session.exec(query(cls)).all()]
+
+
+async def aload(session: AsyncSession, cls: type[T]) -> list[T]:
+    return [cls(*row) for row in (await session.exec(query(cls))).all()]
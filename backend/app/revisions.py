@@ -0,0 +1,182 @@
+"""
+Revision counters for per-version in-process caches.
+
+A version's revision key changes whenever a committed ORM write touches one
+of its assignments, or anything in its term the assignments depend on
+(exams, rooms, timeslots, students, enrollments, instructor blackouts).
+Caches store the key next to the value and recompute when it has moved.
+
+Writes that bypass the ORM, or come from another process (the import
+scripts), call ``record_external_write`` in their transaction instead. It
+moves a generation stored in the term's database; every session checks it
+when a transaction begins, and when it has moved bumps the whole term and
+tells the caches registered with ``on_external_write`` (occupancy,
+adjacency) to drop it.
+"""
+
+import threading
+from collections import defaultdict
+from typing import Callable, Generic, Optional, TypeVar
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session as OrmSession, object_session
+
+from .database import DEFAULT_TERM
+from .models import DataGeneration, Exam, InstructorBlackout, Room, Schedule, Student, StudentExam, TimeSlot
+
+T = TypeVar("T")
+
+Revision = tuple[int, int]  # (term revision, version revision)
+
+_lock = threading.Lock()
+_terms: dict[str, int] = defaultdict(int)
+_versions: dict[tuple[str, int], int] = defaultdict(int)
+_external: dict[str, int] = {}  # term -> last DataGeneration seen
+_listeners: list[Callable[[str], None]] = []
+
+
+def _term(session) -> str:
+    return session.info.get("term", DEFAULT_TERM)
+
+
+def current(session, version_id: int) -> Revision:
+    term = _term(session)
+    with _lock:
+        return _terms[term], _versions[(term, version_id)]
+
+
+def term_revision(session) -> int:
+    """Revision of the term's shared data, for caches that don't depend on a version."""
+    with _lock:
+        return _terms[_term(session)]
+
+
+def bump(term: Optional[str] = None, version_id: Optional[int] = None) -> None:
+    """Move one version's revision, every version of a term, or everything."""
+    with _lock:
+        if version_id is not None:
+            _versions[(term or DEFAULT_TERM, version_id)] += 1
+        elif term is not None:
+            _terms[term] += 1
+        else:
+            for t in list(_terms):
+                _terms[t] += 1
+
+
+def on_external_write(fn: Callable[[str], None]) -> Callable[[str], None]:
+    """Register fn(term), called when another process or a Core write has changed the term."""
+    _listeners.append(fn)
+    return fn
+
+
+def record_external_write(session) -> None:
+    """Move the term's stored generation; commits with the session's transaction."""
+    row = session.get(DataGeneration, 1)
+    if row is None:
+        row = DataGeneration(id=1)
+    row.generation += 1
+    session.add(row)
+
+
+class RevisionCache(Generic[T]):
+    """(term, version_id) -> the value computed at a given revision."""
+
+    def __init__(self):
+        self._values: dict[tuple[str, int], tuple[Revision, T]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, session, version_id: int) -> tuple[Revision, Optional[T]]:
+        """The current revision, and the cached value if it was computed at that revision."""
+        revision = current(session, version_id)
+        with self._lock:
+            cached = self._values.get((_term(session), version_id))
+        if cached is not None and cached[0] == revision:
+            return revision, cached[1]
+        return revision, None
+
+    def put(self, session, version_id: int, revision: Revision, value: T) -> None:
+        with self._lock:
+            self._values[(_term(session), version_id)] = (revision, value)
+
+
+# --- Notice writes from other processes ---
+
+
+@event.listens_for(OrmSession, "after_begin")
+def _check_external(session, transaction, connection):
+    try:
+        generation = connection.execute(select(DataGeneration.generation)).scalar() or 0
+    except OperationalError:
+        return  # not migrated yet
+    term = _term(session)
+    with _lock:
+        seen = _external.get(term)
+        if seen is not None and generation <= seen:
+            return
+        _external[term] = generation
+    if seen is None:
+        return  # first look at this term: nothing of it is cached yet
+    bump(term)
+    for fn in _listeners:
+        fn(term)
+
+
+# --- Move revisions on ORM writes ---
+
+
+def _pending(target) -> Optional[dict]:
+    session = object_session(target)
+    if session is None:
+        return None
+    return session.info.setdefault("revisions_pending", {"term": False, "versions": set()})
+
+
+@event.listens_for(Schedule, "after_insert")
+@event.listens_for(Schedule, "after_update")
+@event.listens_for(Schedule, "after_delete")
+def _schedule_written(mapper, connection, target: Schedule):
+    pending = _pending(target)
+    if pending is not None:
+        pending["versions"].add(target.version_id)
+        pending["versions"].update(inspect(target).attrs.version_id.history.deleted)
+
+
+@event.listens_for(Exam, "after_insert")
+@event.listens_for(Exam, "after_update")
+@event.listens_for(Exam, "after_delete")
+@event.listens_for(Room, "after_insert")
+@event.listens_for(Room, "after_update")
+@event.listens_for(Room, "after_delete")
+@event.listens_for(TimeSlot, "after_insert")
+@event.listens_for(TimeSlot, "after_update")
+@event.listens_for(TimeSlot, "after_delete")
+@event.listens_for(Student, "after_insert")
+@event.listens_for(Student, "after_delete")
+@event.listens_for(StudentExam, "after_insert")
+@event.listens_for(StudentExam, "after_update")
+@event.listens_for(StudentExam, "after_delete")
+@event.listens_for(InstructorBlackout, "after_insert")
+@event.listens_for(InstructorBlackout, "after_update")
+@event.listens_for(InstructorBlackout, "after_delete")
+def _term_written(mapper, connection, target):
+    pending = _pending(target)
+    if pending is not None:
+        pending["term"] = True
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _apply_pending(session):
+    pending = session.info.pop("revisions_pending", None)
+    if not pending:
+        return
+    term = _term(session)
+    if pending["term"]:
+        bump(term)
+    for version_id in pending["versions"]:
+        bump(term, version_id)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_pending(session):
+    session.info.pop("revisions_pending", None)
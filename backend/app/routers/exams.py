@@ -2,9 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session, select
 
 from ..database import get_session
-from ..models import Exam, ExamCreate
+from ..instrumentation import InstrumentedRoute
+from ..models import Exam, ExamCreate, InstructorBlackout, InstructorBlackoutCreate
 
-router = APIRouter(prefix="/exams", tags=["exams"])
+router = APIRouter(prefix="/exams", tags=["exams"], route_class=InstrumentedRoute)
 
 
 @router.get("/", response_model=list[Exam])
@@ -21,6 +22,32 @@ def create_exam(body: ExamCreate, session: Session = Depends(get_session)):
     return exam
 
 
+# --- Instructor blackout dates ---
+
+
+@router.get("/blackouts", response_model=list[InstructorBlackout])
+def list_blackouts(session: Session = Depends(get_session)):
+    return session.exec(select(InstructorBlackout).order_by(InstructorBlackout.instructor, InstructorBlackout.date)).all()
+
+
+@router.post("/blackouts", response_model=InstructorBlackout, status_code=201)
+def create_blackout(body: InstructorBlackoutCreate, session: Session = Depends(get_session)):
+    blackout = InstructorBlackout.model_validate(body)
+    session.add(blackout)
+    session.commit()
+    session.refresh(blackout)
+    return blackout
+
+
+@router.delete("/blackouts/{blackout_id}", status_code=204)
+def delete_blackout(blackout_id: int, session: Session = Depends(get_session)):
+    blackout = session.get(InstructorBlackout, blackout_id)
+    if not blackout:
+        raise HTTPException(404, "Blackout not found")
+    session.delete(blackout)
+    session.commit()
+
+
 @router.get("/{exam_id}", response_model=Exam)
 def get_exam(exam_id: int, session: Session = Depends(get_session)):
     exam = session.get(Exam, exam_id)
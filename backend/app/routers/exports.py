@@ -0,0 +1,179 @@
+import csv
+import io
+from datetime import datetime, timezone
+from itertools import groupby
+from typing import Iterator, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response, StreamingResponse
+from sqlmodel import Session, select
+
+from ..database import get_session, term_session
+from ..instrumentation import InstrumentedRoute
+from ..intervals import exam_span, slot_bounds
+from ..models import Exam, Room, Schedule, ScheduleVersion, Student, StudentExam, TimeSlot
+
+router = APIRouter(prefix="/exports", tags=["exports"], route_class=InstrumentedRoute)
+
+# Rows are pulled from the cursor in batches of this size, so memory stays
+# flat regardless of how many assignments or students a version has.
+BATCH_SIZE = 500
+
+CSV_COLUMNS = [
+    "schedule_id", "crn", "course_name", "subject", "course_number", "section", "title",
+    "instructor", "student_count", "duration_minutes", "date", "start_time", "end_time",
+    "building", "room", "capacity",
+]
+
+
+def _require_version(session: Session, version_id: int) -> ScheduleVersion:
+    v = session.get(ScheduleVersion, version_id)
+    if not v:
+        raise HTTPException(404, "Version not found")
+    return v
+
+
+def _filename(name: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in name) or "schedule"
+
+
+def _rows(statement, term: str) -> Iterator:
+    """Stream a query's rows in batches with a session owned by the generator."""
+    # The request's session may be closed before the body is streamed, so the
+    # generator opens its own on the same term.
+    with term_session(term) as session:
+        yield from session.exec(statement.execution_options(yield_per=BATCH_SIZE))
+
+
+# --- CSV ---
+
+
+def _assignment_csv(version_id: int, term: str) -> Iterator[str]:
+    statement = (
+        select(Schedule, Exam, Room, TimeSlot)
+        .join(Exam, Exam.id == Schedule.exam_id)
+        .join(Room, Room.id == Schedule.room_id)
+        .join(TimeSlot, TimeSlot.id == Schedule.timeslot_id)
+        .where(Schedule.version_id == version_id)
+        .order_by(TimeSlot.date, TimeSlot.start_time, Room.building, Room.name)
+    )
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(CSV_COLUMNS)
+    for n, (s, exam, room, ts) in enumerate(_rows(statement, term), 1):
+        writer.writerow([
+            s.id, exam.crn, exam.course_name, exam.subject, exam.course_number, exam.section,
+            exam.title, exam.instructor, exam.student_count, exam.duration_minutes,
+            ts.date, ts.start_time, ts.end_time, room.building, room.name, room.capacity,
+        ])
+        if n % BATCH_SIZE == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+@router.get("/versions/{version_id}/assignments.csv")
+def export_assignments_csv(version_id: int, session: Session = Depends(get_session)):
+    v = _require_version(session, version_id)
+    return StreamingResponse(
+        _assignment_csv(version_id, session.info["term"]),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{_filename(v.name)}.csv"'},
+    )
+
+
+# --- iCalendar ---
+
+
+def _ical_text(value: Optional[str]) -> str:
+    value = value or ""
+    return (
+        value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+    )
+
+
+def _ical_line(line: str) -> str:
+    """Fold to 75-octet lines as RFC 5545 requires."""
+    chunks = []
+    limit = 75
+    while line:
+        cut = min(len(line), limit)
+        while len(line[:cut].encode()) > limit:
+            cut -= 1
+        chunks.append(line[:cut])
+        line = line[cut:]
+        limit = 74  # continuation lines start with a space
+    return "\r\n ".join(chunks) + "\r\n"
+
+
+def _ical_time(dt: datetime) -> str:
+    return dt.strftime("%Y%m%dT%H%M%S")
+
+
+def _vcalendar(student: Student, events: list[tuple], version_name: str, stamp: str) -> str:
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//InForms//Exam Schedule//EN",
+        f"X-WR-CALNAME:{_ical_text(f'{version_name} exams')}",
+    ]
+    for _, s, exam, room, ts in events:
+        bounds = slot_bounds(ts)
+        if bounds is None:
+            continue
+        start, end = exam_span(bounds, exam.duration_minutes)
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:exam-{s.id}-student-{student.id}@informs",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART:{_ical_time(start)}",
+            f"DTEND:{_ical_time(end)}",
+            f"SUMMARY:{_ical_text(exam.course_name + (' - ' + exam.title if exam.title else ''))}",
+            f"LOCATION:{_ical_text(f'{room.building} {room.name}')}",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return "".join(_ical_line(line) for line in lines)
+
+
+def _student_calendars(
+    version_id: int, version_name: str, term: str, student_id: Optional[int] = None
+) -> Iterator[str]:
+    statement = (
+        select(Student, Schedule, Exam, Room, TimeSlot)
+        .join(StudentExam, StudentExam.student_id == Student.id)
+        .join(Schedule, (Schedule.exam_id == StudentExam.exam_id) & (Schedule.version_id == version_id))
+        .join(Exam, Exam.id == Schedule.exam_id)
+        .join(Room, Room.id == Schedule.room_id)
+        .join(TimeSlot, TimeSlot.id == Schedule.timeslot_id)
+        .order_by(Student.id, TimeSlot.date, TimeSlot.start_time)
+    )
+    if student_id is not None:
+        statement = statement.where(Student.id == student_id)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    # Rows arrive grouped by student, so only one student's events are held at a time
+    for _, events in groupby(_rows(statement, term), key=lambda row: row[0].id):
+        events = list(events)
+        yield _vcalendar(events[0][0], events, version_name, stamp)
+
+
+@router.get("/versions/{version_id}/students.ics")
+def export_student_calendars(version_id: int, session: Session = Depends(get_session)):
+    """One VCALENDAR per student with at least one scheduled exam, as a single iCalendar stream."""
+    v = _require_version(session, version_id)
+    return StreamingResponse(
+        _student_calendars(version_id, v.name, session.info["term"]),
+        media_type="text/calendar",
+        headers={"Content-Disposition": f'attachment; filename="{_filename(v.name)}-students.ics"'},
+    )
+
+
+@router.get("/versions/{version_id}/students/{student_id}.ics")
+def export_student_calendar(version_id: int, student_id: int, session: Session = Depends(get_session)):
+    v = _require_version(session, version_id)
+    student = session.get(Student, student_id)
+    if not student:
+        raise HTTPException(404, "Student not found")
+    body = "".join(_student_calendars(version_id, v.name, session.info["term"], student_id))
+    return Response(body or _vcalendar(student, [], v.name, ""), media_type="text/calendar")
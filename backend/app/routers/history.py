@@ -0,0 +1,90 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import Session, func, select
+
+from .. import oplog
+from ..database import get_session
+from ..instrumentation import InstrumentedRoute
+from ..models import ScheduleOperation, ScheduleVersion
+
+router = APIRouter(prefix="/schedules/versions", tags=["history"], route_class=InstrumentedRoute)
+
+
+def _require_version(session: Session, version_id: int) -> ScheduleVersion:
+    v = session.get(ScheduleVersion, version_id)
+    if not v:
+        raise HTTPException(404, "Version not found")
+    return v
+
+
+def _require_seq(session: Session, version_id: int, seq: int) -> None:
+    last = session.exec(
+        select(func.coalesce(func.max(ScheduleOperation.seq), 0))
+        .where(ScheduleOperation.version_id == version_id)
+    ).one()
+    if not 0 <= seq <= last:
+        raise HTTPException(404, "Operation not found")
+
+
+@router.get("/{version_id}/operations")
+def list_operations(
+    version_id: int,
+    before: Optional[int] = Query(None, description="Only operations with a lower seq"),
+    limit: int = Query(100, ge=1, le=1000),
+    session: Session = Depends(get_session),
+):
+    """The version's edit log, newest first, with the current head."""
+    _require_version(session, version_id)
+    statement = select(ScheduleOperation).where(ScheduleOperation.version_id == version_id)
+    if before is not None:
+        statement = statement.where(ScheduleOperation.seq < before)
+    ops = session.exec(statement.order_by(ScheduleOperation.seq.desc()).limit(limit)).all()
+    return {
+        "head": oplog.head(session, version_id),
+        "operations": [oplog.operation_dict(op) for op in ops],
+    }
+
+
+@router.post("/{version_id}/undo")
+def undo(version_id: int, session: Session = Depends(get_session)):
+    _require_version(session, version_id)
+    ops = oplog.undo(session, version_id)
+    if not ops:
+        raise HTTPException(409, "Nothing to undo")
+    operations = [oplog.operation_dict(op) for op in ops]
+    session.commit()
+    return {"head": oplog.head(session, version_id), "operations": operations}
+
+
+@router.post("/{version_id}/redo")
+def redo(version_id: int, session: Session = Depends(get_session)):
+    _require_version(session, version_id)
+    ops = oplog.redo(session, version_id)
+    if not ops:
+        raise HTTPException(409, "Nothing to redo")
+    operations = [oplog.operation_dict(op) for op in ops]
+    session.commit()
+    return {"head": oplog.head(session, version_id), "operations": operations}
+
+
+@router.get("/{version_id}/state")
+def get_state(version_id: int, seq: int = Query(..., ge=0), session: Session = Depends(get_session)):
+    """The version's assignments as they were right after operation seq (0 = before the first)."""
+    _require_version(session, version_id)
+    _require_seq(session, version_id, seq)
+    state = oplog.state_at(session, version_id, seq)
+    return [
+        {"id": sid, "version_id": version_id, "exam_id": eid, "room_id": rid, "timeslot_id": tsid}
+        for sid, (eid, rid, tsid) in sorted(state.items())
+    ]
+
+
+@router.post("/{version_id}/restore")
+def restore(version_id: int, seq: int = Query(..., ge=0), session: Session = Depends(get_session)):
+    """Return the version to its state at seq, recorded as one new batch so it can be undone."""
+    _require_version(session, version_id)
+    _require_seq(session, version_id, seq)
+    changed = oplog.restore(session, version_id, seq)
+    session.commit()
+    return {"head": oplog.head(session, version_id), "changed": changed}
@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from .. import adjacency
+from ..instrumentation import render_prometheus
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus scrape endpoint: per-route request counts, latency histograms and SQL totals, plus cache counters."""
+    return PlainTextResponse(render_prometheus() + adjacency.render_prometheus(), media_type="text/plain; version=0.0.4")
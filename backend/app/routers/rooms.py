@@ -1,12 +1,15 @@
+from datetime import date, datetime
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session, select
 
+from .. import occupancy
 from ..database import get_session
-from ..models import Exam, Room, RoomCreate, Schedule, TimeSlot
+from ..instrumentation import InstrumentedRoute
+from ..models import Exam, Room, RoomCreate, TimeSlot
 
-router = APIRouter(prefix="/rooms", tags=["rooms"])
+router = APIRouter(prefix="/rooms", tags=["rooms"], route_class=InstrumentedRoute)
 
 
 @router.get("/detailed")
@@ -16,30 +19,26 @@ def list_rooms_detailed(
 ):
     from ..routers.schedules import _get_version_id
     vid = _get_version_id(session, version_id)
+    index = occupancy.get_index(session, vid)
 
-    schedules = session.exec(select(Schedule).where(Schedule.version_id == vid)).all()
-
-    # Index schedules by room
-    room_schedules: dict[int, list[dict]] = {}
-    for s in schedules:
-        exam = session.get(Exam, s.exam_id)
-        ts = session.get(TimeSlot, s.timeslot_id)
-        entry = {
-            "schedule_id": s.id,
-            "exam": exam.model_dump() if exam else None,
-            "timeslot": ts.model_dump() if ts else None,
-        }
-        room_schedules.setdefault(s.room_id, []).append(entry)
+    entries_by_room = {rid: index.entries(rid) for rid in index.rooms}
+    exam_ids = {o.exam_id for entries in entries_by_room.values() for o in entries}
+    ts_ids = {o.timeslot_id for entries in entries_by_room.values() for o in entries}
+    exam_map = {e.id: e for e in session.exec(select(Exam).where(Exam.id.in_(exam_ids))).all()}
+    ts_map = {t.id: t for t in session.exec(select(TimeSlot).where(TimeSlot.id.in_(ts_ids))).all()}
 
-    rooms = session.exec(select(Room)).all()
     result = []
-    for r in rooms:
-        entries = room_schedules.get(r.id, [])
-        # Sort entries by date then time
-        entries.sort(key=lambda e: (
-            e["timeslot"]["date"] if e["timeslot"] else "",
-            e["timeslot"]["start_time"] if e["timeslot"] else "",
-        ))
+    for rid, r in index.rooms.items():
+        # Index entries are already in date/time order
+        entries = []
+        for o in entries_by_room[rid]:
+            exam = exam_map.get(o.exam_id)
+            ts = ts_map.get(o.timeslot_id)
+            entries.append({
+                "schedule_id": o.schedule_id,
+                "exam": exam.model_dump() if exam else None,
+                "timeslot": ts.model_dump() if ts else None,
+            })
         result.append({"room": r.model_dump(), "schedules": entries})
 
     # Sort: rooms with exams first, then by building + name
@@ -47,6 +46,52 @@ def list_rooms_detailed(
     return result
 
 
+@router.get("/available", response_model=list[Room])
+def list_available_rooms(
+    start: datetime,
+    end: datetime,
+    min_capacity: int = Query(0),
+    version_id: Optional[int] = Query(None),
+    session: Session = Depends(get_session),
+):
+    """Rooms with capacity >= min_capacity that are free during [start, end), smallest first."""
+    from ..routers.schedules import _get_version_id
+    if end <= start:
+        raise HTTPException(422, "end must be after start")
+    vid = _get_version_id(session, version_id)
+    return occupancy.get_index(session, vid).free_rooms(start, end, min_capacity)
+
+
+@router.get("/{room_id}/occupancy")
+def get_room_occupancy(
+    room_id: int,
+    day: date = Query(..., alias="date"),
+    version_id: Optional[int] = Query(None),
+    session: Session = Depends(get_session),
+):
+    """What occupies a room on a given date."""
+    from ..routers.schedules import _get_version_id
+    vid = _get_version_id(session, version_id)
+    index = occupancy.get_index(session, vid)
+    if room_id not in index.rooms:
+        raise HTTPException(404, "Room not found")
+    entries = index.on_date(room_id, day)
+    exam_map = {
+        e.id: e
+        for e in session.exec(select(Exam).where(Exam.id.in_({o.exam_id for o in entries}))).all()
+    }
+    return [
+        {
+            "schedule_id": o.schedule_id,
+            "timeslot_id": o.timeslot_id,
+            "start": o.start,
+            "end": o.end,
+            "exam": exam_map[o.exam_id].model_dump() if o.exam_id in exam_map else None,
+        }
+        for o in entries
+    ]
+
+
 @router.get("/", response_model=list[Room])
 def list_rooms(session: Session = Depends(get_session)):
     return session.exec(select(Room)).all()
@@ -1,24 +1,44 @@
+import json
 from collections import defaultdict
+from datetime import date
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm.exc import StaleDataError
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..database import get_session
+from .. import adjacency, analytics_store, feasibility, occupancy, oplog, readmodel, revisions, scenarios
+from ..analytics import CONFLICT_TYPES, count_conflicts, find_conflicts
+from ..database import get_async_session, get_session
+from ..instrumentation import InstrumentedRoute
+from ..intervals import busy_spans, exam_span, overlaps, scheduled_spans, slot_bounds
 from ..models import (
+    AnalyticsSnapshot,
     Exam,
     Room,
     Schedule,
     ScheduleCreate,
+    ScheduleMove,
+    ScheduleUpdate,
     ScheduleVersion,
     ScheduleVersionCreate,
     Student,
     StudentExam,
+    SweepCreate,
     TimeSlot,
     TimeSlotCreate,
 )
+from ..readmodel import ExamInfo, SlotInfo
+from ..workers import run_cpu, run_parallel
 
-router = APIRouter(prefix="/schedules", tags=["schedules"])
+router = APIRouter(prefix="/schedules", tags=["schedules"], route_class=InstrumentedRoute)
+
+_heatmaps: revisions.RevisionCache[dict] = revisions.RevisionCache()
+_conflict_groups: revisions.RevisionCache[list] = revisions.RevisionCache()
+_scores: revisions.RevisionCache[dict] = revisions.RevisionCache()
+_utilization: revisions.RevisionCache[dict] = revisions.RevisionCache()
+_delta_engines: revisions.RevisionCache = revisions.RevisionCache()
 
 
 # --- Schedule Versions ---
@@ -29,6 +49,75 @@ def list_versions(session: Session = Depends(get_session)):
     return session.exec(select(ScheduleVersion)).all()
 
 
+async def _score_components(session: AsyncSession, version_ids: list[int]) -> dict[int, dict]:
+    """Weight-independent objective components per version, recomputing only stale ones in one pass."""
+    components, stale = {}, {}
+    for vid in version_ids:
+        revision, cached = _scores.get(session, vid)
+        if cached is None:
+            stale[vid] = revision
+        else:
+            components[vid] = cached
+    if stale:
+        # numpy is only needed here; importing it on first use keeps it out of startup
+        from ..scoring import score_versions
+
+        timeslots = await readmodel.aload(session, SlotInfo)
+        assignments = (await session.exec(
+            select(Schedule.version_id, Schedule.exam_id, Schedule.timeslot_id)
+            .where(Schedule.version_id.in_(list(stale)))
+            .order_by(Schedule.id)
+        )).all()
+        enrollments = (await session.exec(select(StudentExam.student_id, StudentExam.exam_id))).all()
+        computed = await run_cpu(score_versions, timeslots, assignments, enrollments)
+        empty = {"overlap": 0, "three_in_48h": 0, "back_to_back": 0, "scheduled_exams": 0}
+        for vid, revision in stale.items():
+            components[vid] = computed.get(vid, empty)
+            _scores.put(session, vid, revision, components[vid])
+    return components
+
+
+# Defaults are phase1_timeslot_assignment's in model/twostagemodel.ipynb (scoring.LAMB, MU, NU)
+_LAMB = Query(1.0, ge=0, description="Weight of same-slot student overlaps")
+_MU = Query(0.7, ge=0, description="Weight of 3 exams in 48 hours")
+_NU = Query(0.7, ge=0, description="Weight of back-to-back exams")
+
+
+@router.get("/versions/scores")
+async def score_all_versions(
+    lamb: float = _LAMB, mu: float = _MU, nu: float = _NU,
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Every version scored against the optimizer's objective, for comparing them side by side."""
+    from ..scoring import weigh
+
+    versions = (await session.exec(select(ScheduleVersion).order_by(ScheduleVersion.id))).all()
+    components = await _score_components(session, [v.id for v in versions])
+    return {
+        "weights": {"lamb": lamb, "mu": mu, "nu": nu},
+        "versions": [{"version_id": v.id, "name": v.name, **weigh(components[v.id], lamb, mu, nu)} for v in versions],
+    }
+
+
+@router.get("/versions/{version_id}/score")
+async def score_version(
+    version_id: int,
+    lamb: float = _LAMB, mu: float = _MU, nu: float = _NU,
+    session: AsyncSession = Depends(get_async_session),
+):
+    """The version's weighted objective and its components."""
+    from ..scoring import weigh
+
+    if not await session.get(ScheduleVersion, version_id):
+        raise HTTPException(404, "Version not found")
+    components = await _score_components(session, [version_id])
+    return {
+        "version_id": version_id,
+        "weights": {"lamb": lamb, "mu": mu, "nu": nu},
+        **weigh(components[version_id], lamb, mu, nu),
+    }
+
+
 @router.post("/versions", response_model=ScheduleVersion, status_code=201)
 def create_version(body: ScheduleVersionCreate, session: Session = Depends(get_session)):
     v = ScheduleVersion(name=body.name, active=True)
@@ -98,6 +187,8 @@ def list_timeslots(session: Session = Depends(get_session)):
 @router.post("/timeslots", response_model=TimeSlot, status_code=201)
 def create_timeslot(body: TimeSlotCreate, session: Session = Depends(get_session)):
     ts = TimeSlot.model_validate(body)
+    if slot_bounds(ts) is None:
+        raise HTTPException(422, "TimeSlot needs a YYYY-MM-DD date and HH:MM start before end")
     session.add(ts)
     session.commit()
     session.refresh(ts)
@@ -124,6 +215,13 @@ def _get_version_id(session: Session, version_id: Optional[int]) -> int:
     return v.id if v else 1
 
 
+async def _aget_version_id(session: AsyncSession, version_id: Optional[int]) -> int:
+    if version_id:
+        return version_id
+    v = (await session.exec(select(ScheduleVersion))).first()
+    return v.id if v else 1
+
+
 @router.get("/", response_model=list[Schedule])
 def list_schedules(version_id: Optional[int] = Query(None), session: Session = Depends(get_session)):
     vid = _get_version_id(session, version_id)
@@ -131,16 +229,26 @@ def list_schedules(version_id: Optional[int] = Query(None), session: Session = D
 
 
 @router.get("/detailed")
-def list_schedules_detailed(version_id: Optional[int] = Query(None), session: Session = Depends(get_session)):
-    vid = _get_version_id(session, version_id)
-    schedules = session.exec(select(Schedule).where(Schedule.version_id == vid)).all()
+async def list_schedules_detailed(
+    version_id: Optional[int] = Query(None),
+    session: AsyncSession = Depends(get_async_session),
+):
+    vid = await _aget_version_id(session, version_id)
+    schedules = (await session.exec(select(Schedule).where(Schedule.version_id == vid))).all()
+    exam_ids = {s.exam_id for s in schedules}
+    room_ids = {s.room_id for s in schedules}
+    ts_ids = {s.timeslot_id for s in schedules}
+    exam_map = {e.id: e for e in (await session.exec(select(Exam).where(Exam.id.in_(exam_ids)))).all()}
+    room_map = {r.id: r for r in (await session.exec(select(Room).where(Room.id.in_(room_ids)))).all()}
+    ts_map = {t.id: t for t in (await session.exec(select(TimeSlot).where(TimeSlot.id.in_(ts_ids)))).all()}
     result = []
     for s in schedules:
-        exam = session.get(Exam, s.exam_id)
-        room = session.get(Room, s.room_id)
-        timeslot = session.get(TimeSlot, s.timeslot_id)
+        exam = exam_map.get(s.exam_id)
+        room = room_map.get(s.room_id)
+        timeslot = ts_map.get(s.timeslot_id)
         result.append({
             "id": s.id,
+            "row_version": s.row_version,
             "exam": exam.model_dump() if exam else None,
             "room": room.model_dump() if room else None,
             "timeslot": timeslot.model_dump() if timeslot else None,
@@ -169,49 +277,127 @@ def create_schedule(body: ScheduleCreate, version_id: Optional[int] = Query(None
     return schedule
 
 
+# --- Edits (optimistic concurrency) ---
+# Declared before /{schedule_id} so /bulk and /moves aren't captured by it.
+
+
+def _conflict(session: Session, schedule_ids: list[int]) -> HTTPException:
+    """409 carrying the rows as they are now (missing ids were deleted)."""
+    current = session.exec(select(Schedule).where(Schedule.id.in_(schedule_ids))).all()
+    return HTTPException(409, {
+        "message": "Schedule was changed by someone else",
+        "current": [s.model_dump() for s in current],
+        "deleted": sorted(set(schedule_ids) - {s.id for s in current}),
+    })
+
+
+def _commit_or_conflict(session: Session, schedule_ids: list[int]) -> None:
+    """Commit; if a versioned UPDATE/DELETE matched no row, roll back and raise 409."""
+    try:
+        session.commit()
+    except StaleDataError:
+        session.rollback()
+        raise _conflict(session, schedule_ids)
+
+
+@router.put("/bulk")
+def bulk_save_schedules(
+    items: list[ScheduleCreate],
+    version_id: Optional[int] = Query(None),
+    expected_head: Optional[int] = Query(None, description="Fail with 409 unless the version's edit log is at this seq"),
+    session: Session = Depends(get_session),
+):
+    """Make the version's assignments match items, touching only rows that differ."""
+    vid = _get_version_id(session, version_id)
+    if expected_head is not None:
+        head = oplog.head(session, vid)
+        if head != expected_head:
+            raise HTTPException(409, {"message": "Version was changed by someone else", "head": head})
+
+    existing: dict[int, list[Schedule]] = defaultdict(list)
+    for s in session.exec(select(Schedule).where(Schedule.version_id == vid).order_by(Schedule.id)).all():
+        existing[s.exam_id].append(s)
+
+    saved = []
+    for item in items:
+        rows = existing.get(item.exam_id)
+        if rows:
+            s = rows.pop(0)
+            if (s.room_id, s.timeslot_id) != (item.room_id, item.timeslot_id):
+                s.room_id, s.timeslot_id = item.room_id, item.timeslot_id
+                session.add(s)
+        else:
+            s = Schedule(version_id=vid, exam_id=item.exam_id, room_id=item.room_id, timeslot_id=item.timeslot_id)
+            session.add(s)
+        saved.append(s)
+    stale = [s for rows in existing.values() for s in rows]
+    for s in stale:
+        session.delete(s)
+    try:
+        session.flush()
+    except StaleDataError:
+        session.rollback()
+        raise HTTPException(409, {"message": "Version was changed by someone else", "head": oplog.head(session, vid)})
+    result = [s.model_dump() for s in saved]
+    _commit_or_conflict(session, [s.id for s in saved + stale])
+    return result
+
+
+@router.post("/moves", response_model=list[Schedule])
+def move_schedules(moves: list[ScheduleMove], session: Session = Depends(get_session)):
+    """
+    Apply several moves atomically. Each may carry the row_version it was
+    based on; if any row has changed since, nothing is applied and the 409
+    lists the current state of every row in the batch.
+    """
+    ids = [m.schedule_id for m in moves]
+    rows = {s.id: s for s in session.exec(select(Schedule).where(Schedule.id.in_(ids))).all()}
+    if len(rows) < len(set(ids)) or any(
+        m.row_version is not None and rows[m.schedule_id].row_version != m.row_version for m in moves
+    ):
+        raise _conflict(session, ids)
+    for m in moves:
+        s = rows[m.schedule_id]
+        for field in ("exam_id", "room_id", "timeslot_id"):
+            value = getattr(m, field)
+            if value is not None:
+                setattr(s, field, value)
+        session.add(s)
+    try:
+        session.flush()
+    except StaleDataError:
+        session.rollback()
+        raise _conflict(session, ids)
+    result = [rows[i].model_dump() for i in dict.fromkeys(ids)]
+    _commit_or_conflict(session, ids)
+    return result
+
+
 @router.put("/{schedule_id}", response_model=Schedule)
-def update_schedule(schedule_id: int, body: ScheduleCreate, session: Session = Depends(get_session)):
+def update_schedule(schedule_id: int, body: ScheduleUpdate, session: Session = Depends(get_session)):
     schedule = session.get(Schedule, schedule_id)
     if not schedule:
         raise HTTPException(404, "Schedule not found")
+    if body.row_version is not None and schedule.row_version != body.row_version:
+        raise _conflict(session, [schedule_id])
     schedule.exam_id = body.exam_id
     schedule.room_id = body.room_id
     schedule.timeslot_id = body.timeslot_id
     session.add(schedule)
-    session.commit()
+    _commit_or_conflict(session, [schedule_id])
     session.refresh(schedule)
     return schedule
 
 
 @router.delete("/{schedule_id}", status_code=204)
-def delete_schedule(schedule_id: int, session: Session = Depends(get_session)):
+def delete_schedule(schedule_id: int, row_version: Optional[int] = Query(None), session: Session = Depends(get_session)):
     schedule = session.get(Schedule, schedule_id)
     if not schedule:
         raise HTTPException(404, "Schedule not found")
+    if row_version is not None and schedule.row_version != row_version:
+        raise _conflict(session, [schedule_id])
     session.delete(schedule)
-    session.commit()
-
-
-# --- Bulk save ---
-
-
-@router.put("/bulk")
-def bulk_save_schedules(items: list[ScheduleCreate], version_id: Optional[int] = Query(None), session: Session = Depends(get_session)):
-    vid = _get_version_id(session, version_id)
-    existing = session.exec(select(Schedule).where(Schedule.version_id == vid)).all()
-    for s in existing:
-        session.delete(s)
-    session.flush()
-
-    created = []
-    for item in items:
-        s = Schedule(version_id=vid, exam_id=item.exam_id, room_id=item.room_id, timeslot_id=item.timeslot_id)
-        session.add(s)
-        session.flush()
-        session.refresh(s)
-        created.append(s)
-    session.commit()
-    return created
+    _commit_or_conflict(session, [schedule_id])
 
 
 # --- Unscheduled / suggestions ---
@@ -224,9 +410,7 @@ def list_unscheduled(
     session: Session = Depends(get_session),
 ):
     vid = _get_version_id(session, version_id)
-    scheduled_ids = {
-        s.exam_id for s in session.exec(select(Schedule).where(Schedule.version_id == vid)).all()
-    }
+    scheduled_ids = set(session.exec(select(Schedule.exam_id).where(Schedule.version_id == vid)).all())
     all_exams = session.exec(select(Exam)).all()
     result = []
     for e in all_exams:
@@ -248,50 +432,55 @@ def suggest_timeslots(
     exam = session.get(Exam, exam_id)
     if not exam:
         raise HTTPException(404, "Exam not found")
+    feasible = feasibility.get_index(session)
+    slot_ids = feasible.slots(exam_id)
+    if not slot_ids:
+        return []
 
     # Students enrolled in this exam
-    enrolled_ids = {
-        se.student_id
-        for se in session.exec(select(StudentExam).where(StudentExam.exam_id == exam_id)).all()
-    }
+    enrolled_ids = set(adjacency.exam_students(session, exam_id))
 
-    # Current schedule: exam_id -> timeslot_id, timeslot_id -> set of room_ids used
-    schedules = session.exec(select(Schedule).where(Schedule.version_id == vid)).all()
-    exam_to_ts: dict[int, int] = {s.exam_id: s.timeslot_id for s in schedules}
-    ts_rooms: dict[int, set[int]] = defaultdict(set)
-    for s in schedules:
-        ts_rooms[s.timeslot_id].add(s.room_id)
+    # Current schedule: exam_id -> timeslot_id
+    exam_to_ts: dict[int, int] = dict(session.exec(
+        select(Schedule.exam_id, Schedule.timeslot_id).where(Schedule.version_id == vid).order_by(Schedule.id)
+    ).all())
 
-    # For each enrolled student, which timeslots are they already busy at?
-    all_se = session.exec(select(StudentExam)).all()
-    student_busy: dict[int, set[int]] = defaultdict(set)
-    for se in all_se:
-        if se.student_id in enrolled_ids and se.exam_id in exam_to_ts:
-            student_busy[se.student_id].add(exam_to_ts[se.exam_id])
+    timeslots = {t.id: t for t in session.exec(select(TimeSlot).where(TimeSlot.id.in_(slot_ids))).all()}
+    index = occupancy.get_index(session, vid)
+    spans = scheduled_spans(exam_to_ts, index.slots, index.durations)
 
-    timeslots = session.exec(select(TimeSlot)).all()
-    rooms = session.exec(select(Room)).all()
+    # For each enrolled student, when are they already sitting another exam?
+    student_exams: dict[int, list[int]] = defaultdict(list)
+    for sid, eid in session.exec(
+        select(StudentExam.student_id, StudentExam.exam_id).where(StudentExam.student_id.in_(enrolled_ids))
+    ).all():
+        student_exams[sid].append(eid)
+    student_busy = busy_spans(enrolled_ids, student_exams, spans, exclude_exam=exam_id)
+
+    # Feasible rooms, smallest first; exams no room can seat fall back to the
+    # largest free one. Take-home and online exams don't occupy their room.
+    room_ids = feasible.rooms(exam_id)
+    needs_seats = feasible.needs_seats(exam_id)
+    if needs_seats and not room_ids:
+        room_ids = feasible.fallback_rooms()
 
     suggestions = []
-    for ts in timeslots:
+    for ts_id in slot_ids:
         # Skip timeslots where this exam is already scheduled
-        if exam_to_ts.get(exam_id) == ts.id:
+        if exam_to_ts.get(exam_id) == ts_id:
             continue
-        conflict_count = sum(1 for sid in enrolled_ids if ts.id in student_busy.get(sid, set()))
-
-        # Pick best available room: smallest fitting, else largest available
-        used = ts_rooms.get(ts.id, set())
-        available = [r for r in rooms if r.id not in used]
-        fitting = [r for r in available if r.capacity >= exam.student_count]
-        if fitting:
-            best_room = min(fitting, key=lambda r: r.capacity)
-        elif available:
-            best_room = max(available, key=lambda r: r.capacity)
-        else:
-            best_room = None
+        bounds = index.slots.get(ts_id)
+        if bounds is None:
+            continue
+        span = exam_span(bounds, exam.duration_minutes)
+        conflict_count = sum(1 for busy in student_busy.values() if overlaps(span, busy))
+        best_room = next(
+            (index.rooms[rid] for rid in room_ids if rid in index.rooms and (not needs_seats or index.is_free(rid, *span))),
+            None,
+        )
 
         suggestions.append({
-            "timeslot": ts.model_dump(),
+            "timeslot": timeslots[ts_id].model_dump(),
             "conflict_count": conflict_count,
             "room": best_room.model_dump() if best_room else None,
         })
@@ -300,6 +489,48 @@ def suggest_timeslots(
     return suggestions[:3]
 
 
+@router.get("/feasibility")
+def list_infeasible(
+    version_id: Optional[int] = Query(None),
+    session: Session = Depends(get_session),
+):
+    """Assignments that break a room, exam-type or instructor-blackout constraint."""
+    vid = _get_version_id(session, version_id)
+    feasible = feasibility.get_index(session)
+    rows = session.exec(
+        select(Schedule.id, Schedule.exam_id, Schedule.room_id, Schedule.timeslot_id)
+        .where(Schedule.version_id == vid)
+    ).all()
+    violations = []
+    for sid, eid, rid, tid in rows:
+        if feasible.room_ok(eid, rid) and feasible.slot_ok(eid, tid):
+            continue
+        reasons = feasible.violations(eid, rid, tid)
+        if reasons:
+            violations.append({
+                "schedule_id": sid,
+                "exam_id": eid,
+                "room_id": rid,
+                "timeslot_id": tid,
+                "reasons": reasons,
+            })
+    return {"version_id": vid, "checked": len(rows), "violations": violations}
+
+
+@router.get("/feasibility/{exam_id}")
+def get_exam_feasibility(exam_id: int, session: Session = Depends(get_session)):
+    """Rooms (smallest first) and timeslots an exam may be assigned to."""
+    if not session.get(Exam, exam_id):
+        raise HTTPException(404, "Exam not found")
+    feasible = feasibility.get_index(session)
+    return {
+        "exam_id": exam_id,
+        "needs_seats": feasible.needs_seats(exam_id),
+        "room_ids": feasible.rooms(exam_id),
+        "timeslot_ids": feasible.slots(exam_id),
+    }
+
+
 # --- Students ---
 
 
@@ -310,15 +541,11 @@ def list_students(session: Session = Depends(get_session)):
 
 @router.get("/exams/{exam_id}/students")
 def get_exam_students(exam_id: int, session: Session = Depends(get_session)):
-    enrollments = session.exec(
-        select(StudentExam).where(StudentExam.exam_id == exam_id)
-    ).all()
-    students = []
-    for e in enrollments:
-        s = session.get(Student, e.student_id)
-        if s:
-            students.append(s.model_dump())
-    return students
+    student_ids = adjacency.exam_students(session, exam_id)
+    if not student_ids:
+        return []
+    students = {s.id: s for s in session.exec(select(Student).where(Student.id.in_(student_ids))).all()}
+    return [students[sid].model_dump() for sid in student_ids if sid in students]
 
 
 @router.get("/students/{student_id}/schedule")
@@ -328,154 +555,436 @@ def get_student_schedule(student_id: int, version_id: Optional[int] = Query(None
     if not student:
         raise HTTPException(404, "Student not found")
 
-    enrollments = session.exec(
-        select(StudentExam).where(StudentExam.student_id == student_id)
-    ).all()
-    exam_ids = {e.exam_id for e in enrollments}
-
-    schedules = session.exec(select(Schedule).where(Schedule.version_id == vid)).all()
-    result = []
-    for s in schedules:
-        if s.exam_id in exam_ids:
-            exam = session.get(Exam, s.exam_id)
-            room = session.get(Room, s.room_id)
-            timeslot = session.get(TimeSlot, s.timeslot_id)
-            result.append({
-                "id": s.id,
-                "exam": exam.model_dump() if exam else None,
-                "room": room.model_dump() if room else None,
-                "timeslot": timeslot.model_dump() if timeslot else None,
-            })
+    exam_ids = list(dict.fromkeys(adjacency.student_exams(session, student_id)))
+    rows = session.exec(
+        select(Schedule, Exam, Room, TimeSlot)
+        .outerjoin(Exam, Exam.id == Schedule.exam_id)
+        .outerjoin(Room, Room.id == Schedule.room_id)
+        .outerjoin(TimeSlot, TimeSlot.id == Schedule.timeslot_id)
+        .where(Schedule.version_id == vid, Schedule.exam_id.in_(exam_ids))
+        .order_by(Schedule.id)
+    ).all() if exam_ids else []
+    result = [
+        {
+            "id": s.id,
+            "exam": exam.model_dump() if exam else None,
+            "room": room.model_dump() if room else None,
+            "timeslot": timeslot.model_dump() if timeslot else None,
+        }
+        for s, exam, room, timeslot in rows
+    ]
 
     return {
         "student": student.model_dump(),
         "schedules": result,
-        "enrolled_exam_ids": list(exam_ids),
+        "enrolled_exam_ids": exam_ids,
     }
 
 
-# --- Conflicts ---
+# --- Batch lookups ---
+# One request for a modal's worth of ids: each table is read once with an
+# IN (...) over every id, and rows are joined in memory.
 
+BATCH_LIMIT = 500
 
-@router.get("/conflicts")
-def get_conflicts(version_id: Optional[int] = Query(None), session: Session = Depends(get_session)):
+
+def _rows_by_id(session: Session, model, ids) -> dict[int, dict]:
+    ids = list(set(ids))
+    if not ids:
+        return {}
+    return {row.id: row.model_dump() for row in session.exec(select(model).where(model.id.in_(ids))).all()}
+
+
+@router.get("/exams/students")
+def get_exams_students(
+    exam_id: list[int] = Query(..., max_length=BATCH_LIMIT),
+    session: Session = Depends(get_session),
+):
+    """Batch of /exams/{exam_id}/students: enrolled students per requested exam, in request order."""
+    enrolled = adjacency.exams_students(session, exam_id)
+    students = _rows_by_id(session, Student, (sid for ids in enrolled.values() for sid in ids))
+    return [
+        {"exam_id": eid, "students": [students[sid] for sid in enrolled[eid] if sid in students]}
+        for eid in dict.fromkeys(exam_id)
+    ]
+
+
+@router.get("/students/schedules")
+def get_student_schedules(
+    student_id: list[int] = Query(..., max_length=BATCH_LIMIT),
+    version_id: Optional[int] = Query(None),
+    session: Session = Depends(get_session),
+):
+    """Batch of /students/{student_id}/schedule, in request order; unknown students are left out."""
     vid = _get_version_id(session, version_id)
-    schedules = session.exec(select(Schedule).where(Schedule.version_id == vid)).all()
-    enrollments = session.exec(select(StudentExam)).all()
-    students = session.exec(select(Student)).all()
-    exams = session.exec(select(Exam)).all()
-    timeslots = session.exec(select(TimeSlot)).all()
+    students = _rows_by_id(session, Student, student_id)
+    enrolled = {
+        sid: list(dict.fromkeys(ids))
+        for sid, ids in adjacency.students_exams(session, list(students)).items()
+    }
+    exam_ids = {eid for ids in enrolled.values() for eid in ids}
+    schedules: dict[int, list[Schedule]] = defaultdict(list)
+    if exam_ids:
+        for s in session.exec(
+            select(Schedule)
+            .where(Schedule.version_id == vid, Schedule.exam_id.in_(exam_ids))
+            .order_by(Schedule.id)
+        ).all():
+            schedules[s.exam_id].append(s)
+    placed = [s for ss in schedules.values() for s in ss]
+    exams = _rows_by_id(session, Exam, exam_ids)
+    rooms = _rows_by_id(session, Room, (s.room_id for s in placed))
+    timeslots = _rows_by_id(session, TimeSlot, (s.timeslot_id for s in placed))
 
-    student_map = {s.id: s for s in students}
-    exam_map = {e.id: e for e in exams}
-    ts_map = {t.id: t for t in timeslots}
+    result = []
+    for sid in dict.fromkeys(student_id):
+        if sid not in students:
+            continue
+        own = sorted((s for eid in enrolled[sid] for s in schedules.get(eid, ())), key=lambda s: s.id)
+        result.append({
+            "student": students[sid],
+            "schedules": [
+                {
+                    "id": s.id,
+                    "exam": exams.get(s.exam_id),
+                    "room": rooms.get(s.room_id),
+                    "timeslot": timeslots.get(s.timeslot_id),
+                }
+                for s in own
+            ],
+            "enrolled_exam_ids": enrolled[sid],
+        })
+    return result
 
-    exam_to_ts: dict[int, int] = {}
-    for s in schedules:
-        exam_to_ts[s.exam_id] = s.timeslot_id
 
-    student_exams: dict[int, list[int]] = defaultdict(list)
-    for se in enrollments:
-        student_exams[se.student_id].append(se.exam_id)
+# --- Conflicts ---
+
 
+@router.get("/conflicts")
+async def get_conflicts(
+    version_id: Optional[int] = Query(None),
+    conflict_type: Optional[str] = Query(None, alias="type", pattern="^(student|instructor|room)$"),
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, description="Page size; every matching conflict when unset"),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Student, instructor and room double-bookings, optionally of one type, a page at a time."""
+    vid = await _aget_version_id(session, version_id)
+    revision, groups = _conflict_groups.get(session, vid)
+    if groups is None:
+        assignments = (await session.exec(
+            select(Schedule.exam_id, Schedule.room_id, Schedule.timeslot_id)
+            .where(Schedule.version_id == vid)
+            .order_by(Schedule.id)
+        )).all()
+        enrollments = (await session.exec(select(StudentExam.student_id, StudentExam.exam_id))).all()
+        exams = await readmodel.aload(session, ExamInfo)
+        timeslots = await readmodel.aload(session, SlotInfo)
+        groups = await run_cpu(find_conflicts, assignments, enrollments, exams, timeslots)
+        _conflict_groups.put(session, vid, revision, groups)
+
+    counts = dict.fromkeys(CONFLICT_TYPES, 0)
+    for kind, _, _ in groups:
+        counts[kind] += 1
+    matching = [g for g in groups if g[0] == conflict_type] if conflict_type else groups
+    page = matching[offset:offset + limit] if limit is not None else matching[offset:]
+
+    # Load only what the page shows
+    exam_ids = {eid for _, _, eids in page for eid in eids}
+    student_ids = {key for kind, key, _ in page if kind == "student"}
+    room_ids = {key for kind, key, _ in page if kind == "room"}
+    exam_map = {e.id: e for e in (await session.exec(select(Exam).where(Exam.id.in_(exam_ids)))).all()}
+    student_map = {s.id: s for s in (await session.exec(select(Student).where(Student.id.in_(student_ids)))).all()}
+    room_map = {r.id: r for r in (await session.exec(select(Room).where(Room.id.in_(room_ids)))).all()}
+    slot_of = dict((await session.exec(
+        select(Schedule.exam_id, Schedule.timeslot_id)
+        .where(Schedule.version_id == vid, Schedule.exam_id.in_(exam_ids))
+        .order_by(Schedule.id)
+    )).all())
+    ts_map = {t.id: t for t in (await session.exec(select(TimeSlot).where(TimeSlot.id.in_(set(slot_of.values()))))).all()}
+
+    # A conflict is reported against the timeslot of its earliest exam
     conflicts = []
-    seen = set()
-    for sid, eids in student_exams.items():
-        ts_exams: dict[int, list[int]] = defaultdict(list)
-        for eid in eids:
-            if eid in exam_to_ts:
-                ts_exams[exam_to_ts[eid]].append(eid)
-
-        for tsid, conflicting_eids in ts_exams.items():
-            if len(conflicting_eids) > 1:
-                key = (sid, tsid)
-                if key not in seen:
-                    seen.add(key)
-                    student = student_map.get(sid)
-                    ts = ts_map.get(tsid)
-                    conflicts.append({
-                        "student": student.model_dump() if student else None,
-                        "timeslot": ts.model_dump() if ts else None,
-                        "exams": [exam_map[e].model_dump() for e in conflicting_eids if e in exam_map],
-                    })
+    for kind, key, eids in page:
+        student = student_map.get(key) if kind == "student" else None
+        room = room_map.get(key) if kind == "room" else None
+        ts = ts_map.get(slot_of.get(eids[0]))
+        conflicts.append({
+            "type": kind,
+            "student": student.model_dump() if student else None,
+            "instructor": key if kind == "instructor" else None,
+            "room": room.model_dump() if room else None,
+            "timeslot": ts.model_dump() if ts else None,
+            "exams": [exam_map[e].model_dump() for e in eids if e in exam_map],
+        })
 
     return {
-        "total_conflicts": len(conflicts),
+        "total_conflicts": len(matching),
+        "counts": counts,
+        "offset": offset,
+        "limit": limit,
         "conflicts": conflicts,
     }
 
 
-# --- Analytics ---
-
-
-@router.get("/analytics")
-def get_analytics(
+@router.get("/conflicts/explain")
+def explain_conflict(
+    exam_id: list[int] = Query(..., description="The conflict's exams"),
+    student_id: Optional[int] = Query(None, description="Narrow the conflict to this student's exams"),
     version_id: Optional[int] = Query(None),
-    include_no_exam: bool = Query(False),
+    swaps: bool = Query(True, description="Also consider two-exam swaps"),
+    limit: int = Query(10, ge=1, le=100),
     session: Session = Depends(get_session),
 ):
-    vid = _get_version_id(session, version_id)
-    schedules = session.exec(select(Schedule).where(Schedule.version_id == vid)).all()
-    rooms = session.exec(select(Room)).all()
-    all_exams = session.exec(select(Exam)).all()
-    exams = [e for e in all_exams if e.student_count > 0 and (include_no_exam or e.exam_type != "No Final Exam")]
-    timeslots = session.exec(select(TimeSlot)).all()
-    enrollments = session.exec(select(StudentExam)).all()
-    students = session.exec(select(Student)).all()
+    """
+    The cheapest moves and swaps that resolve a student conflict. Changes are
+    counted in overlapping exam pairs per student: three mutually overlapping
+    exams are one conflict in /conflicts but three pairs here.
+    """
+    from ..explain import DeltaEngine, get_shared
 
-    room_map = {r.id: r for r in rooms}
-    exam_map = {e.id: e for e in exams}
+    vid = _get_version_id(session, version_id)
+    revision, engine = _delta_engines.get(session, vid)
+    if engine is None:
+        engine = DeltaEngine(
+            session.exec(
+                select(Schedule.id, Schedule.exam_id, Schedule.room_id, Schedule.timeslot_id, Schedule.row_version)
+                .where(Schedule.version_id == vid)
+                .order_by(Schedule.id)
+            ).all(),
+            get_shared(session),
+            readmodel.load(session, ExamInfo),
+            readmodel.load(session, SlotInfo),
+        )
+        _delta_engines.put(session, vid, revision, engine)
+
+    group = list(dict.fromkeys(exam_id))
+    if student_id is not None:
+        if not session.get(Student, student_id):
+            raise HTTPException(404, "Student not found")
+        enrolled = set(adjacency.student_exams(session, student_id))
+        group = [e for e in group if e in enrolled]
+    unplaced = [e for e in group if e not in engine.placed]
+    if unplaced:
+        raise HTTPException(404, f"Exam {unplaced[0]} is not scheduled in this version")
+    if len(group) < 2:
+        raise HTTPException(422, "A conflict needs at least two exams")
+
+    page, priced = engine.explain(group, feasibility.get_index(session), occupancy.get_index(session, vid), swaps, limit)
+
+    # Load only what the page shows
+    exam_ids = set(group) | {e for c in page for e, _, _ in c["changes"]}
+    names = dict(session.exec(select(Exam.id, Exam.course_name).where(Exam.id.in_(exam_ids))).all())
+    rooms = dict(session.exec(
+        select(Room.id, Room.name).where(Room.id.in_({r for c in page for _, r, _ in c["changes"]}))
+    ).all())
+    ts_map = {t.id: t for t in session.exec(
+        select(TimeSlot).where(TimeSlot.id.in_({t for c in page for _, _, t in c["changes"]}))
+    ).all()}
+    return {
+        "version_id": vid,
+        "student_id": student_id,
+        "exams": [{"exam_id": e, "course_name": names.get(e), "timeslot_id": engine.placed[e].timeslot_id} for e in group],
+        "student_overlap_pairs": engine.total,
+        "candidates": priced,
+        "fixes": [
+            {
+                "kind": c["kind"],
+                "delta": c["delta"],
+                "resolves": c["resolves"],
+                "student_overlap_pairs_after": engine.total + c["delta"],
+                "moves": [
+                    {
+                        "schedule_id": engine.placed[e].schedule_id,
+                        "row_version": engine.placed[e].row_version,
+                        "exam_id": e,
+                        "course_name": names.get(e),
+                        "from_timeslot_id": engine.placed[e].timeslot_id,
+                        "timeslot_id": t,
+                        "timeslot": ts_map[t].model_dump() if t in ts_map else None,
+                        "room_id": r,
+                        "room_name": rooms.get(r),
+                    }
+                    for e, r, t in c["changes"]
+                ],
+            }
+            for c in page
+        ],
+    }
 
-    exam_to_ts: dict[int, int] = {}
-    for s in schedules:
-        exam_to_ts[s.exam_id] = s.timeslot_id
 
-    student_exams: dict[int, list[int]] = defaultdict(list)
-    for se in enrollments:
-        student_exams[se.student_id].append(se.exam_id)
-
-    conflict_count = 0
-    affected_students = set()
-    for sid, eids in student_exams.items():
-        ts_exams: dict[int, list[int]] = defaultdict(list)
-        for eid in eids:
-            if eid in exam_to_ts:
-                ts_exams[exam_to_ts[eid]].append(eid)
-        for tsid, ceids in ts_exams.items():
-            if len(ceids) > 1:
-                conflict_count += 1
-                affected_students.add(sid)
-
-    room_usage: dict[int, int] = defaultdict(int)
-    for s in schedules:
-        room_usage[s.room_id] += 1
+# --- Analytics ---
 
-    capacity_warnings = []
-    for s in schedules:
-        exam = exam_map.get(s.exam_id)
-        room = room_map.get(s.room_id)
-        if exam and room and exam.student_count > room.capacity:
-            capacity_warnings.append({
-                "exam": exam.course_name,
-                "students": exam.student_count,
-                "room": room.name,
-                "capacity": room.capacity,
-            })
 
-    exam_ids = set(exam_map.keys())
-    scheduled_ids = {eid for eid in exam_to_ts.keys() if eid in exam_ids}
+@router.get("/analytics")
+async def get_analytics(
+    version_id: Optional[int] = Query(None),
+    include_no_exam: bool = Query(False),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """The version's materialized summary; computed and stored on first read after an invalidation."""
+    vid = await _aget_version_id(session, version_id)
+    for _ in range(3):
+        snapshot = (await session.exec(analytics_store.current_query(vid, include_no_exam))).first()
+        if snapshot is not None:
+            return json.loads(snapshot.payload)
+
+        seen = await session.run_sync(analytics_store.marker, vid)
+        assignments = (await session.exec(
+            select(Schedule.exam_id, Schedule.timeslot_id)
+            .where(Schedule.version_id == vid)
+            .order_by(Schedule.id)
+        )).all()
+        enrollments = (await session.exec(select(StudentExam.student_id, StudentExam.exam_id))).all()
+        timeslots = await readmodel.aload(session, SlotInfo)
+        durations = (await session.exec(select(Exam.id, Exam.duration_minutes))).all()
+        conflict_count, affected = await run_cpu(count_conflicts, assignments, enrollments, timeslots, durations)
+        payloads = await session.run_sync(analytics_store.store_computed, vid, seen, conflict_count, affected)
+        await session.commit()
+        if payloads is not None:
+            return payloads[include_no_exam]
+    # edits keep landing under the count; serve the last one without materializing it
+    return (await session.run_sync(analytics_store.summaries, vid, conflict_count, affected))[include_no_exam]
+
+
+@router.get("/analytics/history")
+async def get_analytics_history(
+    version_id: Optional[int] = Query(None),
+    include_no_exam: bool = Query(False),
+    limit: int = Query(50, ge=1, le=analytics_store.HISTORY_LIMIT),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Headline metrics of the most recent snapshots, oldest first, for trend charts."""
+    vid = await _aget_version_id(session, version_id)
+    snapshots = (await session.exec(
+        select(AnalyticsSnapshot)
+        .where(AnalyticsSnapshot.version_id == vid, AnalyticsSnapshot.include_no_exam == include_no_exam)
+        .order_by(AnalyticsSnapshot.revision.desc())
+        .limit(limit)
+    )).all()
+    return [
+        {
+            "revision": s.revision,
+            "computed_at": s.computed_at,
+            "current": s.current,
+            "conflict_count": s.conflict_count,
+            "affected_students": s.affected_students,
+            "scheduled_exams": s.scheduled_exams,
+            "capacity_warnings": s.capacity_warnings,
+        }
+        for s in reversed(snapshots)
+    ]
+
+
+# --- Heatmap ---
+
+
+@router.get("/heatmap")
+async def get_heatmap(
+    version_id: Optional[int] = Query(None),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Exams, seats, room capacity, conflicts and back-to-back students per (date, slot)."""
+    vid = await _aget_version_id(session, version_id)
+    revision, heatmap = _heatmaps.get(session, vid)
+    if heatmap is None:
+        # numpy is only needed here; importing it on first use keeps it out of startup
+        from ..heatmap import compute_heatmap
+
+        timeslots = await readmodel.aload(session, SlotInfo)
+        assignments = (await session.exec(
+            select(Schedule.exam_id, Schedule.room_id, Schedule.timeslot_id)
+            .where(Schedule.version_id == vid)
+            .order_by(Schedule.id)
+        )).all()
+        exam_sizes = (await session.exec(select(Exam.id, Exam.student_count))).all()
+        room_capacities = (await session.exec(select(Room.id, Room.capacity))).all()
+        enrollments = (await session.exec(select(StudentExam.student_id, StudentExam.exam_id))).all()
+        heatmap = await run_cpu(compute_heatmap, timeslots, assignments, exam_sizes, room_capacities, enrollments)
+        _heatmaps.put(session, vid, revision, heatmap)
+    return {"version_id": vid, **heatmap}
+
+
+# --- Utilization ---
+
+
+@router.get("/utilization")
+async def get_utilization(
+    version_id: Optional[int] = Query(None),
+    limit: int = Query(20, ge=1, le=500),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Time-weighted room and building utilization, seat efficiency, wasted seats per slot and the most oversized assignments."""
+    vid = await _aget_version_id(session, version_id)
+    revision, utilization = _utilization.get(session, vid)
+    if utilization is None:
+        # numpy is only needed here; importing it on first use keeps it out of startup
+        from ..utilization import compute_utilization
+
+        timeslots = await readmodel.aload(session, SlotInfo)
+        rooms = (await session.exec(
+            select(Room.id, Room.building, Room.name, Room.capacity, Room.available).order_by(Room.id)
+        )).all()
+        exams = await readmodel.aload(session, ExamInfo)
+        assignments = (await session.exec(
+            select(Schedule.exam_id, Schedule.room_id, Schedule.timeslot_id)
+            .where(Schedule.version_id == vid)
+            .order_by(Schedule.id)
+        )).all()
+        utilization = await run_cpu(compute_utilization, timeslots, rooms, exams, assignments)
+        _utilization.put(session, vid, revision, utilization)
+
+    oversized = utilization["oversized"][:limit]
+    names = dict((await session.exec(
+        select(Exam.id, Exam.course_name).where(Exam.id.in_([o["exam_id"] for o in oversized]))
+    )).all()) if oversized else {}
     return {
-        "total_exams": len(exams),
-        "scheduled_exams": len(scheduled_ids),
-        "total_rooms": len(rooms),
-        "total_students": len(students),
-        "total_timeslots": len(timeslots),
-        "conflict_count": conflict_count,
-        "affected_students": len(affected_students),
-        "capacity_warnings": capacity_warnings,
-        "room_usage": [
-            {"room": room_map[rid].name, "count": c}
-            for rid, c in sorted(room_usage.items())
-            if rid in room_map
-        ],
+        "version_id": vid,
+        **utilization,
+        "oversized_total": len(utilization["oversized"]),
+        "oversized": [{**o, "course_name": names.get(o["exam_id"])} for o in oversized],
     }
+
+
+# --- Scenario sweeps ---
+
+
+@router.post("/sweeps")
+async def run_sweep(body: SweepCreate, session: AsyncSession = Depends(get_async_session)):
+    """Solve each scenario from the base version in worker processes; returns their comparison table."""
+    from ..solver import solve
+
+    vid = await _aget_version_id(session, body.base_version_id)
+    for s in body.scenarios:
+        for d in s.add_dates:
+            try:
+                date.fromisoformat(d)
+            except ValueError:
+                raise HTTPException(422, f"Invalid date: {d!r}")
+    params = [{**s.model_dump(), "name": s.name or f"Scenario {i + 1}"} for i, s in enumerate(body.scenarios)]
+    term_revision = revisions.term_revision(session)
+    problem = await session.run_sync(scenarios.load_problem, vid)
+    results = await run_parallel(solve, [(problem, p) for p in params])
+    sweep = scenarios.save(session, term_revision, vid, params, results)
+    return scenarios.table(sweep)
+
+
+@router.get("/sweeps/{sweep_id}")
+def get_sweep(sweep_id: str, session: Session = Depends(get_session)):
+    sweep = scenarios.get(session, sweep_id)
+    if not sweep:
+        raise HTTPException(404, "Sweep not found")
+    return {**scenarios.table(sweep), "current": scenarios.is_current(session, sweep)}
+
+
+@router.post("/sweeps/{sweep_id}/scenarios/{index}/persist", response_model=ScheduleVersion, status_code=201)
+def persist_scenario(sweep_id: str, index: int, body: ScheduleVersionCreate, session: Session = Depends(get_session)):
+    """Save one scenario of a sweep as a new version."""
+    sweep = scenarios.get(session, sweep_id)
+    if not sweep:
+        raise HTTPException(404, "Sweep not found")
+    if not 0 <= index < len(sweep.results):
+        raise HTTPException(404, "Scenario not found")
+    if not scenarios.is_current(session, sweep):
+        raise HTTPException(409, "Term data changed since the sweep was run; run it again")
+    return scenarios.persist(session, sweep, index, body.name)
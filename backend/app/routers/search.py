@@ -0,0 +1,21 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session
+
+from .. import search
+from ..database import get_session
+from ..instrumentation import InstrumentedRoute
+
+router = APIRouter(prefix="/search", tags=["search"], route_class=InstrumentedRoute)
+
+
+@router.get("/")
+def search_entities(
+    q: str = Query(..., min_length=1, description="Words to match; each is treated as a prefix"),
+    kind: Optional[str] = Query(None, pattern="^(exam|student|room|instructor)$"),
+    limit: int = Query(20, ge=1, le=100),
+    session: Session = Depends(get_session),
+):
+    """Ranked typeahead search over exams, students, rooms and instructors."""
+    return search.search(session, q, kind, limit)
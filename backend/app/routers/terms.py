@@ -0,0 +1,43 @@
+from fastapi import APIRouter
+from sqlalchemy import func, inspect
+from sqlmodel import select
+
+from ..database import DEFAULT_TERM, list_terms, term_session
+from ..instrumentation import InstrumentedRoute
+from ..models import Exam, Room, Schedule, ScheduleVersion, Student, StudentExam, TimeSlot
+
+router = APIRouter(prefix="/terms", tags=["terms"], route_class=InstrumentedRoute)
+
+
+@router.get("/")
+def get_terms():
+    return [{"term": t, "default": t == DEFAULT_TERM} for t in list_terms()]
+
+
+@router.get("/summary")
+def get_terms_summary():
+    """Cross-term comparison: per-term totals, each read from that term's own database."""
+    result = []
+    for term in list_terms():
+        with term_session(term) as session:
+            if not inspect(session.get_bind()).has_table("exam"):
+                continue  # term file created but never imported into
+
+            def count(model):
+                return session.exec(select(func.count()).select_from(model)).one()
+
+            exams = count(Exam)
+            students = count(Student)
+            enrollments = count(StudentExam)
+            result.append({
+                "term": term,
+                "exams": exams,
+                "students": students,
+                "enrollments": enrollments,
+                "rooms": count(Room),
+                "timeslots": count(TimeSlot),
+                "versions": count(ScheduleVersion),
+                "assignments": count(Schedule),
+                "exams_per_student": round(enrollments / students, 2) if students else 0,
+            })
+    return result
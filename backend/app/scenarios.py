@@ -0,0 +1,134 @@
+"""
+Scenario sweeps: solve many variants of a term's schedule, keep the results
+in memory, and persist only the ones picked.
+
+A sweep holds every scenario's assignments next to the term revision it was
+solved at (see revisions.py). Persisting a pick writes a ScheduleVersion
+through the ORM, so it appears in the version's edit log like any other
+edit; if the term's exams, rooms, timeslots, enrollments or blackouts have
+moved on since, the pick is refused and the sweep has to be rerun. Sweeps
+live in this process only and the oldest are dropped past MAX_SWEEPS.
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlmodel import Session, select
+
+from . import readmodel, revisions
+from .database import DEFAULT_TERM
+from .models import InstructorBlackout, Schedule, ScheduleVersion, StudentExam, TimeSlot
+from .readmodel import ExamInfo, RoomInfo, SlotInfo
+
+MAX_SWEEPS = 20
+
+
+@dataclass
+class Sweep:
+    id: str
+    term: str
+    term_revision: int
+    base_version_id: int
+    created_at: str
+    scenarios: list[dict]   # the request's Scenario fields
+    results: list[dict]     # solver.solve output per scenario
+
+
+_lock = threading.Lock()
+_sweeps: "OrderedDict[str, Sweep]" = OrderedDict()
+
+
+def load_problem(session: Session, version_id: int):
+    """The solver's input for a sweep based on version_id."""
+    from .solver import build_problem
+
+    return build_problem(
+        readmodel.load(session, ExamInfo),
+        readmodel.load(session, RoomInfo),
+        readmodel.load(session, SlotInfo),
+        session.exec(select(InstructorBlackout.instructor, InstructorBlackout.date)).all(),
+        session.exec(
+            select(Schedule.exam_id, Schedule.timeslot_id)
+            .where(Schedule.version_id == version_id)
+            .order_by(Schedule.id)
+        ).all(),
+        session.exec(select(StudentExam.student_id, StudentExam.exam_id)).all(),
+    )
+
+
+def save(session, term_revision: int, base_version_id: int, scenarios: list[dict], results: list[dict]) -> Sweep:
+    sweep = Sweep(
+        id=uuid.uuid4().hex,
+        term=session.info.get("term", DEFAULT_TERM),
+        term_revision=term_revision,
+        base_version_id=base_version_id,
+        created_at=datetime.now(timezone.utc).isoformat(),
+        scenarios=scenarios,
+        results=results,
+    )
+    with _lock:
+        _sweeps[sweep.id] = sweep
+        while len(_sweeps) > MAX_SWEEPS:
+            _sweeps.popitem(last=False)
+    return sweep
+
+
+def get(session, sweep_id: str) -> Optional[Sweep]:
+    with _lock:
+        sweep = _sweeps.get(sweep_id)
+    if sweep is None or sweep.term != session.info.get("term", DEFAULT_TERM):
+        return None
+    return sweep
+
+
+def is_current(session, sweep: Sweep) -> bool:
+    return revisions.term_revision(session) == sweep.term_revision
+
+
+def table(sweep: Sweep) -> dict:
+    """The sweep's comparison table: parameters and metrics per scenario."""
+    return {
+        "sweep_id": sweep.id,
+        "base_version_id": sweep.base_version_id,
+        "created_at": sweep.created_at,
+        "scenarios": [
+            {"index": i, **params, **result["metrics"]}
+            for i, (params, result) in enumerate(zip(sweep.scenarios, sweep.results))
+        ],
+    }
+
+
+def persist(session: Session, sweep: Sweep, index: int, name: str) -> ScheduleVersion:
+    """Write one scenario as a new version, creating the timeslots of any added dates it uses."""
+    result = sweep.results[index]
+    slots = result["slots"]
+    ids: dict[int, int] = {}
+    for t in sorted({t for _, _, t in result["assignments"]}):
+        sid, date, start, end = slots[t]
+        if sid is None:
+            existing = session.exec(
+                select(TimeSlot).where(TimeSlot.date == date, TimeSlot.start_time == start, TimeSlot.end_time == end)
+            ).first()
+            if existing is None:
+                existing = TimeSlot(date=date, start_time=start, end_time=end)
+                session.add(existing)
+                session.flush()
+            sid = existing.id
+        ids[t] = sid
+
+    version = ScheduleVersion(name=name, active=True)
+    session.add(version)
+    session.flush()
+    session.add_all(
+        Schedule(version_id=version.id, exam_id=e, room_id=r, timeslot_id=ids[t])
+        for e, r, t in result["assignments"]
+    )
+    session.commit()
+    # timeslots written here move the term revision; the sweep's other picks are still valid
+    sweep.term_revision = revisions.term_revision(session)
+    session.refresh(version)
+    return version
@@ -0,0 +1,95 @@
+"""
+The optimizer's phase-1 objective (model/twostagemodel.ipynb), evaluated for
+any schedule version:
+
+    lamb * overlap + mu * three_in_48h + nu * back_to_back
+
+Timeslots are taken in date/time order, as the model's T. Per student, with
+c[t] the number of their exams in slot t:
+
+  * overlap       - sum over t of c[t] * (c[t] - 1) / 2, i.e. the notebook's
+                    pairwise overlap[c1, c2] counted for pairs in one slot
+  * three_in_48h  - sum over every 6-slot window (3 slots a day, so 48
+                    hours) of max(0, exams in the window - 2)
+  * back_to_back  - sum over consecutive slots t, t+1 of
+                    max(0, c[t] + c[t+1] - 1)
+
+The notebook weights unique schedules by their student count; summing per
+student is the same total. Components don't depend on the weights, so they
+are computed once per version (one (students x slots) count matrix, then a
+few array reductions) and weighted per request.
+"""
+
+from typing import Sequence
+
+import numpy as np
+
+from .heatmap import _columns
+from .readmodel import SlotInfo
+
+LAMB, MU, NU = 1.0, 0.7, 0.7  # phase1_timeslot_assignment defaults
+WINDOW = 6  # slots in 48 hours
+
+COMPONENTS = ("overlap", "three_in_48h", "back_to_back")
+
+
+def objective_components(counts: np.ndarray) -> dict[str, int]:
+    """Objective components of a (students, slots) exam-count matrix."""
+    overlap = (counts * (counts - 1) // 2).sum()
+    back_to_back = np.clip(counts[:, 1:] + counts[:, :-1] - 1, 0, None).sum()
+    running = np.zeros((counts.shape[0], counts.shape[1] + 1), dtype=np.int64)
+    np.cumsum(counts, axis=1, out=running[:, 1:])
+    in_window = running[:, WINDOW:] - running[:, :-WINDOW]
+    three_in_48h = np.clip(in_window - 2, 0, None).sum()
+    return {"overlap": int(overlap), "three_in_48h": int(three_in_48h), "back_to_back": int(back_to_back)}
+
+
+def score_versions(
+    timeslots: Sequence[SlotInfo],
+    assignments: Sequence[tuple[int, int, int]],
+    enrollments: Sequence[tuple[int, int]],
+) -> dict[int, dict]:
+    """
+    assignments are (version_id, exam_id, timeslot_id), enrollments
+    (student_id, exam_id). Returns version_id -> components plus the number
+    of scheduled exams, for every version that has assignments.
+    """
+    slots = sorted(timeslots, key=lambda t: (t.date, t.start_time, t.id))
+    n = len(slots)
+    cell_of = {t.id: i for i, t in enumerate(slots)}
+
+    e_student, e_exam = _columns(enrollments, 2)
+    students, e_student = np.unique(e_student, return_inverse=True)
+    by_version: dict[int, list[tuple[int, int]]] = {}
+    for v, e, t in assignments:
+        if t in cell_of:
+            by_version.setdefault(v, []).append((e, cell_of[t]))
+
+    results = {}
+    for vid, rows in by_version.items():
+        a_exam, a_cell = _columns(rows, 2)
+        # exam id -> cell (-1 when unscheduled); last assignment wins, as elsewhere
+        exam_cell = np.full(max(int(a_exam.max()), int(e_exam.max(initial=0))) + 1, -1, dtype=np.int64)
+        exam_cell[a_exam] = a_cell
+        e_cell = exam_cell[e_exam]
+        scheduled = e_cell >= 0
+        counts = np.bincount(
+            e_student[scheduled] * n + e_cell[scheduled], minlength=len(students) * n
+        ).reshape(len(students), n)
+        results[vid] = {**objective_components(counts), "scheduled_exams": int((exam_cell >= 0).sum())}
+    return results
+
+
+def weigh(components: dict, lamb: float, mu: float, nu: float) -> dict:
+    """The objective and its weighted terms for one version's components."""
+    weighted = {
+        "overlap": lamb * components["overlap"],
+        "three_in_48h": mu * components["three_in_48h"],
+        "back_to_back": nu * components["back_to_back"],
+    }
+    return {
+        "objective": round(sum(weighted.values()), 6),
+        "components": {c: components[c] for c in COMPONENTS},
+        "weighted": {c: round(w, 6) for c, w in weighted.items()},
+        "scheduled_exams": components["scheduled_exams"],
+    }
@@ -0,0 +1,149 @@
+"""
+SQLite FTS5 index over exams, students and rooms.
+
+One ``search_index`` virtual table per term database holds a document per
+row: a label (course name, student name, building + room), the exam's
+instructor, and the remaining searchable fields. The rowid encodes the
+source row (id * 4 + kind), so a write replaces its document by rowid.
+
+ORM inserts/updates/deletes of Exam, Student and Room write the document
+on the same connection, inside the flush, so the index commits or rolls
+back with the row. Core bulk inserts (bundle imports) call ``rebuild``.
+Prefix indexes of 1-3 characters keep typeahead queries cheap.
+"""
+
+import re
+from typing import Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+from sqlmodel import Session, select
+
+from .models import Exam, Room, Student
+
+KINDS = {"exam": 1, "student": 2, "room": 3}
+
+# bm25 column weights: kind, ref_id, label, instructor, detail
+_WEIGHTS = "0.0, 0.0, 10.0, 4.0, 1.0"
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _join(*values) -> str:
+    return " ".join(str(v) for v in values if v not in (None, ""))
+
+
+def _document(kind: str, obj) -> dict:
+    if kind == "exam":
+        label, instructor = obj.course_name, obj.instructor
+        detail = _join(obj.subject, obj.course_number, obj.section, obj.title, obj.crn)
+    elif kind == "student":
+        label, instructor, detail = obj.name, None, _join(obj.email, obj.person_id)
+    else:
+        label, instructor, detail = _join(obj.building, obj.name), None, ""
+    return {
+        "rowid": obj.id * 4 + KINDS[kind],
+        "kind": kind,
+        "ref_id": obj.id,
+        "label": label or "",
+        "instructor": instructor or "",
+        "detail": detail,
+    }
+
+
+_INSERT = text(
+    "INSERT INTO search_index (rowid, kind, ref_id, label, instructor, detail) "
+    "VALUES (:rowid, :kind, :ref_id, :label, :instructor, :detail)"
+)
+_DELETE = text("DELETE FROM search_index WHERE rowid = :rowid")
+
+
+def create_index(conn: Connection) -> None:
+    """Create the index if this database doesn't have one yet, filling it from existing rows."""
+    exists = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'")
+    ).first()
+    if exists:
+        return
+    conn.execute(text(
+        "CREATE VIRTUAL TABLE search_index USING fts5("
+        "kind UNINDEXED, ref_id UNINDEXED, label, instructor, detail, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '1 2 3')"
+    ))
+    _fill(conn)
+
+
+def _fill(conn: Connection) -> None:
+    with Session(bind=conn) as session:
+        for kind, model in (("exam", Exam), ("student", Student), ("room", Room)):
+            docs = [_document(kind, obj) for obj in session.exec(select(model)).all()]
+            if docs:
+                conn.execute(_INSERT, docs)
+
+
+def rebuild(session: Session) -> None:
+    """Re-index every exam, student and room, e.g. after a Core bulk insert."""
+    conn = session.connection()
+    conn.execute(text("DELETE FROM search_index"))
+    _fill(conn)
+
+
+# --- Keep the index in sync with ORM writes ---
+
+
+def _kind(target) -> str:
+    return {Exam: "exam", Student: "student", Room: "room"}[type(target)]
+
+
+@event.listens_for(Exam, "after_insert")
+@event.listens_for(Exam, "after_update")
+@event.listens_for(Student, "after_insert")
+@event.listens_for(Student, "after_update")
+@event.listens_for(Room, "after_insert")
+@event.listens_for(Room, "after_update")
+def _indexed_row_written(mapper, connection, target):
+    doc = _document(_kind(target), target)
+    connection.execute(_DELETE, {"rowid": doc["rowid"]})
+    connection.execute(_INSERT, doc)
+
+
+@event.listens_for(Exam, "after_delete")
+@event.listens_for(Student, "after_delete")
+@event.listens_for(Room, "after_delete")
+def _indexed_row_deleted(mapper, connection, target):
+    connection.execute(_DELETE, {"rowid": target.id * 4 + KINDS[_kind(target)]})
+
+
+# --- Queries ---
+
+
+def match_expression(q: str) -> Optional[str]:
+    """Turn free text into an FTS5 query where every word is a prefix that must match."""
+    tokens = _TOKEN.findall(q.lower())
+    if not tokens:
+        return None
+    return " AND ".join(f'"{t}"*' for t in tokens)
+
+
+def search(session: Session, q: str, kind: Optional[str] = None, limit: int = 20) -> list[dict]:
+    """Best matches first, as dicts of kind, id, label, instructor and detail."""
+    expression = match_expression(q)
+    if expression is None:
+        return []
+    if kind == "instructor":
+        expression = f"instructor : ({expression})"
+    sql = (
+        f"SELECT kind, ref_id, label, instructor, detail, bm25(search_index, {_WEIGHTS}) AS score "
+        "FROM search_index WHERE search_index MATCH :q"
+    )
+    params: dict = {"q": expression, "limit": limit}
+    if kind in KINDS:
+        sql += " AND kind = :kind"
+        params["kind"] = kind
+    elif kind == "instructor":
+        sql += " AND kind = 'exam'"
+    rows = session.connection().execute(text(sql + " ORDER BY score LIMIT :limit"), params).all()
+    return [
+        {"kind": k, "id": ref_id, "label": label, "instructor": instructor or None, "detail": detail}
+        for k, ref_id, label, instructor, detail, _ in rows
+    ]
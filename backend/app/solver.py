@@ -0,0 +1,316 @@
+"""
+A heuristic for the optimizer's phase-1 objective (see scoring.py), for
+sweeping weights and constraint tweaks without a MIP solver.
+
+Each scenario starts from the base version's slots (or from scratch) and
+improves them in two phases, mirroring model/twostagemodel.ipynb:
+
+  1. timeslots - unplaced exams are placed greedily, most shared students
+                 first; then passes of local search move one exam at a
+                 time to the slot that lowers the objective most, until a
+                 pass makes no move. Moving an exam only changes its own
+                 students' rows, and the objective's change from adding an
+                 exam to slot t is, summed over those rows:
+
+                     lamb * c[t]
+                   + nu   * [c[t-1] + c[t] >= 1] + nu * [c[t] + c[t+1] >= 1]
+                   + mu   * (6-slot windows over t already holding 2+ exams)
+
+                 so every candidate slot is priced in one pass over a
+                 (students x slots) block.
+  2. rooms     - per slot, largest exam first, the smallest free room that
+                 seats it.
+
+A slot only takes another seated exam while its exams still pack into the
+rooms (sorted largest first, the i-th exam fits the i-th room), so phase 2
+always finds rooms; instructor blackout dates and dropped rooms are hard
+constraints, as in feasibility.py. Only students with two or more of the
+exams are kept, as nobody else can add to the objective.
+
+Everything here is plain data so scenarios can run in worker processes.
+"""
+
+import bisect
+import time
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+
+from .feasibility import NO_EXAM, ROOMLESS_TYPES
+from .heatmap import _columns
+from .readmodel import ExamInfo, RoomInfo, SlotInfo
+from .scoring import WINDOW, objective_components, weigh
+
+MAX_PASSES = 20
+TIME_LIMIT = 10.0  # seconds of local search per scenario
+EPS = 1e-9
+
+Slot = tuple[Optional[int], str, str, str]  # (timeslot id, or None for an added one; date, start, end)
+
+
+@dataclass(frozen=True)
+class Problem:
+    exam_ids: tuple[int, ...]
+    sizes: np.ndarray                  # students per exam
+    roomless: np.ndarray               # take-home and online exams, which hold no seats
+    blocked: tuple[frozenset, ...]     # instructor blackout dates per exam
+    slots: tuple[Slot, ...]            # in date/time order
+    rooms: tuple[tuple[int, int], ...]  # available (room id, capacity), smallest first
+    indptr: np.ndarray                 # exam i's students are students[indptr[i]:indptr[i + 1]]
+    students: np.ndarray
+    n_students: int
+    start: np.ndarray                  # base version's slot index per exam, -1 if none
+    base_components: dict
+
+
+def build_problem(
+    exams: Sequence[ExamInfo],
+    rooms: Sequence[RoomInfo],
+    timeslots: Sequence[SlotInfo],
+    blackouts: Sequence[tuple[str, str]],
+    base: Sequence[tuple[int, int]],
+    enrollments: Sequence[tuple[int, int]],
+) -> Problem:
+    """
+    base is the base version's (exam_id, timeslot_id); its exams are the
+    ones scheduled, or every exam with a final if it has none.
+    enrollments are (student_id, exam_id).
+    """
+    slots = sorted(timeslots, key=lambda t: (t.date, t.start_time, t.id))
+    cell_of = {t.id: i for i, t in enumerate(slots)}
+    start_of = {e: cell_of.get(t, -1) for e, t in base}
+    chosen = [e for e in exams if e.exam_type != NO_EXAM and (e.id in start_of or not start_of)]
+    index_of = {e.id: i for i, e in enumerate(chosen)}
+
+    dates_off: dict[str, set] = {}
+    for instructor, date in blackouts:
+        dates_off.setdefault(instructor, set()).add(date)
+
+    rows = [(s, index_of[e]) for s, e in enrollments if e in index_of]
+    e_student, e_exam = _columns(rows, 2)
+    students, e_student = np.unique(e_student, return_inverse=True)
+    shared = np.bincount(e_student, minlength=len(students)) >= 2
+    keep = shared[e_student]
+    students, e_student = np.unique(e_student[keep], return_inverse=True)
+    e_exam = e_exam[keep]
+    order = np.argsort(e_exam, kind="stable")
+    indptr = np.zeros(len(chosen) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(e_exam, minlength=len(chosen)), out=indptr[1:])
+
+    start = np.array([start_of.get(e.id, -1) for e in chosen], dtype=np.int64)
+    counts = np.zeros((len(students), len(slots)), dtype=np.int64)
+    placed = start[e_exam] >= 0
+    np.add.at(counts, (e_student[placed], start[e_exam][placed]), 1)
+
+    return Problem(
+        exam_ids=tuple(e.id for e in chosen),
+        sizes=np.array([e.student_count for e in chosen], dtype=np.int64),
+        roomless=np.array([e.exam_type in ROOMLESS_TYPES for e in chosen], dtype=bool),
+        blocked=tuple(frozenset(dates_off.get(e.instructor, ())) for e in chosen),
+        slots=tuple((t.id, t.date, t.start_time, t.end_time) for t in slots),
+        rooms=tuple((r.id, r.capacity) for r in sorted(rooms, key=lambda r: (r.capacity, r.id)) if r.available),
+        indptr=indptr,
+        students=e_student[order],
+        n_students=len(students),
+        start=start,
+        base_components={**objective_components(counts), "scheduled_exams": int((start >= 0).sum())},
+    )
+
+
+def _with_dates(slots: Sequence[Slot], dates: Sequence[str]) -> list[Slot]:
+    """slots plus, on each new date, a copy of the busiest day's slot times."""
+    by_date: dict[str, list[Slot]] = {}
+    for s in slots:
+        by_date.setdefault(s[1], []).append(s)
+    pattern = max(by_date.values(), key=len, default=[])
+    added = [(None, d, s[2], s[3]) for d in dict.fromkeys(dates) if d not in by_date for s in pattern]
+    return sorted([*slots, *added], key=lambda s: (s[1], s[2], s[0] is None, s[0] or 0))
+
+
+class _Seats:
+    """Seated exams per slot, kept packable: largest first, the i-th exam fits the i-th largest room."""
+
+    def __init__(self, capacities: Sequence[int], n_slots: int):
+        self.rooms = sorted(capacities, reverse=True)
+        self.largest = self.rooms[0] if self.rooms else 0
+        self._sizes = [[] for _ in range(n_slots)]     # negated, so ascending is largest first
+        self._shift_ok = [[True] for _ in range(n_slots)]
+        self.load = np.zeros(n_slots, dtype=np.int64)
+
+    def fits(self, slot: int, size: int) -> bool:
+        sizes = self._sizes[slot]
+        if len(sizes) >= len(self.rooms):
+            return False
+        at = bisect.bisect_right(sizes, -size)
+        # the exam takes room `at`; every smaller exam moves down one room
+        return size <= self.rooms[at] and self._shift_ok[slot][at]
+
+    def add(self, slot: int, size: int) -> None:
+        bisect.insort(self._sizes[slot], -size)
+        self._reindex(slot)
+
+    def remove(self, slot: int, size: int) -> None:
+        sizes = self._sizes[slot]
+        del sizes[bisect.bisect_left(sizes, -size)]
+        self._reindex(slot)
+
+    def _reindex(self, slot: int) -> None:
+        sizes = self._sizes[slot]
+        ok = [True] * (len(sizes) + 1)
+        for j in range(len(sizes) - 1, -1, -1):
+            ok[j] = ok[j + 1] and j + 1 < len(self.rooms) and -sizes[j] <= self.rooms[j + 1]
+        self._shift_ok[slot] = ok
+        self.load[slot] = len(sizes)
+
+
+def _marginal(rows: np.ndarray, lamb: float, mu: float, nu: float) -> np.ndarray:
+    """Objective increase from adding one exam to each slot, for students with these count rows."""
+    n = rows.shape[1]
+    cost = lamb * rows.sum(axis=0).astype(float)
+    pairs = ((rows[:, :-1] + rows[:, 1:]) >= 1).sum(axis=0)
+    cost[:-1] += nu * pairs
+    cost[1:] += nu * pairs
+    if n >= WINDOW:
+        running = np.zeros((rows.shape[0], n + 1), dtype=np.int64)
+        np.cumsum(rows, axis=1, out=running[:, 1:])
+        full = ((running[:, WINDOW:] - running[:, :-WINDOW]) >= 2).sum(axis=0)
+        spread = np.zeros(n + 1)
+        spread[:len(full)] += full
+        spread[WINDOW:WINDOW + len(full)] -= full
+        cost += mu * np.cumsum(spread)[:n]
+    return cost
+
+
+def solve(problem: Problem, scenario: dict) -> dict:
+    """
+    scenario holds the sweep's Scenario fields. Returns its metrics, the
+    slots it used (added ones with a None id) and the assignments as
+    (exam_id, room_id, slot index).
+    """
+    began = time.perf_counter()
+    lamb, mu, nu = scenario["lamb"], scenario["mu"], scenario["nu"]
+    dropped = set(scenario["drop_room_ids"])
+    rooms = [r for r in problem.rooms if r[0] not in dropped]
+    slots = _with_dates(problem.slots, scenario["add_dates"])
+    n = len(slots)
+    dates = np.array([s[1] for s in slots])
+
+    allowed = np.ones((len(problem.exam_ids), n), dtype=bool)
+    for e, blocked in enumerate(problem.blocked):
+        if blocked:
+            allowed[e] = ~np.isin(dates, list(blocked))
+    seats = _Seats([c for _, c in rooms], n)
+    # an exam larger than every room still gets the largest, flagged over capacity
+    fit = np.minimum(problem.sizes, seats.largest) if rooms else problem.sizes
+
+    def members(e: int) -> np.ndarray:
+        return problem.students[problem.indptr[e]:problem.indptr[e + 1]]
+
+    def open_slots(e: int) -> np.ndarray:
+        if problem.roomless[e]:
+            return allowed[e].copy()
+        return allowed[e] & np.array([seats.fits(t, fit[e]) for t in range(n)], dtype=bool)
+
+    counts = np.zeros((problem.n_students, n), dtype=np.int64)
+    slot = np.full(len(problem.exam_ids), -1, dtype=np.int64)
+
+    def place(e: int, t: int) -> None:
+        slot[e] = t
+        counts[members(e), t] += 1
+        if not problem.roomless[e]:
+            seats.add(t, fit[e])
+
+    def unplace(e: int) -> None:
+        counts[members(e), slot[e]] -= 1
+        if not problem.roomless[e]:
+            seats.remove(slot[e], fit[e])
+        slot[e] = -1
+
+    degree = np.diff(problem.indptr)
+    queue = list(np.lexsort((-problem.sizes, -degree)))
+    if scenario["warm_start"]:
+        cell = {s[0]: i for i, s in enumerate(slots) if s[0] is not None}
+        base = [problem.slots[t][0] if t >= 0 else None for t in problem.start]
+        waiting = []
+        for e in queue:
+            t = cell.get(base[e], -1)
+            if t >= 0 and allowed[e, t] and (problem.roomless[e] or seats.fits(t, fit[e])):
+                place(e, t)
+            else:
+                waiting.append(e)
+        queue = waiting
+
+    unplaced = []
+    for e in queue:
+        ok = open_slots(e)
+        if not ok.any():
+            unplaced.append(e)
+            continue
+        cost = np.where(ok, _marginal(counts[members(e)], lamb, mu, nu), np.inf)
+        ties = np.flatnonzero(cost <= cost.min() + EPS)
+        place(e, int(ties[np.argmin(seats.load[ties])]))
+
+    rng = np.random.default_rng(scenario["seed"])
+    deadline = began + TIME_LIMIT
+    moves = passes = 0
+    while passes < MAX_PASSES and time.perf_counter() < deadline:
+        passes += 1
+        moved = 0
+        for e in rng.permutation(np.flatnonzero((slot >= 0) & (degree > 0))):
+            here = slot[e]
+            rows = counts[members(e)]
+            rows[:, here] -= 1
+            cost = _marginal(rows, lamb, mu, nu)
+            ok = open_slots(e)
+            ok[here] = False
+            if not ok.any():
+                continue
+            to = int(np.argmin(np.where(ok, cost, np.inf)))
+            if cost[to] < cost[here] - EPS:
+                unplace(e)
+                place(e, to)
+                moved += 1
+        moves += moved
+        if not moved:
+            break
+
+    # Phase 2: rooms, largest exam first into the smallest free room that seats it
+    if not rooms:
+        unplaced.extend(np.flatnonzero(slot >= 0))
+        counts[:] = 0
+        slot[:] = -1
+    assignments, over_capacity = [], 0
+    for t in range(n):
+        here = np.flatnonzero(slot == t)
+        free = list(rooms)
+        for e in here[np.argsort(-problem.sizes[here], kind="stable")]:
+            if problem.roomless[e]:
+                room = rooms[0][0]
+            else:
+                at = bisect.bisect_left(free, problem.sizes[e], key=lambda r: r[1])
+                if at == len(free):
+                    at -= 1
+                    over_capacity += 1
+                room = free.pop(at)[0]
+            assignments.append((problem.exam_ids[e], room, t))
+
+    used = sorted({t for _, _, t in assignments})
+    score = weigh({**objective_components(counts), "scheduled_exams": len(assignments)}, lamb, mu, nu)
+    return {
+        "metrics": {
+            **score,
+            "base_objective": weigh(problem.base_components, lamb, mu, nu)["objective"],
+            "unplaced_exams": len(unplaced),
+            "over_capacity": over_capacity,
+            "rooms_used": len({r for _, r, _ in assignments}),
+            "slots_used": len(used),
+            "added_slots": sum(1 for t in used if slots[t][0] is None),
+            "passes": passes,
+            "moves": moves,
+            "runtime_ms": round((time.perf_counter() - began) * 1000, 1),
+        },
+        "slots": slots,
+        "assignments": assignments,
+        "unplaced": sorted(problem.exam_ids[e] for e in unplaced),
+    }
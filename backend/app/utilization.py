@@ -0,0 +1,167 @@
+"""
+Time-weighted room utilization and seat efficiency of a schedule version.
+
+Assignments are scattered into two (rooms x timeslots) matrices in one
+vectorized pass, and everything else is a reduction over them:
+
+  * occupied    - minutes a room is in use during a slot: the longest exam
+                  assigned there, from the slot start, capped at the slot
+  * seats       - students of the exams assigned to the cell
+
+A room's utilization is its occupied minutes over the minutes of every
+slot in the period; a building's pools its rooms. Seat efficiency is
+students / capacity per assignment, summarised as quantiles and a
+histogram, and wasted seats are the empty seats of each used cell, totalled
+per room, building and timeslot. Assignments whose efficiency is below
+OVERSIZED are listed most wasteful first.
+
+Take-home, online and "No Final Exam" exams hold no seats and are left out.
+"""
+
+from typing import Sequence
+
+import numpy as np
+
+from .feasibility import NO_EXAM, ROOMLESS_TYPES
+from .heatmap import _columns
+from .intervals import slot_bounds
+from .readmodel import ExamInfo, SlotInfo
+
+OVERSIZED = 0.5
+EFFICIENCY_BINS = (0.25, 0.5, 0.75, 1.0)
+
+
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    return np.divide(num, den, out=np.zeros(len(num), dtype=float), where=den > 0)
+
+
+def compute_utilization(
+    timeslots: Sequence[SlotInfo],
+    rooms: Sequence[tuple[int, str, str, int, bool]],
+    exams: Sequence[ExamInfo],
+    assignments: Sequence[tuple[int, int, int]],
+) -> dict:
+    """
+    rooms are (room_id, building, name, capacity, available), assignments
+    (exam_id, room_id, timeslot_id).
+    """
+    slots = sorted(timeslots, key=lambda t: (t.date, t.start_time, t.end_time, t.id))
+    n = len(slots)
+    cell_of = {t.id: i for i, t in enumerate(slots)}
+    bounds = [slot_bounds(t) for t in slots]
+    minutes = np.array([(b[1] - b[0]).total_seconds() // 60 if b else 0 for b in bounds], dtype=np.int64)
+    period = int(minutes.sum())
+
+    room_of = {r[0]: i for i, r in enumerate(rooms)}
+    capacity = np.array([r[3] for r in rooms], dtype=np.int64)
+
+    seated = [e for e in exams if e.exam_type != NO_EXAM and e.exam_type not in ROOMLESS_TYPES]
+    size_of = {e.id: (e.student_count, e.duration_minutes or 0) for e in seated}
+    rows = [
+        (room_of[r], cell_of[t], e, *size_of[e])
+        for e, r, t in assignments
+        if r in room_of and t in cell_of and e in size_of
+    ]
+    a_room, a_cell, a_exam, a_size, a_duration = _columns(rows, 5)
+    a_minutes = np.minimum(np.where(a_duration > 0, a_duration, minutes[a_cell]), minutes[a_cell])
+
+    shape = (len(rooms), n)
+    occupied = np.zeros(shape, dtype=np.int64)
+    np.maximum.at(occupied, (a_room, a_cell), a_minutes)
+    seats = np.zeros(shape, dtype=np.int64)
+    np.add.at(seats, (a_room, a_cell), a_size)
+    used = np.zeros(shape, dtype=bool)
+    used[a_room, a_cell] = True
+    offered = used * capacity[:, None]
+    wasted = np.clip(offered - seats, 0, None)
+
+    room_minutes = occupied.sum(axis=1)
+    room_seats = seats.sum(axis=1)
+    room_offered = offered.sum(axis=1)
+    room_wasted = wasted.sum(axis=1)
+    room_exams = np.bincount(a_room, minlength=len(rooms))
+
+    buildings, b_of = np.unique([r[1] for r in rooms], return_inverse=True) if rooms else ([], np.zeros(0, dtype=np.int64))
+    nb = len(buildings)
+    b_rooms = np.bincount(b_of, minlength=nb)
+    b_minutes = np.bincount(b_of, weights=room_minutes, minlength=nb)
+    b_seats = np.bincount(b_of, weights=room_seats, minlength=nb)
+    b_offered = np.bincount(b_of, weights=room_offered, minlength=nb)
+    b_wasted = np.bincount(b_of, weights=room_wasted, minlength=nb)
+
+    a_capacity = capacity[a_room]
+    has_seats = a_capacity > 0
+    efficiency = a_size[has_seats] / a_capacity[has_seats]
+    quantiles = np.quantile(efficiency, [0.1, 0.5, 0.9]) if len(efficiency) else np.zeros(3)
+    counts = np.bincount(np.searchsorted(EFFICIENCY_BINS, efficiency, side="left"), minlength=len(EFFICIENCY_BINS) + 1)
+
+    ratio = np.zeros(len(a_size))
+    ratio[has_seats] = efficiency
+    oversized = np.flatnonzero(has_seats & (ratio < OVERSIZED))
+    oversized = oversized[np.argsort(-(a_capacity[oversized] - a_size[oversized]), kind="stable")]
+
+    return {
+        "period_minutes": period,
+        "rooms": [
+            {
+                "room_id": r[0],
+                "building": r[1],
+                "name": r[2],
+                "capacity": r[3],
+                "available": r[4],
+                "exams": int(room_exams[i]),
+                "occupied_minutes": int(room_minutes[i]),
+                "utilization": round(float(room_minutes[i] / period), 4) if period else 0.0,
+                "seat_efficiency": round(float(ratio_i), 4),
+                "wasted_seats": int(room_wasted[i]),
+            }
+            for i, (r, ratio_i) in enumerate(zip(rooms, _ratio(room_seats, room_offered)))
+        ],
+        "buildings": [
+            {
+                "building": str(b),
+                "rooms": int(b_rooms[i]),
+                "occupied_minutes": int(b_minutes[i]),
+                "utilization": round(float(b_minutes[i] / (b_rooms[i] * period)), 4) if period else 0.0,
+                "seat_efficiency": round(float(ratio_i), 4),
+                "wasted_seats": int(b_wasted[i]),
+            }
+            for i, (b, ratio_i) in enumerate(zip(buildings, _ratio(b_seats, b_offered)))
+        ],
+        "timeslots": [
+            {
+                "timeslot_id": t.id,
+                "date": t.date,
+                "start_time": t.start_time,
+                "end_time": t.end_time,
+                "rooms_used": int(u),
+                "seats": int(s),
+                "capacity": int(c),
+                "wasted_seats": int(w),
+            }
+            for t, u, s, c, w in zip(slots, used.sum(axis=0), seats.sum(axis=0), offered.sum(axis=0), wasted.sum(axis=0))
+        ],
+        "seat_efficiency": {
+            "assignments": int(len(efficiency)),
+            "mean": round(float(efficiency.mean()), 4) if len(efficiency) else 0.0,
+            "p10": round(float(quantiles[0]), 4),
+            "p50": round(float(quantiles[1]), 4),
+            "p90": round(float(quantiles[2]), 4),
+            "histogram": [
+                {"upto": upto, "count": int(c)}
+                for upto, c in zip([*EFFICIENCY_BINS, None], counts)
+            ],
+        },
+        "oversized": [
+            {
+                "exam_id": int(a_exam[i]),
+                "room_id": rooms[a_room[i]][0],
+                "timeslot_id": slots[a_cell[i]].id,
+                "students": int(a_size[i]),
+                "capacity": int(a_capacity[i]),
+                "seat_efficiency": round(float(ratio[i]), 4),
+                "wasted_seats": int(a_capacity[i] - a_size[i]),
+            }
+            for i in oversized
+        ],
+    }
@@ -0,0 +1,56 @@
+"""
+Executors for CPU-bound analytics.
+
+Async endpoints load their rows on the event loop and hand the computation
+to this pool instead of the default threadpool, so a slow analytics call
+never takes a worker that a quick CRUD request is waiting for.
+
+Work that is mostly Python-level loops rather than numpy (the scenario
+solver) would hold the GIL on a thread, so it runs in a separate process
+pool, started on first use. Its functions and arguments must pickle.
+"""
+
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+ANALYTICS_WORKERS = int(os.environ.get("INFORMS_ANALYTICS_WORKERS", "2"))
+SWEEP_WORKERS = int(os.environ.get("INFORMS_SWEEP_WORKERS", str(os.cpu_count() or 1)))
+
+_executor = ThreadPoolExecutor(max_workers=ANALYTICS_WORKERS, thread_name_prefix="informs-analytics")
+_processes: Optional[ProcessPoolExecutor] = None
+_processes_lock = threading.Lock()
+
+
+async def run_cpu(fn: Callable[..., T], *args, **kwargs) -> T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+
+
+def _process_pool() -> ProcessPoolExecutor:
+    global _processes
+    with _processes_lock:
+        if _processes is None:
+            # spawn: forking a process that runs an event loop and DB connections isn't safe
+            _processes = ProcessPoolExecutor(max_workers=SWEEP_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _processes
+
+
+async def run_parallel(fn: Callable[..., T], calls: list[tuple]) -> list[T]:
+    """fn(*args) for each args in calls, in worker processes; results in call order."""
+    loop = asyncio.get_running_loop()
+    pool = _process_pool()
+    return list(await asyncio.gather(*(loop.run_in_executor(pool, functools.partial(fn, *args)) for args in calls)))
+
+
+def shutdown() -> None:
+    _executor.shutdown(wait=False, cancel_futures=True)
+    with _processes_lock:
+        if _processes is not None:
+            _processes.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,428 @@
+"""
+Load and soak test the backend with a mixed workload of concurrent schedulers.
+
+Starts uvicorn on a throwaway data directory loaded with synthetic data
+(benchmarks/synthetic.py), or targets an already running server with --url,
+then runs --users virtual schedulers for --duration seconds. Each picks a
+weighted action (--mix), waits an exponential think time with mean --think
+seconds, and repeats:
+
+    refresh   App.tsx's fetchData: detailed, timeslots, student conflicts,
+              analytics, students and rooms/detailed, all at once
+    move      drag and drop: PUT /schedules/{id} to another slot with the
+              row_version last seen, then a refresh (a 409 refreshes too)
+    suggest   RescheduleModal: GET /schedules/suggest/{exam_id}, then PUT
+              the first suggestion that has a room
+    bulk      PUT /schedules/bulk of the whole version with a few exams moved
+
+Reported: throughput, latency percentiles per request and per action, error
+rate (5xx and transport errors; 409s are counted apart as conflicts), and,
+scraped from the server's /metrics every --interval seconds, "database is
+locked" errors, time in write statements (where SQLite's write-lock waits
+show up) and resident memory. The interval samples form a timeline, so
+a soak run (--duration 3600) shows memory growth and drift.
+Results go to a JSON file that --compare checks against a saved baseline.
+
+Usage (from backend/):
+    python benchmarks/load.py [--users 8] [--duration 60] [--scale 1]
+    python benchmarks/load.py --duration 3600 --interval 60
+    python benchmarks/load.py --url http://127.0.0.1:8000 --version-id 1
+    python benchmarks/load.py --compare benchmarks/results/load-<commit>.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+ACTIONS = ("refresh", "move", "suggest", "bulk")
+DEFAULT_MIX = "refresh=4,move=3,suggest=2,bulk=1"
+BULK_MOVES = 3
+PERCENTILES = (50, 90, 95, 99)
+METRIC_LINE = re.compile(r"^(\w+)(?:\{[^}]*\})? ([0-9.eE+-]+)$")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    """Nearest-rank percentiles and max, in ms."""
+    if not values:
+        return {**{f"p{p}_ms": 0.0 for p in PERCENTILES}, "max_ms": 0.0}
+    ordered = sorted(values)
+    out = {f"p{p}_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] * 1000, 2) for p in PERCENTILES}
+    out["max_ms"] = round(ordered[-1] * 1000, 2)
+    return out
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ACTIONS:
+            raise SystemExit(f"Unknown action {name!r} in --mix (expected {', '.join(ACTIONS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+# --- Server ---
+
+
+def seed_data(data_dir: Path, scale: float, seed: int) -> None:
+    """Load synthetic data into the current term of data_dir (INFORMS_DATA_DIR must already point there)."""
+    import import_data
+    from app.database import create_db_and_tables, term_session
+    from synthetic import generate
+
+    paths = generate(data_dir / "synthetic", scale, seed)
+    create_db_and_tables()
+    args = argparse.Namespace(
+        rooms=str(paths["rooms"]), schedule=str(paths["schedule"]), students=str(paths["students"]),
+        exam_json=str(paths["exam_json"]), version="Load test",
+    )
+    with term_session() as session:
+        plan = import_data.plan_import(session, args)
+        import_data.apply_entities(session, plan, 120)
+        import_data.apply_assignments(session, plan["assignments"], "Load test")
+        session.commit()
+
+
+def start_server(data_dir: Path) -> tuple[subprocess.Popen, str]:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND, env={**os.environ, "INFORMS_DATA_DIR": str(data_dir)},
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"uvicorn exited with {proc.returncode}")
+        try:
+            if httpx.get(f"{url}/schedules/versions", timeout=2).status_code == 200:
+                return proc, url
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit("uvicorn did not come up within 60s")
+
+
+# --- Measurements ---
+
+
+@dataclass
+class Recorder:
+    started: float = field(default_factory=time.perf_counter)
+    requests: dict[str, list[float]] = field(default_factory=dict)
+    statuses: dict[str, dict[str, int]] = field(default_factory=dict)
+    actions: dict[str, list[float]] = field(default_factory=dict)
+    window: list[tuple[float, bool]] = field(default_factory=list)   # (latency, error) since the last sample
+
+    def request(self, label: str, status: Optional[int], seconds: float) -> None:
+        self.requests.setdefault(label, []).append(seconds)
+        kind = "error" if status is None or status >= 500 else "conflict" if status == 409 else "ok" if status < 400 else "client_error"
+        counts = self.statuses.setdefault(label, {"ok": 0, "conflict": 0, "client_error": 0, "error": 0})
+        counts[kind] += 1
+        self.window.append((seconds, kind == "error"))
+
+    def action(self, name: str, seconds: float) -> None:
+        self.actions.setdefault(name, []).append(seconds)
+
+
+async def scrape(client: httpx.AsyncClient) -> dict[str, float]:
+    """Server-wide totals from /metrics: locked errors, write seconds, resident memory."""
+    wanted = {"informs_db_locked_total", "informs_db_write_seconds_total", "informs_process_resident_memory_bytes"}
+    totals = dict.fromkeys(wanted, 0.0)
+    try:
+        text = (await client.get("/metrics")).text
+    except httpx.TransportError:
+        return totals
+    for line in text.splitlines():
+        m = METRIC_LINE.match(line)
+        if m and m.group(1) in wanted:
+            totals[m.group(1)] += float(m.group(2))
+    return totals
+
+
+# --- Virtual schedulers ---
+
+
+class Scheduler:
+    """One user's view of the version, refreshed the way the frontend refreshes it."""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, version_id: int, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.version_id = version_id
+        self.rng = rng
+        self.schedules: list[dict] = []
+        self.timeslots: list[dict] = []
+
+    async def call(self, label: str, method: str, url: str, body=None) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            r = await self.client.request(method, url, json=body)
+        except httpx.TransportError:
+            self.recorder.request(label, None, time.perf_counter() - start)
+            return None
+        self.recorder.request(label, r.status_code, time.perf_counter() - start)
+        return r
+
+    async def refresh(self) -> None:
+        v = f"version_id={self.version_id}"
+        detailed, timeslots, *_ = await asyncio.gather(
+            self.call("GET /schedules/detailed", "GET", f"/schedules/detailed?{v}"),
+            self.call("GET /schedules/timeslots", "GET", "/schedules/timeslots"),
+            self.call("GET /schedules/conflicts", "GET", f"/schedules/conflicts?type=student&{v}"),
+            self.call("GET /schedules/analytics", "GET", f"/schedules/analytics?{v}&include_no_exam=false"),
+            self.call("GET /schedules/students", "GET", "/schedules/students"),
+            self.call("GET /rooms/detailed", "GET", f"/rooms/detailed?{v}"),
+        )
+        if detailed is not None and detailed.status_code == 200:
+            self.schedules = [s for s in detailed.json() if s["exam"] and s["room"] and s["timeslot"]]
+        if timeslots is not None and timeslots.status_code == 200:
+            self.timeslots = timeslots.json()
+
+    async def put(self, s: dict, room_id: int, timeslot_id: int) -> None:
+        body = {"exam_id": s["exam"]["id"], "room_id": room_id, "timeslot_id": timeslot_id, "row_version": s["row_version"]}
+        await self.call("PUT /schedules/{schedule_id}", "PUT", f"/schedules/{s['id']}", body)
+        await self.refresh()
+
+    async def move(self) -> None:
+        if not self.schedules:
+            return await self.refresh()
+        s = self.rng.choice(self.schedules)
+        others = [t for t in self.timeslots if t["id"] != s["timeslot"]["id"]]
+        if others:
+            await self.put(s, s["room"]["id"], self.rng.choice(others)["id"])
+
+    async def suggest(self) -> None:
+        if not self.schedules:
+            return await self.refresh()
+        s = self.rng.choice(self.schedules)
+        r = await self.call(
+            "GET /schedules/suggest/{exam_id}", "GET", f"/schedules/suggest/{s['exam']['id']}?version_id={self.version_id}"
+        )
+        if r is None or r.status_code != 200:
+            return
+        pick = next((x for x in r.json() if x.get("room")), None)
+        if pick:
+            await self.put(s, pick["room"]["id"], pick["timeslot"]["id"])
+
+    async def bulk(self) -> None:
+        r = await self.call("GET /schedules/", "GET", f"/schedules/?version_id={self.version_id}")
+        if r is None or r.status_code != 200 or not self.timeslots:
+            return
+        items = [{"exam_id": s["exam_id"], "room_id": s["room_id"], "timeslot_id": s["timeslot_id"]} for s in r.json()]
+        for item in self.rng.sample(items, min(BULK_MOVES, len(items))):
+            item["timeslot_id"] = self.rng.choice(self.timeslots)["id"]
+        await self.call("PUT /schedules/bulk", "PUT", f"/schedules/bulk?version_id={self.version_id}", items)
+
+    async def run(self, mix: dict[str, float], think: float, until: float) -> None:
+        names, weights = list(mix), list(mix.values())
+        await self.refresh()
+        while time.perf_counter() < until:
+            await asyncio.sleep(self.rng.expovariate(1 / think) if think > 0 else 0)
+            if time.perf_counter() >= until:
+                break
+            name = self.rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            await getattr(self, name)()
+            self.recorder.action(name, time.perf_counter() - start)
+
+
+async def sampler(client: httpx.AsyncClient, recorder: Recorder, interval: float, until: float, timeline: list) -> None:
+    while True:
+        remaining = until - time.perf_counter()
+        await asyncio.sleep(max(0.0, min(interval, remaining)))
+        window, recorder.window = recorder.window, []
+        metrics = await scrape(client)
+        latencies = [s for s, _ in window]
+        timeline.append({
+            "t": round(time.perf_counter() - recorder.started, 1),
+            "requests": len(window),
+            "rps": round(len(window) / interval, 2),
+            "errors": sum(e for _, e in window),
+            "p95_ms": percentiles(latencies)["p95_ms"],
+            "rss_mb": round(metrics["informs_process_resident_memory_bytes"] / 2**20, 1),
+            "db_locked": int(metrics["informs_db_locked_total"]),
+            "db_write_s": round(metrics["informs_db_write_seconds_total"], 3),
+        })
+        print(f"  t={timeline[-1]['t']:>7}s  {timeline[-1]['rps']:>7} req/s  p95 {timeline[-1]['p95_ms']:>8} ms  "
+              f"errors {timeline[-1]['errors']}  rss {timeline[-1]['rss_mb']} MB")
+        if remaining <= interval:
+            return
+
+
+async def run_load(url: str, version_id: Optional[int], args) -> dict:
+    mix = parse_mix(args.mix)
+    limits = httpx.Limits(max_connections=args.users * 6, max_keepalive_connections=args.users * 6)
+    async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+        if version_id is None:
+            version_id = (await client.get("/schedules/versions")).json()[0]["id"]
+        before = await scrape(client)
+        recorder = Recorder()
+        until = recorder.started + args.duration
+        timeline: list[dict] = []
+        users = [Scheduler(client, recorder, version_id, random.Random(args.seed * 1000 + i)) for i in range(args.users)]
+        await asyncio.gather(sampler(client, recorder, args.interval, until, timeline),
+                             *(u.run(mix, args.think, until) for u in users))
+        elapsed = time.perf_counter() - recorder.started
+        after = await scrape(client)
+
+    total = sum(len(v) for v in recorder.requests.values())
+    errors = sum(c["error"] for c in recorder.statuses.values())
+    # growth is measured from the first sample, past the warm-up that fills the caches
+    sampled = [t for t in timeline if t["rss_mb"]]
+    start_mb = round(before["informs_process_resident_memory_bytes"] / 2**20, 1)
+    growth = round(sampled[-1]["rss_mb"] - sampled[0]["rss_mb"], 1) if len(sampled) > 1 else 0.0
+    span = sampled[-1]["t"] - sampled[0]["t"] if len(sampled) > 1 else 0
+    return {
+        "version_id": version_id,
+        "elapsed_s": round(elapsed, 2),
+        "totals": {
+            "requests": total,
+            "throughput_rps": round(total / elapsed, 2),
+            "actions": sum(len(v) for v in recorder.actions.values()),
+            "errors": errors,
+            "error_rate": round(errors / total, 5) if total else 0.0,
+            "conflicts": sum(c["conflict"] for c in recorder.statuses.values()),
+        },
+        "requests": {
+            label: {"count": len(times), **recorder.statuses[label], **percentiles(times)}
+            for label, times in sorted(recorder.requests.items())
+        },
+        "actions": {name: {"count": len(times), **percentiles(times)} for name, times in sorted(recorder.actions.items())},
+        "sqlite": {
+            "locked_errors": int(after["informs_db_locked_total"] - before["informs_db_locked_total"]),
+            "write_seconds": round(after["informs_db_write_seconds_total"] - before["informs_db_write_seconds_total"], 3),
+        },
+        "memory": {
+            "start_mb": start_mb,
+            "end_mb": sampled[-1]["rss_mb"] if sampled else start_mb,
+            "peak_mb": max((t["rss_mb"] for t in sampled), default=start_mb),
+            "growth_mb": growth,
+            "growth_mb_per_hour": round(growth * 3600 / span, 1) if span else 0.0,
+        },
+        "timeline": timeline,
+    }
+
+
+# --- Report ---
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> int:
+    """Print the run against a baseline; returns the number of regressions."""
+    regressions = 0
+
+    def line(label: str, before, now, worse: bool) -> None:
+        nonlocal regressions
+        regressions += worse
+        print(f"  {label:<48} {before:>10} -> {now:>10}{'  REGRESSION' if worse else ''}")
+
+    print(f"\nComparing {current['commit']} against {baseline.get('commit')} (threshold x{threshold})")
+    now, before = current["totals"], baseline["totals"]
+    line("throughput (req/s)", before["throughput_rps"], now["throughput_rps"],
+         now["throughput_rps"] * threshold < before["throughput_rps"])
+    line("error rate", before["error_rate"], now["error_rate"], now["error_rate"] > before["error_rate"] + 0.01)
+    for label, r in current["requests"].items():
+        base = baseline["requests"].get(label)
+        if base and base["p95_ms"]:
+            line(f"{label} p95 ms", base["p95_ms"], r["p95_ms"], r["p95_ms"] > base["p95_ms"] * threshold)
+    line("sqlite locked errors", baseline["sqlite"]["locked_errors"], current["sqlite"]["locked_errors"],
+         current["sqlite"]["locked_errors"] > baseline["sqlite"]["locked_errors"])
+    growth, base_growth = current["memory"]["growth_mb_per_hour"], baseline["memory"]["growth_mb_per_hour"]
+    line("memory growth (MB/h)", base_growth, growth, growth > max(base_growth * threshold, base_growth + 10))
+    return regressions
+
+
+def main():
+    p = argparse.ArgumentParser(description="Load/soak test the backend with a mixed scheduler workload.")
+    p.add_argument("--url", default=None, help="Server to test (default: start uvicorn on synthetic data)")
+    p.add_argument("--version-id", type=int, default=None, help="Version to work on (default: the first)")
+    p.add_argument("--users", type=int, default=8, help="Concurrent virtual schedulers")
+    p.add_argument("--duration", type=float, default=60, help="Seconds of load")
+    p.add_argument("--think", type=float, default=1.0, help="Mean think time between actions, seconds")
+    p.add_argument("--mix", default=DEFAULT_MIX, help=f"Action weights (default: {DEFAULT_MIX})")
+    p.add_argument("--interval", type=float, default=10, help="Seconds between timeline samples")
+    p.add_argument("--timeout", type=float, default=60, help="Per-request timeout, seconds")
+    p.add_argument("--scale", type=float, default=1.0, help="Synthetic data scale when starting a server")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--out", default=None, help="Results file (default: benchmarks/results/load-<commit>.json)")
+    p.add_argument("--compare", default=None, help="Baseline results file to compare against")
+    p.add_argument("--threshold", type=float, default=1.25, help="Slowdown ratio reported as a regression")
+    args = p.parse_args()
+
+    proc = None
+    url = args.url
+    if url is None:
+        data_dir = Path(tempfile.mkdtemp(prefix="informs-load-"))
+        os.environ["INFORMS_DATA_DIR"] = str(data_dir)   # before app.database is imported
+        print(f"Loading synthetic data (scale {args.scale:g}) into {data_dir}")
+        seed_data(data_dir, args.scale, args.seed)
+        proc, url = start_server(data_dir)
+    print(f"{args.users} users for {args.duration:g}s against {url} (mix {args.mix})")
+    try:
+        result = asyncio.run(run_load(url, args.version_id, args))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {k: getattr(args, k) for k in ("users", "duration", "think", "mix", "scale", "seed")},
+        **result,
+    }
+    totals = report["totals"]
+    print(f"\n{totals['requests']} requests, {totals['throughput_rps']} req/s, "
+          f"{totals['errors']} errors ({totals['error_rate']:.2%}), {totals['conflicts']} conflicts")
+    for label, r in report["requests"].items():
+        print(f"  {label:<48} {r['count']:>6}  p50 {r['p50_ms']:>8} ms  p95 {r['p95_ms']:>8} ms  p99 {r['p99_ms']:>8} ms")
+    print(f"  sqlite: {report['sqlite']['locked_errors']} locked errors, {report['sqlite']['write_seconds']}s in writes")
+    print(f"  memory: {report['memory']['start_mb']} -> {report['memory']['end_mb']} MB "
+          f"(peak {report['memory']['peak_mb']}, {report['memory']['growth_mb_per_hour']} MB/h)")
+
+    out = Path(args.out) if args.out else Path(__file__).resolve().parent / "results" / f"load-{commit}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"\nWrote {out}")
+
+    if args.compare:
+        regressions = compare(report, json.loads(Path(args.compare).read_text()), args.threshold)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Compare ORM entities with the slotted read models (app/readmodel.py).
+
+For each working set the analytics paths load, time the load and measure
+the memory its objects hold (tracemalloc, after the session is closed so
+only what the caller keeps is counted), loading once as SQLModel instances
+and once as read models. The last row times the whole conflict engine on
+each.
+
+Run against a term that holds real data, e.g. the 2023 import described in
+instructions.md:
+
+    python benchmarks/readmodel.py [--term TERM] [--repeat 5]
+"""
+
+import argparse
+import gc
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlmodel import select
+
+from app import readmodel
+from app.analytics import find_conflicts
+from app.database import term_session
+from app.models import Exam, Room, Schedule, StudentExam, TimeSlot
+from app.readmodel import ExamInfo, RoomInfo, SlotInfo
+
+
+def orm(model):
+    def load(session):
+        rows = session.exec(select(model)).all()
+        session.expunge_all()
+        return rows
+    return load
+
+
+def compact(cls):
+    return lambda session: readmodel.load(session, cls)
+
+
+def measure(term: str, load, repeat: int) -> tuple[float, int, object]:
+    """(median seconds, bytes held, result)."""
+    times = []
+    for _ in range(repeat):
+        with term_session(term) as session:
+            start = time.perf_counter()
+            load(session)
+            times.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    with term_session(term) as session:
+        before = tracemalloc.get_traced_memory()[0]
+        result = load(session)
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return statistics.median(times), held, result
+
+
+def conflicts(exams_load, slots_load):
+    def run(session):
+        version_id = session.exec(select(Schedule.version_id).order_by(Schedule.version_id)).first()
+        assignments = session.exec(
+            select(Schedule.exam_id, Schedule.room_id, Schedule.timeslot_id)
+            .where(Schedule.version_id == version_id)
+            .order_by(Schedule.id)
+        ).all()
+        enrollments = session.exec(select(StudentExam.student_id, StudentExam.exam_id)).all()
+        return find_conflicts(assignments, enrollments, exams_load(session), slots_load(session))
+    return run
+
+
+def main():
+    p = argparse.ArgumentParser(description="Compare ORM entities with slotted read models.")
+    p.add_argument("--term", default=None, help="Term database to read (default: current term)")
+    p.add_argument("--repeat", type=int, default=5)
+    args = p.parse_args()
+
+    cases = [
+        ("exams", orm(Exam), compact(ExamInfo)),
+        ("rooms", orm(Room), compact(RoomInfo)),
+        ("timeslots", orm(TimeSlot), compact(SlotInfo)),
+        ("conflict engine", conflicts(orm(Exam), orm(TimeSlot)), conflicts(compact(ExamInfo), compact(SlotInfo))),
+    ]
+    print(f"{'':<16} {'rows':>6}  {'ORM ms':>8} {'ORM KiB':>9}  {'slots ms':>8} {'slots KiB':>9}")
+    for label, slow, fast in cases:
+        t_orm, m_orm, rows = measure(args.term, slow, args.repeat)
+        t_fast, m_fast, compact_rows = measure(args.term, fast, args.repeat)
+        assert len(rows) == len(compact_rows)
+        print(
+            f"{label:<16} {len(rows):>6}  {t_orm * 1000:>8.1f} {m_orm / 1024:>9.1f}"
+            f"  {t_fast * 1000:>8.1f} {m_fast / 1024:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Benchmark the importer and every schedules/rooms endpoint on synthetic data.
+
+For each scale, synthetic CSVs are generated (benchmarks/synthetic.py),
+loaded through the import_data.py steps into a throwaway term database, and
+each endpoint is called --repeat times through the ASGI app. Results go to a
+JSON file keyed by scale so runs from different commits can be compared.
+Afterwards an assigned exam and room are deleted (their schedule rows stay
+behind) and every GET is called again; a server error there fails the run.
+
+Usage (from backend/):
+    python benchmarks/run.py [--scales 1 5] [--repeat 5] [--out results.json]
+    python benchmarks/run.py --compare benchmarks/results/baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+# Keep benchmark databases out of the real data directory; must be set
+# before app.database is imported.
+os.environ.setdefault("INFORMS_DATA_DIR", tempfile.mkdtemp(prefix="informs-bench-"))
+
+from fastapi.testclient import TestClient
+from sqlmodel import select
+
+import import_data
+from app.database import create_db_and_tables, term_session
+from app.main import app
+from app.models import Room, Schedule, Student, StudentExam, TimeSlot
+from synthetic import generate
+
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def run_import(term: str, paths: dict[str, Path]) -> dict[str, float]:
+    create_db_and_tables(term)
+    stages = {}
+    args = argparse.Namespace(
+        rooms=str(paths["rooms"]), schedule=str(paths["schedule"]), students=str(paths["students"]),
+        exam_json=str(paths["exam_json"]), version="Benchmark",
+    )
+    with term_session(term) as session:
+        plan, stages["plan"] = timed(import_data.plan_import, session, args)
+        _, stages["entities"] = timed(import_data.apply_entities, session, plan, 120)
+        _, stages["schedule"] = timed(import_data.apply_assignments, session, plan["assignments"], "Benchmark")
+        _, stages["commit"] = timed(session.commit)
+    stages["total"] = sum(stages.values())
+    return stages
+
+
+def endpoint_plan(term: str) -> list[tuple[str, str, str, object]]:
+    """(label, method, url, json body) for every schedules.py and rooms.py route."""
+    with term_session(term) as session:
+        sched = session.exec(select(Schedule)).first()
+        student_id = session.exec(select(StudentExam.student_id)).first()
+        room = session.exec(select(Room)).first()
+        ts = session.exec(select(TimeSlot)).first()
+        version_id = sched.version_id
+        items = [
+            {"exam_id": s.exam_id, "room_id": s.room_id, "timeslot_id": s.timeslot_id}
+            for s in session.exec(select(Schedule).where(Schedule.version_id == version_id)).all()
+        ]
+    q = f"term={term}&version_id={version_id}"
+    move = {"exam_id": sched.exam_id, "room_id": sched.room_id, "timeslot_id": sched.timeslot_id}
+    return [
+        ("GET /schedules/versions", "GET", f"/schedules/versions?term={term}", None),
+        ("GET /schedules/timeslots", "GET", f"/schedules/timeslots?term={term}", None),
+        ("GET /schedules/", "GET", f"/schedules/?{q}", None),
+        ("GET /schedules/detailed", "GET", f"/schedules/detailed?{q}", None),
+        ("GET /schedules/unscheduled", "GET", f"/schedules/unscheduled?{q}", None),
+        ("GET /schedules/suggest/{exam_id}", "GET", f"/schedules/suggest/{sched.exam_id}?{q}", None),
+        ("GET /schedules/students", "GET", f"/schedules/students?term={term}", None),
+        ("GET /schedules/exams/{exam_id}/students", "GET", f"/schedules/exams/{sched.exam_id}/students?{q}", None),
+        ("GET /schedules/students/{student_id}/schedule", "GET",
+         f"/schedules/students/{student_id}/schedule?{q}", None),
+        ("GET /schedules/conflicts", "GET", f"/schedules/conflicts?{q}", None),
+        ("GET /schedules/analytics", "GET", f"/schedules/analytics?{q}", None),
+        ("GET /schedules/heatmap", "GET", f"/schedules/heatmap?{q}", None),
+        ("GET /schedules/utilization", "GET", f"/schedules/utilization?{q}", None),
+        ("PUT /schedules/{schedule_id}", "PUT", f"/schedules/{sched.id}?{q}", move),
+        ("PUT /schedules/bulk", "PUT", f"/schedules/bulk?{q}", items),
+        ("GET /rooms/", "GET", f"/rooms/?term={term}", None),
+        ("GET /rooms/{room_id}", "GET", f"/rooms/{room.id}?term={term}", None),
+        ("GET /rooms/detailed", "GET", f"/rooms/detailed?{q}", None),
+        ("GET /rooms/available", "GET",
+         f"/rooms/available?{q}&start={ts.date}T{ts.start_time}&end={ts.date}T{ts.end_time}&min_capacity=50", None),
+        ("GET /rooms/{room_id}/occupancy", "GET", f"/rooms/{room.id}/occupancy?{q}&date={ts.date}", None),
+    ]
+
+
+def run_endpoints(client: TestClient, term: str, repeat: int) -> dict[str, dict]:
+    results = {}
+    for label, method, url, body in endpoint_plan(term):
+        times = []
+        queries = None
+        status = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            r = client.request(method, url, json=body)
+            times.append(time.perf_counter() - start)
+            status = r.status_code
+            m = SERVER_TIMING_QUERIES.search(r.headers.get("server-timing", ""))
+            queries = int(m.group(1)) if m else None
+        times.sort()
+        results[label] = {
+            "status": status,
+            "median_ms": round(statistics.median(times) * 1000, 3),
+            "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))] * 1000, 3),
+            "min_ms": round(times[0] * 1000, 3),
+            "queries": queries,
+        }
+        print(f"    {label:<48} {status} {results[label]['median_ms']:>10.1f} ms  {queries} queries")
+    return results
+
+
+def check_dangling(client: TestClient, term: str) -> list[str]:
+    """Delete an assigned exam and room, then call every GET; returns the ones that fail with a server error."""
+    plan = endpoint_plan(term)
+    with term_session(term) as session:
+        sched = session.exec(select(Schedule).order_by(Schedule.id.desc())).first()
+    for url in (f"/exams/{sched.exam_id}?term={term}", f"/rooms/{sched.room_id}?term={term}"):
+        client.delete(url)
+    failures = []
+    for label, method, url, _ in plan:
+        if method == "GET" and (status := client.get(url).status_code) >= 500:
+            failures.append(f"{label} {status}")
+    return failures
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> int:
+    """Print per-metric ratios against a baseline; returns the number of regressions."""
+    regressions = 0
+    print(f"\nComparing {current['commit']} against {baseline.get('commit')} (threshold x{threshold})")
+    for scale, result in current["scales"].items():
+        base = baseline.get("scales", {}).get(scale)
+        if not base:
+            continue
+        print(f"  scale {scale}")
+        pairs = [(f"import {k}", v, base["import"].get(k)) for k, v in result["import"].items()]
+        pairs += [
+            (label, r["median_ms"] / 1000, base["endpoints"].get(label, {}).get("median_ms", 0) / 1000 or None)
+            for label, r in result["endpoints"].items()
+        ]
+        for label, now, before in pairs:
+            if not before:
+                continue
+            ratio = now / before
+            flag = "  REGRESSION" if ratio > threshold else ""
+            regressions += bool(flag)
+            print(f"    {label:<48} {before * 1000:>10.1f} -> {now * 1000:>10.1f} ms  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark import and API endpoints on synthetic data.")
+    p.add_argument("--scales", type=float, nargs="+", default=[1.0, 5.0])
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--out", default=None, help="Results file (default: benchmarks/results/<commit>.json)")
+    p.add_argument("--compare", default=None, help="Baseline results file to compare against")
+    p.add_argument("--threshold", type=float, default=1.25, help="Slowdown ratio reported as a regression")
+    args = p.parse_args()
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "scales": {},
+    }
+    data_dir = Path(os.environ["INFORMS_DATA_DIR"])
+    failures = []
+    with TestClient(app, raise_server_exceptions=False) as client:
+        for scale in args.scales:
+            label = f"{scale:g}"
+            term = f"bench-{label.replace('.', '_')}"
+            print(f"Scale {label}x")
+            paths = generate(data_dir / f"synthetic-{label}", scale, args.seed)
+            stages = run_import(term, paths)
+            print("  import: " + ", ".join(f"{k} {v:.2f}s" for k, v in stages.items()))
+            with term_session(term) as session:
+                sizes = {
+                    "students": len(session.exec(select(Student.id)).all()),
+                    "enrollments": len(session.exec(select(StudentExam.id)).all()),
+                    "assignments": len(session.exec(select(Schedule.id)).all()),
+                }
+            report["scales"][label] = {
+                "sizes": sizes,
+                "import": {k: round(v, 4) for k, v in stages.items()},
+                "endpoints": run_endpoints(client, term, args.repeat),
+            }
+            failed = check_dangling(client, term)
+            print("  after deleting an assigned exam and room: " + (", ".join(failed) or "ok"))
+            failures += [f"scale {label}: {f}" for f in failed]
+
+    out = Path(args.out) if args.out else Path(__file__).resolve().parent / "results" / f"{commit}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"\nWrote {out}")
+
+    if failures:
+        print("\nServer errors after deleting an assigned exam and room:\n  " + "\n  ".join(failures))
+    if args.compare:
+        regressions = compare(report, json.loads(Path(args.compare).read_text()), args.threshold)
+        sys.exit(1 if regressions or failures else 0)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmark backend cold start against a bare FastAPI app.
+
+Each run starts a fresh interpreter (as uvicorn --reload does on every code
+change) and records, from inside it, how long the app takes to import, to
+finish its lifespan startup and to answer a first request. Three cases:
+
+    baseline  a one-route FastAPI app: the floor uvicorn itself imposes
+    app       app.main against a database already at SCHEMA_VERSION
+    fresh     app.main against an empty data directory (first boot)
+
+Medians over --repeat runs go to a JSON file so commits can be compared.
+
+Usage (from backend/):
+    python benchmarks/startup.py [--repeat 10] [--out results.json]
+    python benchmarks/startup.py --compare benchmarks/results/startup-<commit>.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+# Runs in the child; TestClient is imported before the clock starts since
+# it isn't part of what uvicorn loads.
+_CHILD = """
+import json, time
+from fastapi.testclient import TestClient
+t0 = time.perf_counter()
+{setup}
+t1 = time.perf_counter()
+with TestClient(app) as client:
+    t2 = time.perf_counter()
+    status = client.get({path!r}).status_code
+    t3 = time.perf_counter()
+print(json.dumps({{"import": t1 - t0, "startup": t2 - t1, "first_request": t3 - t2, "status": status}}))
+"""
+
+_BASELINE = """
+from fastapi import FastAPI
+app = FastAPI()
+
+@app.get("/")
+def root():
+    return {"ok": True}
+"""
+
+CASES = {
+    "baseline": (_BASELINE, "/"),
+    "app": ("from app.main import app", "/terms/"),
+    "fresh": ("from app.main import app", "/terms/"),
+}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_child(setup: str, path: str, data_dir: str) -> dict:
+    code = _CHILD.format(setup=setup, path=path)
+    env = {**os.environ, "INFORMS_DATA_DIR": data_dir, "PYTHONPATH": str(BACKEND)}
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result["process"] = time.perf_counter() - start
+    return result
+
+
+def run_case(name: str, repeat: int) -> dict:
+    setup, path = CASES[name]
+    warm_dir = tempfile.mkdtemp(prefix="informs-startup-")
+    if name == "app":
+        # Migrate and seed once so every measured run takes the fast path
+        env = {**os.environ, "INFORMS_DATA_DIR": warm_dir}
+        subprocess.run([sys.executable, "seed_data.py"], cwd=BACKEND, env=env, capture_output=True, check=True)
+    runs = []
+    for _ in range(repeat):
+        data_dir = tempfile.mkdtemp(prefix="informs-startup-") if name == "fresh" else warm_dir
+        runs.append(run_child(setup, path, data_dir))
+    metrics = {
+        m: round(statistics.median(r[m] for r in runs) * 1000, 3)
+        for m in ("import", "startup", "first_request", "process")
+    }
+    metrics["status"] = runs[-1]["status"]
+    timings = "  ".join(f"{m} {metrics[m]:>8.1f} ms" for m in ("import", "startup", "first_request", "process"))
+    print(f"  {name:<10} {timings}")
+    return metrics
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> int:
+    """Print per-metric ratios against an earlier run; returns the number of regressions."""
+    regressions = 0
+    print(f"\nComparing {current['commit']} against {baseline.get('commit')} (threshold x{threshold})")
+    for case, metrics in current["cases"].items():
+        before = baseline.get("cases", {}).get(case, {})
+        for metric in ("import", "startup", "process"):
+            if not before.get(metric):
+                continue
+            ratio = metrics[metric] / before[metric]
+            flag = "  REGRESSION" if ratio > threshold else ""
+            regressions += bool(flag)
+            print(f"    {case + ' ' + metric:<24} {before[metric]:>8.1f} -> {metrics[metric]:>8.1f} ms  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark backend cold start against a bare FastAPI app.")
+    p.add_argument("--repeat", type=int, default=10)
+    p.add_argument("--out", default=None, help="Results file (default: benchmarks/results/startup-<commit>.json)")
+    p.add_argument("--compare", default=None, help="Earlier startup results to compare against")
+    p.add_argument("--threshold", type=float, default=1.25, help="Slowdown ratio reported as a regression")
+    args = p.parse_args()
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "cases": {},
+    }
+    print(f"Startup, median of {args.repeat} runs")
+    for name in CASES:
+        report["cases"][name] = run_case(name, args.repeat)
+    base, app = report["cases"]["baseline"], report["cases"]["app"]
+    report["overhead_ms"] = round(app["process"] - base["process"], 3)
+    print(f"  app over baseline: {report['overhead_ms']:.1f} ms")
+
+    out = Path(args.out) if args.out else Path(__file__).resolve().parent / "results" / f"startup-{commit}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"\nWrote {out}")
+
+    if args.compare:
+        regressions = compare(report, json.loads(Path(args.compare).read_text()), args.threshold)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Synthetic term data at configurable scale, in the same CSV/JSON formats that
+import_data.py reads.
+
+Scale 1 is roughly the 2023 term: ~2000 sections, ~4900 students, ~28k
+registrations, ~110 rooms and 21 exam slots. Students pick most of their
+courses from a major subject and the rest by course popularity, which gives
+the clustered co-enrollment graph real registrations have.
+
+Usage (from backend/):
+    python benchmarks/synthetic.py --scale 5 --out /tmp/synthetic-5x [--seed 0]
+"""
+
+import argparse
+import csv
+import json
+import random
+from pathlib import Path
+
+EXAM_DATES = ["12/6/2023", "12/7/2023", "12/8/2023", "12/9/2023", "12/11/2023", "12/12/2023", "12/13/2023"]
+EXAM_TIMES = [900, 1400, 1900]
+EXAM_TYPES = [
+    ("Scheduled Final Exam-OTR Room", 0.80),
+    ("No Final Exam", 0.15),
+    ("Take-Home Exam", 0.05),
+]
+N_SUBJECTS = 60
+
+
+def _pick_weighted(rng: random.Random, items: list, weights: list[float]):
+    return rng.choices(items, weights=weights, k=1)[0]
+
+
+def generate(out_dir: str | Path, scale: float = 1.0, seed: int = 0) -> dict[str, Path]:
+    """Write Class_Info.csv, Schedule.csv, StudentRegistration.csv and exam_schedule.json."""
+    rng = random.Random(seed)
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    n_exams = max(10, round(2000 * scale))
+    n_students = max(10, round(4900 * scale))
+    n_rooms = max(5, round(110 * scale))
+
+    # Rooms: a few large halls, many classrooms
+    buildings = [f"B{i:02d}" for i in range(max(3, n_rooms // 8))]
+    rooms = []
+    for i in range(n_rooms):
+        capacity = int(min(400, max(12, rng.lognormvariate(3.6, 0.6))))
+        rooms.append((rng.choice(buildings), str(100 + i), capacity))
+
+    # Sections: subject, size drawn from a heavy-tailed distribution
+    subjects = [f"S{i:02d}" for i in range(N_SUBJECTS)]
+    subject_weights = [1 / (i + 1) ** 0.8 for i in range(N_SUBJECTS)]
+    exams = []
+    for i in range(n_exams):
+        subject = _pick_weighted(rng, subjects, subject_weights)
+        exam_type = _pick_weighted(rng, [t for t, _ in EXAM_TYPES], [w for _, w in EXAM_TYPES])
+        exams.append({
+            "crn": 10000 + i,
+            "subject": subject,
+            "course_number": str(rng.randint(100, 499)),
+            "section": f"{rng.randint(1, 3):03d}",
+            "popularity": rng.paretovariate(1.5),
+            "exam_type": exam_type,
+            "instructor": f"Instructor, {rng.randint(1, max(2, n_exams // 2))}",
+        })
+    by_subject: dict[str, list[int]] = {}
+    for idx, e in enumerate(exams):
+        by_subject.setdefault(e["subject"], []).append(idx)
+    popularity = [e["popularity"] for e in exams]
+
+    # Registrations: ~5.8 courses per student, mostly within the major
+    registrations: list[tuple[int, int]] = []
+    enrollment = [0] * n_exams
+    for s in range(n_students):
+        person_id = 100000 + s
+        major = _pick_weighted(rng, subjects, subject_weights)
+        k = max(1, min(9, round(rng.gauss(5.8, 1.3))))
+        chosen: set[int] = set()
+        while len(chosen) < k:
+            pool = by_subject.get(major) if rng.random() < 0.6 else None
+            if pool:
+                chosen.add(rng.choice(pool))
+            else:
+                chosen.add(rng.choices(range(n_exams), weights=popularity, k=1)[0])
+        for idx in chosen:
+            registrations.append((person_id, idx))
+            enrollment[idx] += 1
+
+    paths = {
+        "rooms": out / "Class_Info.csv",
+        "schedule": out / "Schedule.csv",
+        "students": out / "StudentRegistration.csv",
+        "exam_json": out / "exam_schedule.json",
+    }
+    with open(paths["rooms"], "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["BUILDING_CODE", "BUILDING", "ROOM_NUMBER", "AVAILABLE_TO_SCHEDULE", "ROOM_CAPACITY", "ROOM_TYPE"])
+        for building, number, capacity in rooms:
+            w.writerow([building, f"{building} Building", number, "Y", capacity, "Classroom"])
+
+    with open(paths["schedule"], "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["CRN", "TERM_CODE", "SUBJECT", "COURSE_NUMBER", "SECTION", "SECTION_ENROLLMENT",
+                    "COURSE_TITLE", "INSTRUCTOR", "EXAM_TYPE"])
+        for idx, e in enumerate(exams):
+            w.writerow([e["crn"], "202410", e["subject"], e["course_number"], e["section"], enrollment[idx],
+                        f"COURSE {e['subject']} {e['course_number']}", e["instructor"], e["exam_type"]])
+
+    with open(paths["students"], "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["PERSON_IDENTIFIER", "TERM_CODE", "TERM", "CRN", "SUBJECT", "COURSE_NUMBER", "SECTION"])
+        for person_id, idx in registrations:
+            e = exams[idx]
+            w.writerow([person_id, "202410", "Fall Semester 2023", e["crn"], e["subject"],
+                        e["course_number"], e["section"]])
+
+    # Assignments: every in-room exam gets a random slot and the smallest free
+    # room that fits (or the largest free one).
+    slots = [(d, t) for d in EXAM_DATES for t in EXAM_TIMES]
+    free = {slot: sorted(range(n_rooms), key=lambda r: rooms[r][2]) for slot in slots}
+    assignment = {}
+    for idx, e in enumerate(exams):
+        if e["exam_type"] != "Scheduled Final Exam-OTR Room" or enrollment[idx] == 0:
+            continue
+        slot = rng.choice(slots)
+        available = free[slot]
+        if not available:
+            continue
+        fit = next((r for r in available if rooms[r][2] >= enrollment[idx]), available[-1])
+        available.remove(fit)
+        building, number, _ = rooms[fit]
+        assignment[str(e["crn"])] = {"date": slot[0], "time": slot[1], "building": building, "room": number}
+    with open(paths["exam_json"], "w") as f:
+        json.dump(assignment, f)
+
+    return paths
+
+
+def main():
+    p = argparse.ArgumentParser(description="Generate synthetic exam scheduling data.")
+    p.add_argument("--scale", type=float, default=1.0, help="1.0 is about the size of the 2023 term")
+    p.add_argument("--out", required=True, help="Output directory")
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+    for name, path in generate(args.out, args.scale, args.seed).items():
+        print(f"  {name}: {path}")
+
+
+if __name__ == "__main__":
+    main()
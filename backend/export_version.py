@@ -0,0 +1,50 @@
+"""
+Export a schedule version as a Parquet/Arrow bundle (see app/columnar.py).
+
+Usage:
+    python export_version.py --version "Balanced" --out ../archive/balanced \
+        [--format parquet|arrow]
+
+The bundle can be loaded back with `python import_data.py --bundle DIR`,
+listed in reset_schedules.py, or read directly from the notebooks with
+pyarrow / pandas.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from sqlmodel import select
+
+from app.columnar import FORMATS, export_version
+from app.database import term_session
+from app.models import ScheduleVersion
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Export a schedule version as a columnar bundle.")
+    p.add_argument("--version", required=True, help="Schedule version name or id")
+    p.add_argument("--out", required=True, help="Output directory")
+    p.add_argument("--format", choices=sorted(FORMATS), default="parquet")
+    p.add_argument("--term", default=None, help="Term database to export from (default: current term)")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    with term_session(args.term) as session:
+        version = session.exec(
+            select(ScheduleVersion).where(ScheduleVersion.name == args.version)
+        ).first()
+        if not version and args.version.isdigit():
+            version = session.get(ScheduleVersion, int(args.version))
+        if not version:
+            sys.exit(f"Version '{args.version}' not found")
+        out = export_version(session, version.id, args.out, args.format)
+        print(f"Exported '{version.name}' to {out}")
+
+
+if __name__ == "__main__":
+    main()
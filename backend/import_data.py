@@ -8,7 +8,28 @@ Usage:
         --rooms Class_Info2023.csv \
         --exam-json ../../exam_schedule_optimized.json \
         [--version "Fall 2023 Optimized"] \
-        [--duration 120]
+        [--duration 120] [--dry-run] [--prune]
+
+    python import_data.py --bundle ../archive/fall-2023 [--version "Fall 2023"]
+
+Pass --term 2022-2023 (any name of letters, digits, - and _) to import into
+that term's own database instead of the current term.
+
+The import is incremental. Every input row is keyed by its natural key (room
+building+name, exam CRN, student person_id, enrollment person_id+CRN, and
+assignment CRN+room within the version) and compared by content hash with
+what the database holds (app/changeset.py). Only inserts, updates and
+deletes are written, so re-importing an updated registration extract
+touches just the rows that changed. --dry-run prints the change sets and
+writes nothing.
+
+Enrollments and the version's assignments follow the inputs exactly. Rooms,
+exams and students missing from the inputs are reported but kept; --prune
+deletes the ones nothing references any more.
+
+A --bundle is a Parquet/Arrow version directory written by export_version.py;
+it carries rooms, exams, students, enrollments and assignments, so none of the
+CSV/JSON inputs are needed.
 """
 
 import argparse
@@ -17,25 +38,44 @@ import json
 import sys
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
 # Make sure the app package is importable when run from backend/
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
+from sqlalchemy import delete
 from sqlmodel import Session, select
 
-from app.database import create_db_and_tables, engine
+from app import analytics_store, oplog, revisions, search
+from app.changeset import ChangeSet, chunks, diff, write
+from app.columnar import import_version
+from app.database import create_db_and_tables, term_session
 from app.models import Exam, Room, Schedule, ScheduleVersion, Student, StudentExam, TimeSlot
 
+EXAM_FIELDS = ("course_name", "subject", "course_number", "section", "title", "instructor", "exam_type", "student_count")
+
+RoomKey = tuple[str, str]                 # (building, room)
+AssignmentKey = tuple[int, str, str]      # (crn, building, room)
+
 
 def parse_args():
     p = argparse.ArgumentParser(description="Import exam data into the informs database.")
-    p.add_argument("--schedule", required=True, help="Schedule CSV (per-CRN class info)")
-    p.add_argument("--students", required=True, help="Student registration CSV")
-    p.add_argument("--rooms", required=True, help="Class info / room capacity CSV")
-    p.add_argument("--exam-json", required=True, help="exam_schedule_optimized.json")
-    p.add_argument("--version", default="Imported Schedule", help="Schedule version name")
+    p.add_argument("--schedule", help="Schedule CSV (per-CRN class info)")
+    p.add_argument("--students", help="Student registration CSV")
+    p.add_argument("--rooms", help="Class info / room capacity CSV")
+    p.add_argument("--exam-json", help="exam_schedule_optimized.json")
+    p.add_argument("--bundle", help="Parquet/Arrow version directory (replaces the four inputs above)")
+    p.add_argument("--version", default=None, help="Schedule version name")
     p.add_argument("--duration", type=int, default=120, help="Default exam duration in minutes")
-    return p.parse_args()
+    p.add_argument("--term", default=None, help="Term database to import into (default: current term)")
+    p.add_argument("--dry-run", action="store_true", help="Report inserts, updates and deletes without writing")
+    p.add_argument("--prune", action="store_true", help="Delete unreferenced rooms, exams and students missing from the inputs")
+    args = p.parse_args()
+    if not args.bundle and not all([args.schedule, args.students, args.rooms, args.exam_json]):
+        p.error("either --bundle or all of --schedule, --students, --rooms and --exam-json are required")
+    if args.bundle and (args.dry_run or args.prune):
+        p.error("--dry-run and --prune apply to CSV/JSON imports; bundles always load as a new version")
+    return args
 
 
 # ── helpers ──────────────────────────────────────────────────────────────────
@@ -66,245 +106,321 @@ def parse_date(d: str) -> str:
     return d.strip()
 
 
-# ── import steps ─────────────────────────────────────────────────────────────
+# ── readers: input files → {natural key: row} ────────────────────────────────
 
-def import_rooms(session: Session, csv_path: str) -> dict[str, int]:
-    """
-    Import rooms from Class_Info CSV.
-    Returns {(building_code, room_number) -> room_id}.
-    """
-    # Deduplicate: keep max capacity per (building, room)
-    room_caps: dict[tuple[str, str], tuple[str, int]] = {}  # (code,room) -> (full_name, cap)
+def read_rooms(csv_path: str) -> dict[RoomKey, tuple]:
+    """(building_code, room_number) -> (capacity, available) from the Class_Info CSV."""
+    # Deduplicate: keep max capacity per (building, room); a room is available
+    # if any of its day/time rows has AVAILABLE_TO_SCHEDULE = Y
+    caps: dict[RoomKey, int] = {}
+    available: set[RoomKey] = set()
     with open(csv_path, newline="", encoding="utf-8-sig") as f:
         for row in csv.DictReader(f):
             key = (row["BUILDING_CODE"].strip(), row["ROOM_NUMBER"].strip())
             cap = int(row["ROOM_CAPACITY"]) if row["ROOM_CAPACITY"].strip() else 0
-            building_name = row.get("BUILDING", row["BUILDING_CODE"]).strip()
-            if key not in room_caps or cap > room_caps[key][1]:
-                room_caps[key] = (building_name, cap)
-
-    room_map: dict[tuple[str, str], int] = {}
-    for (code, room_num), (building_name, cap) in room_caps.items():
-        existing = session.exec(
-            select(Room).where(Room.building == code, Room.name == room_num)
-        ).first()
-        if existing:
-            existing.capacity = max(existing.capacity, cap)
-            room_map[(code, room_num)] = existing.id
-        else:
-            r = Room(name=room_num, building=code, capacity=cap)
-            session.add(r)
-            session.flush()
-            room_map[(code, room_num)] = r.id
-
-    session.flush()
-    print(f"  Rooms: {len(room_map)} upserted")
-    return room_map
+            caps[key] = max(caps.get(key, cap), cap)
+            if row.get("AVAILABLE_TO_SCHEDULE", "Y").strip().upper() == "Y":
+                available.add(key)
+    return {key: (cap, key in available) for key, cap in caps.items()}
 
 
-def import_exams(session: Session, csv_path: str, duration_minutes: int) -> dict[int, int]:
-    """
-    Import exams from Schedule CSV (one row per CRN).
-    Returns {crn -> exam_id}.
-    """
-    crn_map: dict[int, int] = {}
+def read_exams(csv_path: str) -> dict[int, tuple]:
+    """crn -> EXAM_FIELDS values from the Schedule CSV (one row per CRN)."""
+    exams: dict[int, tuple] = {}
     with open(csv_path, newline="", encoding="utf-8-sig") as f:
         for row in csv.DictReader(f):
             crn = int(row["CRN"])
-            enrollment = int(row.get("SECTION_ENROLLMENT") or 0)
-            course_name = (
-                f"{row['SUBJECT'].strip()} {row['COURSE_NUMBER'].strip()} "
-                f"§{row['SECTION'].strip()}"
-            )
-            existing = session.exec(select(Exam).where(Exam.crn == crn)).first()
-            if existing:
-                crn_map[crn] = existing.id
+            if crn in exams:
                 continue
-            exam = Exam(
-                crn=crn,
-                course_name=course_name,
-                subject=row.get("SUBJECT", "").strip() or None,
-                course_number=row.get("COURSE_NUMBER", "").strip() or None,
-                section=row.get("SECTION", "").strip() or None,
-                title=row.get("COURSE_TITLE", "").strip() or None,
-                instructor=row.get("INSTRUCTOR", "").strip() or None,
-                exam_type=row.get("EXAM_TYPE", "").strip() or None,
-                student_count=enrollment,
-                duration_minutes=duration_minutes,
+            exams[crn] = (
+                f"{row['SUBJECT'].strip()} {row['COURSE_NUMBER'].strip()} §{row['SECTION'].strip()}",
+                row.get("SUBJECT", "").strip() or None,
+                row.get("COURSE_NUMBER", "").strip() or None,
+                row.get("SECTION", "").strip() or None,
+                row.get("COURSE_TITLE", "").strip() or None,
+                row.get("INSTRUCTOR", "").strip() or None,
+                row.get("EXAM_TYPE", "").strip() or None,
+                int(row.get("SECTION_ENROLLMENT") or 0),
             )
-            session.add(exam)
-            session.flush()
-            crn_map[crn] = exam.id
-
-    session.flush()
-    print(f"  Exams: {len(crn_map)} upserted")
-    return crn_map
+    return exams
 
 
-def import_students(session: Session, csv_path: str, crn_to_exam: dict[int, int]) -> None:
+def read_registrations(csv_path: str, crns: set[int]) -> tuple[dict[int, tuple], dict[tuple[int, int], tuple]]:
     """
-    Import students and their exam enrollments from Student Registration CSV.
+    Students (person_id -> ()) and enrollments ((person_id, crn) -> ()) from
+    the Student Registration CSV. Registrations for CRNs outside ``crns``
+    (e.g. no final exam) create the student but no enrollment.
     """
-    student_map: dict[int, int] = {}  # person_id -> student.id
-    enrollment_pairs: set[tuple[int, int]] = set()  # (student_id, exam_id)
-
+    students: dict[int, tuple] = {}
+    enrollments: dict[tuple[int, int], tuple] = {}
     with open(csv_path, newline="", encoding="utf-8-sig") as f:
         for row in csv.DictReader(f):
             person_id = int(row["PERSON_IDENTIFIER"])
             crn = int(row["CRN"])
+            students[person_id] = ()
+            if crn in crns:
+                enrollments[(person_id, crn)] = ()
+    return students, enrollments
 
-            if person_id not in student_map:
-                existing = session.exec(
-                    select(Student).where(Student.person_id == person_id)
-                ).first()
-                if existing:
-                    student_map[person_id] = existing.id
-                else:
-                    s = Student(person_id=person_id)
-                    session.add(s)
-                    session.flush()
-                    student_map[person_id] = s.id
-
-            exam_id = crn_to_exam.get(crn)
-            if exam_id is None:
-                continue  # CRN not in schedule (e.g. no final exam)
-
-            pair = (student_map[person_id], exam_id)
-            if pair not in enrollment_pairs:
-                existing_se = session.exec(
-                    select(StudentExam).where(
-                        StudentExam.student_id == pair[0],
-                        StudentExam.exam_id == pair[1],
-                    )
-                ).first()
-                if not existing_se:
-                    session.add(StudentExam(student_id=pair[0], exam_id=pair[1]))
-                enrollment_pairs.add(pair)
 
+def read_assignments(json_path: str) -> dict[AssignmentKey, tuple]:
+    """(crn, building, room) -> (date, start_time) from exam_schedule_optimized.json."""
+    with open(json_path, encoding="utf-8") as f:
+        data: dict[str, dict] = json.load(f)
+    return {
+        (int(crn), info["building"].strip(), str(info["room"]).strip()): (
+            parse_date(info["date"]),
+            parse_time(info["time"]),
+        )
+        for crn, info in data.items()
+    }
+
+
+# ── stored rows: {natural key: (id, row)} ────────────────────────────────────
+
+def stored_rooms(session: Session) -> dict[RoomKey, tuple[int, tuple]]:
+    rows = session.exec(select(Room.id, Room.building, Room.name, Room.capacity, Room.available)).all()
+    return {(b, n): (i, (c, a)) for i, b, n, c, a in rows}
+
+
+def stored_exams(session: Session) -> dict[int, tuple[int, tuple]]:
+    columns = [getattr(Exam, f) for f in EXAM_FIELDS]
+    rows = session.exec(select(Exam.id, Exam.crn, *columns).where(Exam.crn.is_not(None))).all()
+    return {crn: (i, tuple(values)) for i, crn, *values in rows}
+
+
+def stored_students(session: Session) -> dict[int, tuple[int, tuple]]:
+    rows = session.exec(select(Student.id, Student.person_id).where(Student.person_id.is_not(None))).all()
+    return {pid: (i, ()) for i, pid in rows}
+
+
+def stored_enrollments(session: Session) -> dict[tuple[int, int], tuple[int, tuple]]:
+    rows = session.exec(
+        select(StudentExam.id, Student.person_id, Exam.crn)
+        .join(Student, Student.id == StudentExam.student_id)
+        .join(Exam, Exam.id == StudentExam.exam_id)
+        .where(Student.person_id.is_not(None), Exam.crn.is_not(None))
+    ).all()
+    return {(pid, crn): (i, ()) for i, pid, crn in rows}
+
+
+def stored_assignments(session: Session, version_id: Optional[int]) -> dict[AssignmentKey, tuple[int, tuple]]:
+    if version_id is None:
+        return {}
+    rows = session.exec(
+        select(Schedule.id, Exam.crn, Room.building, Room.name, TimeSlot.date, TimeSlot.start_time)
+        .join(Exam, Exam.id == Schedule.exam_id)
+        .join(Room, Room.id == Schedule.room_id)
+        .join(TimeSlot, TimeSlot.id == Schedule.timeslot_id)
+        .where(Schedule.version_id == version_id, Exam.crn.is_not(None))
+    ).all()
+    return {(crn, b, n): (i, (d, s)) for i, crn, b, n, d, s in rows}
+
+
+def find_version(session: Session, name: str) -> Optional[ScheduleVersion]:
+    return session.exec(select(ScheduleVersion).where(ScheduleVersion.name == name)).first()
+
+
+# ── plan ─────────────────────────────────────────────────────────────────────
+
+def plan_assignments(
+    session: Session, incoming: dict[AssignmentKey, tuple], version_name: str, crns: set[int]
+) -> ChangeSet[AssignmentKey]:
+    """The version's assignment changes; entries for CRNs outside ``crns`` are skipped."""
+    known = {k: v for k, v in incoming.items() if k[0] in crns}
+    if len(known) < len(incoming):
+        print(f"  Skipping {len(incoming) - len(known)} assignments for CRNs not found in the exams")
+    version = find_version(session, version_name)
+    return diff("Schedule entries", known, stored_assignments(session, version.id if version else None))
+
+
+def plan_import(session: Session, args) -> dict[str, ChangeSet]:
+    exams = read_exams(args.schedule)
+    students, enrollments = read_registrations(args.students, set(exams))
+    stored = stored_exams(session)
+    return {
+        "rooms": diff("Rooms", read_rooms(args.rooms), stored_rooms(session)),
+        "exams": diff("Exams", exams, stored),
+        "students": diff("Students", students, stored_students(session)),
+        "enrollments": diff("StudentExam enrollments", enrollments, stored_enrollments(session)),
+        "assignments": plan_assignments(
+            session, read_assignments(args.exam_json), args.version or "Imported Schedule", set(exams) | set(stored)
+        ),
+    }
+
+
+# ── apply ────────────────────────────────────────────────────────────────────
+
+def _ids(session: Session, *columns) -> dict:
+    """Natural key -> id, for a select of (id, key...) columns."""
+    return {(k[0] if len(k) == 1 else tuple(k)): i for i, *k in session.exec(select(*columns)).all()}
+
+
+def apply_entities(session: Session, plan: dict[str, ChangeSet], duration_minutes: int) -> None:
+    """Write room, exam, student and enrollment changes; deletes apply to enrollments only."""
+    write(
+        session, Room, plan["rooms"],
+        lambda k, v: {"building": k[0], "name": k[1], "capacity": v[0], "available": v[1]},
+        deletes=(),
+    )
+    write(
+        session, Exam, plan["exams"],
+        lambda k, v: {"crn": k, **dict(zip(EXAM_FIELDS, v))},
+        defaults={"duration_minutes": duration_minutes},
+        deletes=(),
+    )
+    write(session, Student, plan["students"], lambda k, v: {"person_id": k}, deletes=())
+    if plan["enrollments"].changed:
+        student_ids = _ids(session, Student.id, Student.person_id)
+        exam_ids = _ids(session, Exam.id, Exam.crn)
+        write(
+            session, StudentExam, plan["enrollments"],
+            lambda k, v: {"student_id": student_ids[k[0]], "exam_id": exam_ids[k[1]]},
+        )
     session.flush()
-    print(f"  Students: {len(student_map)} upserted")
-    print(f"  StudentExam enrollments: {len(enrollment_pairs)} upserted")
+    if any(plan[e].changed for e in ("rooms", "exams", "students", "enrollments")):
+        _invalidate_caches(session)
+
+
+def _invalidate_caches(session: Session) -> None:
+    # Core writes bypass the ORM events that keep the in-process caches,
+    # materialized analytics and search index current; the stored generation
+    # also reaches a server running in another process
+    revisions.record_external_write(session)
+    analytics_store.invalidate(session)
+    search.rebuild(session)
 
 
-def import_schedule(
-    session: Session,
-    json_path: str,
-    crn_to_exam: dict[int, int],
-    room_map: dict[tuple[str, str], int],
-    version_name: str,
-) -> None:
+def apply_assignments(session: Session, changes: ChangeSet[AssignmentKey], version_name: str) -> int:
     """
-    Import schedule assignments from exam_schedule_optimized.json.
-    Creates TimeSlots as needed, then Schedule rows.
+    Write a version's assignment changes through the ORM, so they land in
+    its edit log and analytics like any other edit; returns the version id.
+    Creates the version, missing timeslots (stretched to fit their exams) and
+    placeholder rooms for rooms not in Class_Info as needed.
     """
-    with open(json_path, encoding="utf-8") as f:
-        data: dict[str, dict] = json.load(f)
-
-    # Upsert schedule version
-    version = session.exec(
-        select(ScheduleVersion).where(ScheduleVersion.name == version_name)
-    ).first()
+    version = find_version(session, version_name)
     if not version:
         version = ScheduleVersion(name=version_name, active=True)
         session.add(version)
         session.flush()
+    if not changes.changed:
+        return version.id
+
+    exam_ids = _ids(session, Exam.id, Exam.crn)
+    durations = dict(session.exec(select(Exam.id, Exam.duration_minutes)).all())
+    room_ids = _ids(session, Room.id, Room.building, Room.name)
+    slots = {(t.date, t.start_time): t for t in session.exec(select(TimeSlot)).all()}
+
+    def room_id(building: str, name: str) -> int:
+        if (building, name) not in room_ids:
+            r = Room(name=name, building=building, capacity=0)
+            session.add(r)
+            session.flush()
+            room_ids[(building, name)] = r.id
+        return room_ids[(building, name)]
 
-    timeslot_cache: dict[tuple[str, str], int] = {}  # (date, start_time) -> timeslot_id
-
-    def get_or_create_timeslot(date_str: str, start: str) -> int:
-        key = (date_str, start)
-        if key in timeslot_cache:
-            return timeslot_cache[key]
-        existing = session.exec(
-            select(TimeSlot).where(TimeSlot.date == date_str, TimeSlot.start_time == start)
-        ).first()
-        if existing:
-            timeslot_cache[key] = existing.id
-            return existing.id
-        # Assume 2-hour slots; adjust if needed
+    def timeslot_id(date_str: str, start: str, duration_minutes: int) -> int:
+        """Find or create the slot starting at (date, start), stretched to fit the exam."""
         h, m = int(start[:2]), int(start[3:])
-        end_h = h + 2
-        end = f"{end_h:02d}:{m:02d}"
-        ts = TimeSlot(date=date_str, start_time=start, end_time=end)
-        session.add(ts)
-        session.flush()
-        timeslot_cache[key] = ts.id
+        end_total = min(h * 60 + m + duration_minutes, 23 * 60 + 59)
+        end = f"{end_total // 60:02d}:{end_total % 60:02d}"
+        ts = slots.get((date_str, start))
+        if ts is None:
+            ts = slots[(date_str, start)] = TimeSlot(date=date_str, start_time=start, end_time=end)
+            session.add(ts)
+            session.flush()
+        elif ts.end_time < end:
+            ts.end_time = end
+            session.add(ts)
         return ts.id
 
-    assigned = 0
-    skipped_crn = 0
-    skipped_room = 0
-
-    for crn_str, info in data.items():
-        crn = int(crn_str)
-        exam_id = crn_to_exam.get(crn)
-        if exam_id is None:
-            skipped_crn += 1
-            continue
-
-        building = info["building"].strip()
-        room_num = str(info["room"]).strip()
-        room_id = room_map.get((building, room_num))
-        if room_id is None:
-            # Room not in Class_Info — create a placeholder
-            r = session.exec(
-                select(Room).where(Room.building == building, Room.name == room_num)
-            ).first()
-            if not r:
-                r = Room(name=room_num, building=building, capacity=0)
-                session.add(r)
-                session.flush()
-                room_map[(building, room_num)] = r.id
-            room_id = r.id
-
-        date_str = parse_date(info["date"])
-        start_str = parse_time(info["time"])
-        timeslot_id = get_or_create_timeslot(date_str, start_str)
-
-        existing = session.exec(
-            select(Schedule).where(
-                Schedule.version_id == version.id,
-                Schedule.exam_id == exam_id,
-            )
-        ).first()
-        if not existing:
-            session.add(
-                Schedule(
-                    version_id=version.id,
-                    exam_id=exam_id,
-                    room_id=room_id,
-                    timeslot_id=timeslot_id,
-                )
-            )
-            assigned += 1
-
+    rows = {
+        s.id: s for chunk in chunks([changes.ids[k] for k in [*changes.updates, *changes.deletes]])
+        for s in session.exec(select(Schedule).where(Schedule.id.in_(chunk))).all()
+    }
+    for key in changes.deletes:
+        session.delete(rows[changes.ids[key]])
+    for (crn, building, name), (d, s) in changes.updates.items():
+        row = rows[changes.ids[(crn, building, name)]]
+        row.timeslot_id = timeslot_id(d, s, durations.get(row.exam_id) or 120)
+        session.add(row)
+    for (crn, building, name), (d, s) in changes.inserts.items():
+        exam_id = exam_ids[crn]
+        session.add(Schedule(
+            version_id=version.id,
+            exam_id=exam_id,
+            room_id=room_id(building, name),
+            timeslot_id=timeslot_id(d, s, durations.get(exam_id) or 120),
+        ))
     session.flush()
-    print(f"  Schedule entries: {assigned} created")
-    if skipped_crn:
-        print(f"  Skipped {skipped_crn} CRNs not found in Schedule CSV")
+    # the ORM events above only reach this process; a running server sees the stored generation
+    revisions.record_external_write(session)
+    return version.id
+
+
+def prune(session: Session, plan: dict[str, ChangeSet]) -> None:
+    """Delete rooms, exams and students missing from the inputs that nothing references any more."""
+    scheduled_exams = set(session.exec(select(Schedule.exam_id).distinct()).all())
+    used_rooms = set(session.exec(select(Schedule.room_id).distinct()).all())
+    enrolled_exams = set(session.exec(select(StudentExam.exam_id).distinct()).all())
+    enrolled_students = set(session.exec(select(StudentExam.student_id).distinct()).all())
+    checks = [
+        (Room, plan["rooms"], used_rooms),
+        (Exam, plan["exams"], scheduled_exams | enrolled_exams),
+        (Student, plan["students"], enrolled_students),
+    ]
+    for model, changes, referenced in checks:
+        gone = [i for i in (changes.ids[k] for k in changes.deletes) if i not in referenced]
+        for chunk in chunks(gone):
+            session.exec(delete(model).where(model.id.in_(chunk)))
+        kept = len(changes.deletes) - len(gone)
+        print(f"  {changes.entity}: {len(gone)} pruned" + (f", {kept} still referenced and kept" if kept else ""))
+    session.flush()
+    if any(plan[e].deletes for e in ("rooms", "exams", "students")):
+        _invalidate_caches(session)
 
 
 # ── main ─────────────────────────────────────────────────────────────────────
 
 def main():
     args = parse_args()
-    create_db_and_tables()
-
-    with Session(engine) as session:
-        print("Importing rooms...")
-        room_map = import_rooms(session, args.rooms)
-
-        print("Importing exams (classes)...")
-        crn_to_exam = import_exams(session, args.schedule, args.duration)
-
-        print("Importing students and enrollments...")
-        import_students(session, args.students, crn_to_exam)
-
-        print("Importing optimized exam schedule...")
-        import_schedule(session, args.exam_json, crn_to_exam, room_map, args.version)
+    create_db_and_tables(args.term)
+
+    with term_session(args.term) as session:
+        if args.bundle:
+            print(f"Importing version bundle {args.bundle}...")
+            loaded = import_version(session, args.bundle, args.version)
+            print(f"  {loaded.assignments} of {loaded.total_assignments} assignments loaded")
+            if loaded.skipped_students:
+                print(f"  Skipped {loaded.skipped_students} students with neither a person id nor an email")
+            session.commit()
+            print("Done.")
+            return
+
+        print("Comparing inputs with the database...")
+        plan = plan_import(session, args)
+        for changes in plan.values():
+            print(f"  {changes.summary()}")
+        kept = [c.entity for k, c in plan.items() if k in ("rooms", "exams", "students") and c.deletes]
+        if kept and not args.prune:
+            print(f"  ({', '.join(kept)} missing from the inputs are kept; --prune deletes unreferenced ones)")
+        if args.dry_run:
+            print("Dry run: nothing written.")
+            return
+
+        print("Writing rooms, exams, students and enrollments...")
+        apply_entities(session, plan, args.duration)
+
+        print("Writing schedule entries...")
+        version_name = args.version or "Imported Schedule"
+        version_id = apply_assignments(session, plan["assignments"], version_name)
+
+        if args.prune:
+            print("Pruning...")
+            prune(session, plan)
 
         session.commit()
-        print("Done.")
+        print(f"Done. '{version_name}' is at edit {oplog.head(session, version_id)} of its log.")
 
 
 if __name__ == "__main__":
@@ -1,24 +1,37 @@
 """
-Clear all schedule versions from the DB and import two new ones:
+Bring the schedule versions of a term in line with two exported schedules:
   - "Balanced"              → balanced_schedule.json
   - "Student Overlap Only"  → exam_schedule_student_overlap_only.json
 
+A "json_path" entry may also point at a Parquet/Arrow version directory
+(see export_version.py), matched against the rooms and exams already in the
+database.
+
+Each listed version is updated in place: its assignments are compared with
+the file by content hash (see import_data.py) and only the differences are
+written, through the ORM, so they show up in the version's edit log. A
+listed version whose file is missing is left alone; versions not listed are
+deleted.
+
 Run from the backend/ directory:
-    python reset_schedules.py
+    python reset_schedules.py [--term TERM] [--dry-run]
 
 Rooms, exams, and students are left untouched.
 """
 
+import argparse
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
-from sqlmodel import Session, select, delete as sql_delete
+from sqlmodel import select, delete as sql_delete
 
-from app.database import create_db_and_tables, engine
-from app.models import Exam, Room, Schedule, ScheduleVersion
-from import_data import import_schedule
+from app.columnar import read_assignments as read_bundle_assignments
+from app import revisions
+from app.database import create_db_and_tables, term_session
+from app.models import AnalyticsSnapshot, Exam, Schedule, ScheduleOperation, ScheduleSnapshot, ScheduleVersion
+from import_data import apply_assignments, plan_assignments, read_assignments
 
 BASE = Path(__file__).resolve().parent.parent  # decisionlab26/
 
@@ -35,35 +48,48 @@ SCHEDULES = [
 
 
 def main():
-    create_db_and_tables()
-
-    with Session(engine) as session:
-        # ── Step 1: delete all existing schedule assignments and versions ──
-        deleted_schedules = session.exec(sql_delete(Schedule)).rowcount
-        deleted_versions  = session.exec(sql_delete(ScheduleVersion)).rowcount
-        session.flush()
-        print(f"Cleared {deleted_schedules} schedule rows and {deleted_versions} version(s).")
-
-        # ── Step 2: rebuild lookup maps from existing DB records ───────────
-        room_map = {
-            (r.building, r.name): r.id
-            for r in session.exec(select(Room)).all()
-        }
-        crn_to_exam = {
-            e.crn: e.id
-            for e in session.exec(select(Exam)).all()
-            if e.crn is not None
-        }
-        print(f"Found {len(room_map)} rooms and {len(crn_to_exam)} exams in DB.")
-
-        # ── Step 3: import each new schedule ──────────────────────────────
+    p = argparse.ArgumentParser(description="Bring a term's schedule versions in line with the exported schedules.")
+    p.add_argument("--term", default=None, help="Term database to reset (default: current term)")
+    p.add_argument("--dry-run", action="store_true", help="Report the changes without writing them")
+    args = p.parse_args()
+    create_db_and_tables(args.term)
+
+    with term_session(args.term) as session:
+        # ── Step 1: compare each listed schedule with its version ──────────
+        crns = set(session.exec(select(Exam.crn).where(Exam.crn.is_not(None))).all())
+        print(f"Found {len(crns)} exams with a CRN in DB.")
+        plans = []
         for cfg in SCHEDULES:
             json_path = cfg["json_path"]
             if not json_path.exists():
                 print(f"  SKIPPING '{cfg['version_name']}' — file not found: {json_path}")
                 continue
-            print(f"\nImporting '{cfg['version_name']}' from {json_path.name} ...")
-            import_schedule(session, str(json_path), crn_to_exam, room_map, cfg["version_name"])
+            incoming = read_bundle_assignments(json_path) if json_path.is_dir() else read_assignments(str(json_path))
+            changes = plan_assignments(session, incoming, cfg["version_name"], crns)
+            print(f"  '{cfg['version_name']}' {changes.summary()}")
+            plans.append((cfg["version_name"], changes))
+
+        listed = {cfg["version_name"] for cfg in SCHEDULES}
+        stale = [v for v in session.exec(select(ScheduleVersion)).all() if v.name not in listed]
+        for v in stale:
+            print(f"  '{v.name}' [{v.id}] is not listed and will be deleted")
+        if args.dry_run:
+            print("\nDry run: nothing written.")
+            return
+
+        # ── Step 2: delete versions that aren't listed ────────────────────
+        stale_ids = [v.id for v in stale]
+        if stale_ids:
+            for model in (AnalyticsSnapshot, ScheduleOperation, ScheduleSnapshot, Schedule):
+                session.exec(sql_delete(model).where(model.version_id.in_(stale_ids)))
+            session.exec(sql_delete(ScheduleVersion).where(ScheduleVersion.id.in_(stale_ids)))
+            revisions.record_external_write(session)
+            session.flush()
+            print(f"Deleted {len(stale_ids)} unlisted version(s).")
+
+        # ── Step 3: write each listed version's changes ───────────────────
+        for version_name, changes in plans:
+            apply_assignments(session, changes, version_name)
 
         session.commit()
         print("\nDone. The following versions are now in the database:")
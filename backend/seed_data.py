@@ -0,0 +1,30 @@
+"""
+Load the demo dataset (8 rooms, 10 exams, 20 students, one schedule version)
+into an empty term database. Does nothing if the term already has rooms.
+
+The server no longer seeds on startup; run this once for a fresh checkout:
+    python seed_data.py [--term TERM]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from app.database import create_db_and_tables, seed_data
+
+
+def main():
+    p = argparse.ArgumentParser(description="Seed an empty term database with demo data.")
+    p.add_argument("--term", default=None, help="Term database to seed (default: current term)")
+    args = p.parse_args()
+    create_db_and_tables(args.term)
+    if seed_data(args.term):
+        print("Seeded demo data.")
+    else:
+        print("Database already has rooms; nothing seeded.")
+
+
+if __name__ == "__main__":
+    main()
@@ -76,7 +76,7 @@ export default function App() {
     Promise.all([
       fetch(`${API}/schedules/detailed?${vParam}`).then((r) => r.json()),
       fetch(`${API}/schedules/timeslots`).then((r) => r.json()),
-      fetch(`${API}/schedules/conflicts?${vParam}`).then((r) => r.json()),
+      fetch(`${API}/schedules/conflicts?type=student&${vParam}`).then((r) => r.json()),
       fetch(`${API}/schedules/analytics?${vParam}&include_no_exam=${includeNoExam}`).then((r) => r.json()),
       fetch(`${API}/schedules/students`).then((r) => r.json()),
       fetch(`${API}/rooms/detailed?${vParam}`).then((r) => r.json()),
@@ -145,10 +145,22 @@ export default function App() {
     fetch(`${API}/schedules/${dragged.id}`, {
       method: "PUT",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ exam_id: dragged.exam.id, room_id: dragged.room.id, timeslot_id: slot.id }),
+      body: JSON.stringify({
+        exam_id: dragged.exam.id,
+        room_id: dragged.room.id,
+        timeslot_id: slot.id,
+        row_version: dragged.row_version,
+      }),
     })
       .then((r) => {
+        // 409: someone else moved this exam first; show their version
+        if (r.status === 409) fetchData(false);
         if (!r.ok) throw new Error(`PUT failed: ${r.status}`);
+        return r.json();
+      })
+      .then((saved: { row_version: number }) => {
+        // the save moved row_version; a second drag before the refetch lands must send the new one
+        setSchedules((prev) => prev.map((s) => (s.id === dragged.id ? { ...s, row_version: saved.row_version } : s)));
         setAutoSaveStatus("saved");
         setTimeout(() => setAutoSaveStatus("idle"), 1500);
         fetchData(false);
@@ -364,6 +376,8 @@ export default function App() {
         <ConflictModal
           slotKey={conflictModal.key}
           items={conflictModal.items}
+          versionId={activeVersionId}
+          onApplied={() => fetchData(false)}
           onClose={() => setConflictModal(null)}
         />
       )}
@@ -1,19 +1,57 @@
-import { useEffect, useRef } from "react";
-import { Conflict } from "../types";
-import { formatDate, formatTime, shortCourse } from "../helpers";
+import { useEffect, useRef, useState } from "react";
+import { Conflict, ConflictFix } from "../types";
+import { API, formatDate, formatTime, shortCourse } from "../helpers";
 
 export function ConflictModal({
-  slotKey, items, onClose,
+  slotKey, items, versionId, onApplied, onClose,
 }: {
   slotKey: string;
   items: Conflict[];
+  versionId: number;
+  onApplied: () => void;
   onClose: () => void;
 }) {
   const ref = useRef<HTMLDivElement>(null);
+  const [fixes, setFixes] = useState<ConflictFix[]>([]);
+  const [loadingFixes, setLoadingFixes] = useState(false);
+  const [applying, setApplying] = useState<number | null>(null);
   const [date, start, end] = slotKey.split("|");
   const label = `${formatDate(date)} ${formatTime(start)} – ${formatTime(end)}`;
   const examNames = [...new Set(items.flatMap((c) => c.exams.map((e) => e.course_name)))];
 
+  // fixes for the first student's conflict; moving an exam out helps everyone who shares it
+  const first = items[0];
+  useEffect(() => {
+    if (!first?.student) return;
+    const params = new URLSearchParams({ student_id: String(first.student.id), version_id: String(versionId), limit: "5" });
+    first.exams.forEach((e) => params.append("exam_id", String(e.id)));
+    setLoadingFixes(true);
+    fetch(`${API}/schedules/conflicts/explain?${params}`)
+      .then((r) => r.json())
+      .then((d) => setFixes(Array.isArray(d.fixes) ? d.fixes : []))
+      .catch(console.error)
+      .finally(() => setLoadingFixes(false));
+  }, [first, versionId]);
+
+  function applyFix(fix: ConflictFix, i: number) {
+    setApplying(i);
+    fetch(`${API}/schedules/moves`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(fix.moves.map((m) => ({
+        schedule_id: m.schedule_id,
+        row_version: m.row_version,
+        exam_id: m.exam_id,
+        room_id: m.room_id,
+        timeslot_id: m.timeslot_id,
+      }))),
+    })
+      .then((r) => { if (!r.ok) throw new Error(); })
+      .then(() => { onApplied(); onClose(); })
+      .catch(console.error)
+      .finally(() => setApplying(null));
+  }
+
   useEffect(() => {
     const handler = (e: MouseEvent) => {
       if (ref.current && !ref.current.contains(e.target as Node)) onClose();
@@ -57,6 +95,37 @@ export function ConflictModal({
               ))}
             </div>
           </div>
+          {first?.student && (
+            <div className="modal-section">
+              <div className="modal-section-title">Suggested Fixes</div>
+              <div className="modal-subtitle">Change in students' overlapping exam pairs across the schedule</div>
+              {loadingFixes ? (
+                <div className="suggest-loading">Finding fixes…</div>
+              ) : fixes.length === 0 ? (
+                <div className="modal-subtitle">No single move or swap takes these exams apart.</div>
+              ) : (
+                <div className="modal-fix-list">
+                  {fixes.map((f, i) => (
+                    <div key={i} className="modal-student-row">
+                      <div className="modal-fix-moves">
+                        {f.moves.map((m) => (
+                          <span key={m.exam_id}>
+                            {shortCourse(m.course_name)} → {formatDate(m.timeslot.date)} {formatTime(m.timeslot.start_time)} · {m.room_name}
+                          </span>
+                        ))}
+                      </div>
+                      <span className={`modal-fix-delta ${f.delta <= 0 ? "suggest-zero" : "suggest-nonzero"}`}>
+                        {f.delta > 0 ? "+" : ""}{f.delta} overlapping pair{Math.abs(f.delta) !== 1 ? "s" : ""}
+                      </span>
+                      <button className="suggest-btn" disabled={applying !== null} onClick={() => applyFix(f, i)}>
+                        {applying === i ? "Applying…" : "Apply"}
+                      </button>
+                    </div>
+                  ))}
+                </div>
+              )}
+            </div>
+          )}
         </div>
       </div>
     </div>
@@ -43,6 +43,7 @@ export function RescheduleModal({
         exam_id: schedule.exam!.id,
         room_id: suggestion.room.id,
         timeslot_id: suggestion.timeslot.id,
+        row_version: schedule.row_version,
       }),
     })
       .then((r) => { if (!r.ok) throw new Error(); })
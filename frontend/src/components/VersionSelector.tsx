@@ -1,5 +1,5 @@
 import { useState, useRef, useEffect } from "react";
-import { ScheduleVersion } from "../types";
+import { ScheduleVersion, VersionScore } from "../types";
 import { API } from "../helpers";
 
 export function VersionSelector({
@@ -17,6 +17,7 @@ export function VersionSelector({
   const [creating, setCreating] = useState(false);
   const [newName, setNewName] = useState("");
   const [duplicateFrom, setDuplicateFrom] = useState<number | null>(null);
+  const [scores, setScores] = useState<Record<number, VersionScore>>({});
   const ref = useRef<HTMLDivElement>(null);
 
   useEffect(() => {
@@ -27,6 +28,14 @@ export function VersionSelector({
     return () => document.removeEventListener("mousedown", handler);
   }, []);
 
+  useEffect(() => {
+    if (!open) return;
+    fetch(`${API}/schedules/versions/scores`)
+      .then((r) => r.json())
+      .then((d) => setScores(Object.fromEntries(d.versions.map((s: VersionScore) => [s.version_id, s]))))
+      .catch(() => {});
+  }, [open, versions]);
+
   const current = versions.find((v) => v.id === activeVersionId);
 
   const handleCreate = async () => {
@@ -83,6 +92,14 @@ export function VersionSelector({
               >
                 <span className="version-dot" />
                 {v.name}
+                {scores[v.id] && (
+                  <span
+                    className="version-score"
+                    title={`Overlaps ${scores[v.id].components.overlap} · 3 in 48h ${scores[v.id].components.three_in_48h} · back-to-back ${scores[v.id].components.back_to_back}`}
+                  >
+                    {scores[v.id].objective.toFixed(1)}
+                  </span>
+                )}
               </button>
               <div className="version-option-actions">
                 <button
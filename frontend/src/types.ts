@@ -1,11 +1,24 @@
 export interface Room { id: number; name: string; capacity: number; building: string }
 export interface Exam { id: number; course_name: string; student_count: number; duration_minutes: number; exam_type: string | null }
 export interface TimeSlot { id: number; start_time: string; end_time: string; date: string }
-export interface DetailedSchedule { id: number; exam: Exam | null; room: Room | null; timeslot: TimeSlot | null }
+export interface DetailedSchedule { id: number; row_version?: number; exam: Exam | null; room: Room | null; timeslot: TimeSlot | null }
 export interface StudentInfo { id: number; person_id: number | null; name: string | null; email: string | null }
-export interface Conflict { student: StudentInfo | null; timeslot: TimeSlot | null; exams: Exam[] }
+export interface Conflict {
+  type?: "student" | "instructor" | "room";
+  student: StudentInfo | null; instructor?: string | null; room?: Room | null;
+  timeslot: TimeSlot | null; exams: Exam[];
+}
 export interface ScheduleVersion { id: number; name: string; active: boolean }
+export interface VersionScore {
+  version_id: number; name: string; objective: number; scheduled_exams: number;
+  components: { overlap: number; three_in_48h: number; back_to_back: number };
+}
 export interface Suggestion { timeslot: TimeSlot; conflict_count: number; room: Room | null }
+export interface FixMove {
+  schedule_id: number; row_version: number; exam_id: number; course_name: string;
+  from_timeslot_id: number; timeslot_id: number; timeslot: TimeSlot; room_id: number; room_name: string;
+}
+export interface ConflictFix { kind: "move" | "swap"; delta: number; resolves: boolean; student_overlap_pairs_after: number; moves: FixMove[] }
 export interface RoomScheduleEntry { schedule_id: number; exam: Exam | null; timeslot: TimeSlot | null }
 export interface RoomDetailed { room: Room; schedules: RoomScheduleEntry[] }
 export interface Analytics {